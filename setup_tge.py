@@ -5,142 +5,155 @@ import tge.function_utils
 import tge.library_utils
 import base64
 
-tge.console.clear()
-
-total_functions = tge.function_utils.count_functions_in_library("tge")
-print("TGE has %s functions" % total_functions)
-undocumented = tge.tbe.print_undocumented_functions_in_directory()
-print(
-    f"{total_functions-undocumented}/{total_functions} Functions are documented, that means {((total_functions-undocumented)/total_functions)*100}% of functions are documented and {undocumented} are still missing"
-)
-print()
-tge.function_utils.print_check_for_functions_in_module_with_missing_notations(
-    tge.list_utils
-)
-# print("lines:", tge.tbe.count_lines_in_directory("./tge"))
-dir = f"{os.getcwd()}/tge/"
-
-for i in range(2):
+
+def main() -> None:
+    tge.console.clear()
+
+    total_functions = tge.function_utils.count_functions_in_library("tge")
+    print("TGE has %s functions" % total_functions)
+    undocumented = tge.tbe.print_undocumented_functions_in_directory()
+    print(
+        f"{total_functions-undocumented}/{total_functions} Functions are documented, that means {((total_functions-undocumented)/total_functions)*100}% of functions are documented and {undocumented} are still missing"
+    )
+    print()
+    tge.function_utils.print_check_for_functions_in_module_with_missing_notations(
+        tge.list_utils
+    )
+    # print("lines:", tge.tbe.count_lines_in_directory("./tge"))
+    dir = f"{os.getcwd()}/tge/"
 
     with open("tge/update.hashed", "w") as f:
         f.write(
             base64.b64encode(
                 (
                     tge.file_operations.generate_uuid_from_directory(
-                        dir, ["hashed", "pyc"]
+                        dir, ["hashed", "pyc"], incremental=True
                     ).bytes
                 )
             ).decode()
         )
 
 
-print()
-directories = []
+    print()
+    directories = []
+
+
+    for root, dirs, files in os.walk(dir, topdown=False):
+        root = root[len(dir) :].lstrip("\\")
+        for name in files:
+            file = os.path.join(root, name).replace("\\", "/")
+            if file.endswith(".py"):
+                file = file[:-2]
+            elif file.endswith(".pyc"):
+                continue
+            directories.append(file)
 
 
-for root, dirs, files in os.walk(dir, topdown=False):
-    root = root[len(dir) :].lstrip("\\")
-    for name in files:
-        file = os.path.join(root, name).replace("\\", "/")
-        if file.endswith(".py"):
-            file = file[:-2]
-        elif file.endswith(".pyc"):
-            continue
-        directories.append(file)
+    compressed = tge.file_operations.compress_directory_list(directories)
 
+    with open("directory.json", "w") as f:  #
+        compressed = json.dumps(compressed)
+        for replacer, replacement in [('", "', '","'), ('": ', '":'), (', "', ',"')]:
+            compressed = compressed.replace(replacer, replacement)
+        f.write(compressed)
 
-compressed = tge.file_operations.compress_directory_list(directories)
 
-with open("directory.json", "w") as f:  #
-    compressed = json.dumps(compressed)
-    for replacer, replacement in [('", "', '","'), ('": ', '":'), (', "', ',"')]:
-        compressed = compressed.replace(replacer, replacement)
-    f.write(compressed)
+    cwd = os.getcwd()
+    output = rf"{cwd}/minified_tge/"
+    try:
+        os.remove(output)
+    except PermissionError:
+        print(
+            "VS is still using the minified tge folder, delete it manually or just leave it"
+        )
+    except FileNotFoundError:
+        ...
 
 
-cwd = os.getcwd()
-output = rf"{cwd}/minified_tge/"
-try:
-    os.remove(output)
-except PermissionError:
-    print(
-        "VS is still using the minified tge folder, delete it manually or just leave it"
+    if tge.tbe.determine_affirmative(input("Minify?: ")):
+        build = tge.tbe.minify_directory(dir, output)
+        print(
+            "Minified %s files, %s unchanged, %s removed"
+            % (len(build["processed"]), len(build["skipped"]), len(build["removed"]))
+        )
+
+
+    tge_size = tge.conversion.binary.convert_byte_to_kilobyte(
+        tge.file_operations.get_file_size_of_directory("./tge", [".pyc"])
+    )
+    minified_size = tge.conversion.binary.convert_byte_to_kilobyte(
+        tge.file_operations.get_file_size_of_directory("./minified_tge", [".pyc"])
     )
-except FileNotFoundError:
-    ...
 
 
-if tge.tbe.determine_affirmative(input("Minify?: ")):
-    for root, dirs, files in os.walk(dir, topdown=False):
-        root = root
-        for file in files:
-            file_path = os.path.join(root[len(dir) :].lstrip("\\"), file)
-            total_file_path = os.path.join(root, file)
-            if file.endswith(".pyc"):
-                continue
-            if file.endswith(".hash"):
-                with open(total_file_path, "rb") as f:
-                    with open(output + file_path, "wb") as o:
-                        data = f.read()
+    import minified_tge  # type: ignore
 
-                        o.write(data)
-                continue
-            with open(total_file_path, "r", encoding="utf8") as f:
-
-                os.makedirs(os.path.dirname(output + file_path), exist_ok=True)
-
-                with open(output + file_path, "w", encoding="utf8") as o:
-                    data = tge.tbe.compress_imports_in_code(
-                        
-                            tge.tbe.remove_unused_libraries(
-                                "".join(
-                                    [
-                                        tge.string_utils.left_replace(line, "	", " ")
-                                        for line in tge.tbe.minify(
-                                            f.read(),
-                                            rename_important_names=False,
-                                            remove_docstrings=True,
-                                        )
-                                    ]
-                                )
-                            )
-                            if file.endswith(".py")
-                            else f.read()
-                        
-                    )
-                    o.write("".join(data))
-
-
-tge_size = tge.conversion.binary.convert_byte_to_kilobyte(
-    tge.file_operations.get_file_size_of_directory("./tge", [".pyc"])
-)
-minified_size = tge.conversion.binary.convert_byte_to_kilobyte(
-    tge.file_operations.get_file_size_of_directory("./minified_tge", [".pyc"])
-)
-
-
-import minified_tge  # type: ignore
-
-with open(".gitignore", "w") as f:
-    f.write(
-        "\n".join(
-            [
-                file[2:].replace("\\", "/")
-                for file in tge.file_operations.find_files_with_extension(".", ".pyc")
-            ]
+    with open(".gitignore", "w") as f:
+        f.write(
+            "\n".join(
+                [
+                    file[2:].replace("\\", "/")
+                    for file in tge.file_operations.find_files_with_extension(".", ".pyc")
+                ]
+            )
         )
+
+    print()
+    print("Import time of TGE:", tge.INIT_TIME)
+    print("Size of TGE: %s kb" % tge_size)
+    print("Import time of minified TGE:", minified_tge.INIT_TIME)
+    print("Size of minified TGE: %s kb" % minified_size)
+    print(
+        "The minified TGE is %sx smaller"
+        % str(tge_size / (minified_size if minified_size != 0 else tge_size))
     )
+    print()
+
+    bundle_path = os.path.join(cwd, "tge.zip")
+    tge.tbe.build_zip_bundle("./tge", bundle_path)
+    print("Size of bundled TGE: %s kb" % tge.conversion.binary.convert_byte_to_kilobyte(os.path.getsize(bundle_path)))
+    for label, package, path in [
+        ("TGE", "tge", cwd),
+        ("Minified TGE", "minified_tge", cwd),
+        ("Bundled TGE", "tge", bundle_path),
+    ]:
+        times = tge.tbe.measure_import_times(package, path)
+        print("Import time of %s: %.1f ms cold, %.1f ms warm" % (label, times["cold"] * 1000, times["warm"] * 1000))
+    print()
+
+    reports = {package: tge.startup_report(package) for package in ["tge", "minified_tge"]}
+    import_times = {
+        package: {
+            entry["module"].split(".", 1)[1] if "." in entry["module"] else "__init__": entry
+            for entry in report["package"]
+        }
+        for package, report in reports.items()
+    }
+    print("%-48s %20s %20s" % ("Import time (self / cumulative ms)", "TGE", "Minified TGE"))
+    for module in list(import_times["tge"])[:20]:
+        cells = []
+        for package in ["tge", "minified_tge"]:
+            entry = import_times[package].get(module)
+            cells.append(
+                "%.1f / %.1f" % (entry["self"] * 1000, entry["cumulative"] * 1000)
+                if entry
+                else "-"
+            )
+        print("%-48s %20s %20s" % (module, *cells))
+    print()
+    for package, report in reports.items():
+        print(
+            "Slowest third-party imports of %s:" % package,
+            ", ".join(
+                "%s (%.1f ms)" % (entry["module"], entry["cumulative"] * 1000)
+                for entry in report["third_party"][:5]
+            ),
+        )
+    print()
+
+    print("Is github version of tge up to date:", not tge.is_tge_outdated())
+    # the hash is smiling b'[\xa5d(\\!\xb7\xd0P&\xaf\xec(:>\xde'
+
 
-print()
-print("Import time of TGE:", tge.INIT_TIME)
-print("Size of TGE: %s kb" % tge_size)
-print("Import time of minified TGE:", minified_tge.INIT_TIME)
-print("Size of minified TGE: %s kb" % minified_size)
-print(
-    "The minified TGE is %sx smaller"
-    % str(tge_size / (minified_size if minified_size != 0 else tge_size))
-)
-print()
-
-print("Is github version of tge up to date:", not tge.is_tge_outdated())
-# the hash is smiling b'[\xa5d(\\!\xb7\xd0P&\xaf\xec(:>\xde'
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep the caches of the tests out of the user cache directory
+os.environ.setdefault("TGE_CACHE_DIR", tempfile.mkdtemp(prefix="tge-tests-"))
@@ -0,0 +1,120 @@
+import io
+import random
+
+import pytest
+
+from tge.codec import codec
+
+# Made by encode before the block format existed
+LEGACY_ENCODED = {
+    "hello": "56605d707a4c",
+    "Hello, World! 123": "363f3c2d717e26355e7d21637d2f4c3a404e355c4b",
+    "héllo wörld ✓ 😀": "654036717957414a354d5232747b73532d2525796a422f53596d5e",
+    "": "30",
+}
+
+TEXTS = ["", "a", "hello", "\x00\x00leading zeros", "héllo wörld ✓ 😀\n" * 40, "".join(map(chr, range(1, 300)))]
+
+
+def big_number_digits(data: bytes, base: int) -> str:
+    """The older big number encoding, one digit at a time."""
+    value = int.from_bytes(data, "big")
+    digits = ""
+    while value > 0:
+        value, digit = divmod(value, base)
+        digits = codec.BASE_X_DIGITS[digit] + digits
+    return digits or "0"
+
+
+@pytest.mark.parametrize("base", range(2, 96))
+def test_block_round_trip_for_every_base(base):
+    block_bytes, block_digits, partial_bytes = codec.get_block_layout(base)
+    generator = random.Random(base)
+    for length in range(0, 3 * block_bytes + 2):
+        for data in (bytes(length), bytes([255]) * length, bytes(generator.randrange(256) for _ in range(length))):
+            encoded = codec.base_x_encode_binary(data, base)
+            assert set(encoded) <= set(codec.BASE_X_DIGITS[:base])
+            full_blocks, remaining = divmod(length, block_bytes)
+            assert len(encoded) == full_blocks * block_digits + next(
+                (digits for digits, byte_count in partial_bytes.items() if byte_count == remaining), 0
+            )
+            assert codec.base_x_decode_to_binary(encoded, base) == data
+
+
+@pytest.mark.parametrize("base", [2, 10, 16, 36, 62, 85, 94, 95])
+def test_legacy_round_trip(base):
+    generator = random.Random(base)
+    for length in range(1, 40):
+        data = bytes([generator.randrange(1, 256)]) + bytes(generator.randrange(256) for _ in range(length - 1))
+        encoded = codec.base_x_encode_binary(data, base, legacy=True)
+        assert encoded == big_number_digits(data, base)
+        assert codec.base_x_decode_to_binary(encoded, base, legacy=True) == data
+
+
+def test_invalid_input():
+    for base in (1, 96):
+        with pytest.raises(ValueError):
+            codec.get_block_layout(base)
+    with pytest.raises(ValueError):
+        codec.base_x_decode_to_binary("z", 16)
+    with pytest.raises(ValueError):
+        # A length no data can be encoded to
+        codec.base_x_decode_to_binary("0", 85)
+    with pytest.raises(ValueError):
+        codec.base_x_decode_to_binary("~~~~~", 85)
+
+
+def test_encode_decode():
+    for text in TEXTS:
+        encoded = codec.encode(text)
+        assert encoded.startswith(codec.BLOCK_FORMAT_PREFIX)
+        assert codec.decode(encoded) == text
+        assert codec.decode(encoded.encode()) == text
+
+
+def test_legacy_inputs_still_decode():
+    for text, encoded in LEGACY_ENCODED.items():
+        assert codec.decode(encoded) == text
+        assert codec.encode(text, legacy=True) == encoded
+
+
+def test_multi_segment_decode():
+    texts = ["first ", "", "second ✓", "third"]
+    assert codec.decode("".join(codec.encode(text) for text in texts)) == "".join(texts)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 13, 64])
+def test_incremental_codec_matches_whole_string(chunk_size):
+    text = TEXTS[4] + TEXTS[5]
+    chunks = [text[start:start + chunk_size] for start in range(0, len(text), chunk_size)]
+
+    encoder = codec.IncrementalEncoder()
+    encoded = b"".join(encoder.encode(chunk) for chunk in chunks) + encoder.encode("", final=True)
+    assert codec.decode(encoded) == text
+
+    for data in (encoded, codec.encode(text).encode()):
+        decoder = codec.IncrementalDecoder()
+        pieces = [decoder.decode(data[start:start + chunk_size]) for start in range(0, len(data), chunk_size)]
+        assert "".join(pieces) + decoder.decode(b"", final=True) == codec.decode(data) == text
+
+
+def test_incremental_decoder_reads_legacy_data():
+    for text, encoded in LEGACY_ENCODED.items():
+        decoder = codec.IncrementalDecoder()
+        pieces = [decoder.decode_text(encoded[start:start + 3]) for start in range(0, len(encoded), 3)]
+        assert "".join(pieces) + decoder.decode_text("", final=True) == text
+
+
+def test_codecs_lookup():
+    text = TEXTS[4]
+    assert text.encode("tge-codec").decode("tge_codec") == text
+    assert codec.decode(text.encode("tge_codec")) == text
+
+
+def test_streams():
+    text = TEXTS[4]
+    encoded = io.StringIO()
+    codec.encode_stream(io.StringIO(text), encoded, chunk_size=7)
+    decoded = io.StringIO()
+    codec.decode_stream(io.BytesIO(encoded.getvalue().encode()), decoded, chunk_size=11)
+    assert decoded.getvalue() == text
@@ -0,0 +1,131 @@
+import os
+
+import pytest
+
+from tge import directory_index, file_operations
+
+
+@pytest.fixture(params=[True, False], ids=["inotify", "polling"])
+def use_inotify(request):
+    if request.param and directory_index._load_inotify() is None:
+        pytest.skip("inotify is not available")
+    return request.param
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    contents = {
+        "a.txt": b"a" * 10,
+        "b.log": b"b" * 5000,
+        "1.txt": b"one",
+        "7.dat": b"seven" * 1000,
+        "12": b"",
+        "héllo ✓.txt": "non-ASCII name".encode(),
+        "sub/c.txt": b"c" * 4097,
+        "sub/10.txt": b"ten",
+        "sub/deeper/d.txt": b"d" * 123,
+        "sub/deeper/e.log": b"e",
+    }
+    for name, data in contents.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    (root / "empty").mkdir()
+    (root / "99").mkdir()
+    return str(root)
+
+
+def open_index(root, use_inotify):
+    index = directory_index.DirectoryIndex(root, ":memory:", poll_interval=3600, use_inotify=use_inotify)
+    return index.start()
+
+
+def settle(index):
+    """Makes the index follow the changes so far, the polling thread is too slow for a test."""
+    if index.mode == "polling":
+        index.refresh()
+
+
+def helper_answers(directory, manifest_path):
+    return {
+        "find_files_with_extension": [file_operations.find_files_with_extension(directory, extension) for extension in (".txt", ".log", "")],
+        "count_items_in_directory": file_operations.count_items_in_directory(directory),
+        "get_file_size_of_directory": [
+            file_operations.get_file_size_of_directory(directory),
+            file_operations.get_file_size_of_directory(directory, [".log"], chunk_size=1),
+        ],
+        "get_latest_file_in_directory_from_all_filenames_that_are_real_numbers": (
+            file_operations.get_latest_file_in_directory_from_all_filenames_that_are_real_numbers(directory)
+        ),
+        "generate_uuid_from_directory": file_operations.generate_uuid_from_directory(
+            directory, [".log"], incremental=True, manifest_path=manifest_path
+        ),
+    }
+
+
+def test_helpers_answer_the_same_with_and_without_the_index(tree, tmp_path, use_inotify):
+    directories = [tree, os.path.join(tree, "sub"), os.path.join(tree, "sub", "deeper"), os.path.join(tree, "empty")]
+    expected = {directory: helper_answers(directory, str(tmp_path / "without.json")) for directory in directories}
+    assert expected[tree]["get_latest_file_in_directory_from_all_filenames_that_are_real_numbers"] == "12"
+    assert expected[tree]["count_items_in_directory"] == 9
+
+    with open_index(tree, use_inotify) as index:
+        assert index.mode == ("inotify" if use_inotify else "polling")
+        for directory in directories:
+            assert directory_index.find_directory_index(directory) is index
+            assert helper_answers(directory, str(tmp_path / "with.json")) == expected[directory]
+        assert directory_index.find_directory_index(str(tmp_path)) is None
+    assert directory_index.find_directory_index(tree) is None
+
+
+def test_directory_changes_are_reflected(tree, tmp_path, use_inotify):
+    with open_index(tree, use_inotify) as index:
+        new = os.path.join(tree, "new")
+        os.makedirs(os.path.join(new, "inner"))
+        with open(os.path.join(new, "inner", "f.txt"), "wb") as f:
+            f.write(b"f" * 100)
+        with open(os.path.join(new, "5.txt"), "wb") as f:
+            f.write(b"five")
+        settle(index)
+        assert sorted(index.list_directory(new)) == ["5.txt", "inner"]
+        assert file_operations.count_items_in_directory(tree) == 10
+        assert file_operations.find_files_with_extension(new, ".txt") == [
+            os.path.join(new, "5.txt"),
+            os.path.join(new, "inner", "f.txt"),
+        ]
+        assert file_operations.get_latest_file_in_directory_from_all_filenames_that_are_real_numbers(new) == "5.txt"
+        assert file_operations.get_file_size_of_directory(new, chunk_size=1) == 104
+
+        renamed = os.path.join(tree, "sub", "renamed")
+        os.rename(new, renamed)
+        settle(index)
+        assert not index.covers(new)
+        assert directory_index.find_directory_index(new) is None
+        assert sorted(index.list_directory(renamed)) == ["5.txt", "inner"]
+        assert file_operations.find_files_with_extension(renamed, ".txt") == [
+            os.path.join(renamed, "5.txt"),
+            os.path.join(renamed, "inner", "f.txt"),
+        ]
+        assert file_operations.count_items_in_directory(tree) == 9
+        assert file_operations.get_file_size_of_directory(os.path.join(tree, "sub"), chunk_size=1) == 4097 + 3 + 123 + 1 + 104
+
+        # Followed in its new place
+        with open(os.path.join(renamed, "inner", "g.txt"), "wb") as f:
+            f.write(b"g")
+        settle(index)
+        assert index.count_items(os.path.join(renamed, "inner")) == 2
+
+        for path in (os.path.join(renamed, "inner", "f.txt"), os.path.join(renamed, "inner", "g.txt"), os.path.join(renamed, "5.txt")):
+            os.remove(path)
+        os.rmdir(os.path.join(renamed, "inner"))
+        os.rmdir(renamed)
+        os.rmdir(os.path.join(tree, "empty"))
+        settle(index)
+        assert not index.covers(renamed)
+        assert not index.covers(os.path.join(tree, "empty"))
+        assert sorted(index.list_directory(os.path.join(tree, "sub"))) == ["10.txt", "c.txt", "deeper"]
+        assert file_operations.count_items_in_directory(tree) == 8
+        indexed_answers = helper_answers(tree, str(tmp_path / "with.json"))
+
+    assert helper_answers(tree, str(tmp_path / "without.json")) == indexed_answers
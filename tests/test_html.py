@@ -0,0 +1,25 @@
+import html
+import io
+
+from tge.codec import html as tge_html
+
+
+def test_numeric_references_like_html_unescape():
+    numbers = list(range(0, 0x3000)) + list(range(0xD7F0, 0xE010)) + list(range(0xFDC0, 0x10000))
+    numbers += [plane + offset for plane in range(0x10000, 0x110000, 0x10000) for offset in (0, 0xFFFE, 0xFFFF)]
+    numbers += [0x10FFFF, 0x110000, 10**20]
+    for number in numbers:
+        for reference in (f"&#{number};", f"&#x{number:x};", f"&#X{number:X}"):
+            assert tge_html.decode(reference) == html.unescape(reference), reference
+
+
+def test_control_and_surrogate_references():
+    assert tge_html.decode("a&#0;b&#1;c&#x7F;d&#xD800;e&#13;f&#x80;g&#x81;h&#xFFFF;") == "a\uFFFDbcd\uFFFDe\rf\u20ACg\x81h"
+
+
+def test_decode_stream_with_references_cut_by_chunks():
+    text = "caf&eacute; &#x1F600; &#128; &#xDFFF; &copy2024 &amp&lt;p&gt;" * 50
+    for chunk_size in (1, 3, 7):
+        decoded = io.StringIO()
+        tge_html.decode_stream(io.StringIO(text), decoded, chunk_size=chunk_size)
+        assert decoded.getvalue() == html.unescape(text)
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from tge.codec import json as tge_json
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def same_named_configs(tmp_path):
+    for directory, value in [("a", 1), ("b", 2), (os.path.join("b", "c"), 3)]:
+        write(str(tmp_path / "in" / directory / "config.json"), f'{{"value": {value}}}')
+    return tmp_path
+
+
+def converted_layout(outputs, output_directory):
+    return {os.path.relpath(output, output_directory) for output in outputs.values()}
+
+
+def test_glob_keeps_the_layout_below_its_root(same_named_configs):
+    output_directory = str(same_named_configs / "out")
+    pattern = os.path.join(str(same_named_configs / "in"), "**", "*.json")
+    outputs = tge_json.convert_files(pattern, "json5", output_directory, workers=1)
+    assert converted_layout(outputs, output_directory) == {
+        os.path.join("a", "config.json5"), os.path.join("b", "config.json5"), os.path.join("b", "c", "config.json5")
+    }
+    assert "3" in read(os.path.join(output_directory, "b", "c", "config.json5"))
+
+
+def test_list_keeps_the_layout_below_the_common_directory(same_named_configs):
+    output_directory = str(same_named_configs / "out")
+    paths = [str(same_named_configs / "in" / directory / "config.json") for directory in ("a", "b")]
+    outputs = tge_json.convert_files(paths, "hjson", output_directory, workers=1)
+    assert converted_layout(outputs, output_directory) == {
+        os.path.join("a", "config.hjson"), os.path.join("b", "config.hjson")
+    }
+
+
+def test_output_collisions_raise_before_writing(tmp_path):
+    write(str(tmp_path / "in" / "config.json"), "{}")
+    write(str(tmp_path / "in" / "config.hjson"), "{}")
+    output_directory = str(tmp_path / "out")
+    with pytest.raises(ValueError, match="would both be converted"):
+        tge_json.convert_files(str(tmp_path / "in"), "json5", output_directory, source_format="json", workers=1)
+    assert not os.path.exists(output_directory)
+    # Converting next to the inputs would overwrite config.json
+    with pytest.raises(ValueError, match="would both be converted"):
+        tge_json.convert_files(str(tmp_path / "in"), "json", workers=1)
+
+
+def test_conversion_cache_evicts_the_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setenv("TGE_CACHE_DIR", str(tmp_path / "cache"))
+    cache_directory = str(tmp_path / "cache" / "json_conversions")
+    paths = []
+    for index in range(4):
+        paths.append(str(tmp_path / "in" / f"{index}.json"))
+        write(paths[-1], f'{{"value": {index}}}')
+    tge_json.convert_files(paths, "json5", str(tmp_path / "out"), workers=1)
+    entries = sorted(os.path.join(cache_directory, entry) for entry in os.listdir(cache_directory))
+    assert len(entries) == 4
+    for age, entry in enumerate(entries):
+        os.utime(entry, ns=(age * 10**9, age * 10**9))
+    # A cache hit makes its entry the most recently used
+    first = read(entries[0])
+    hit = [path for path in paths if tge_json.convert(read(path), "json", "json5") == first]
+    tge_json.convert_files(hit, "json5", str(tmp_path / "again"), workers=1)
+
+    total = sum(os.path.getsize(entry) for entry in entries)
+    tge_json._evict_conversion_cache(cache_directory, max_bytes=total - 1)
+    assert sorted(os.path.join(cache_directory, entry) for entry in os.listdir(cache_directory)) == [
+        entries[0], entries[2], entries[3]
+    ]
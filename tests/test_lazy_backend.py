@@ -0,0 +1,20 @@
+from tge.system_interactions.shared import LazyBackend
+
+
+def test_factory_runs_once_even_when_it_returns_none():
+    calls = []
+    backend = LazyBackend(lambda: calls.append(1))
+    assert not backend.is_initialized()
+    assert backend.get() is None
+    assert backend.get() is None
+    assert calls == [1]
+    assert backend.is_initialized()
+
+
+def test_reset_creates_the_backend_again():
+    backend = LazyBackend(object)
+    first = backend.get()
+    assert backend.get() is first
+    backend.reset()
+    assert not backend.is_initialized()
+    assert backend.get() is not first
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_in_fresh_interpreter(code: str, tmp_path) -> str:
+    """Runs code in a new interpreter, so the import order is the one of the test."""
+    env = dict(os.environ, PYTHONPATH=ROOT, TGE_CACHE_DIR=str(tmp_path))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, cwd=ROOT)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip().splitlines()[-1]
+
+
+@pytest.mark.parametrize(
+    "sibling, alias, target",
+    [
+        ("geometry_calculations", "math_functions", "tge.math_functions.math_functions"),
+        ("file_operations", "codec", "tge.codec.codec"),
+        ("validation", "validation", "tge.validation.validation"),
+    ],
+)
+def test_alias_survives_sibling_submodule_import(sibling, alias, target, tmp_path):
+    code = f"import tge; tge.{sibling}; print(tge.{alias}.__name__)"
+    assert run_in_fresh_interpreter(code, tmp_path) == target
+
+
+@pytest.mark.parametrize(
+    "statement, alias, target",
+    [
+        ("import tge.math_functions.statistics_calculations", "math_functions", "tge.math_functions.math_functions"),
+        ("from tge.codec import json", "codec", "tge.codec.codec"),
+    ],
+)
+def test_alias_survives_explicit_submodule_import(statement, alias, target, tmp_path):
+    code = f"{statement}; import tge; print(tge.{alias}.__name__)"
+    assert run_in_fresh_interpreter(code, tmp_path) == target
+
+
+def test_codec_alias_functions_after_file_operations(tmp_path):
+    code = "import tge; tge.file_operations; print(tge.codec.decode(tge.codec.encode('hello')))"
+    assert run_in_fresh_interpreter(code, tmp_path) == "hello"
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="the Xlib backend is only used on Linux")
+def test_linux_keyboard_backend_does_not_import_xlib(tmp_path):
+    code = (
+        "import sys; from tge.system_interactions import keyboard_operations; "
+        "print(sorted(name for name in sys.modules if name.split('.')[0] == 'Xlib'))"
+    )
+    assert run_in_fresh_interpreter(code, tmp_path) == "[]"
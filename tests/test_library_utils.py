@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tge import library_utils
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("contents", ["[]", "null", "3", '"text"', '{"probe": "yes"}', "{broken"])
+def test_load_cached_capabilities_ignores_a_malformed_cache(contents, tmp_path, monkeypatch):
+    monkeypatch.setenv("TGE_CACHE_DIR", str(tmp_path))
+    cache_path = library_utils.get_capability_cache_path()
+    with open(cache_path, "w", encoding="utf8") as f:
+        f.write(contents)
+    calls = []
+    probes = {"probe": lambda: calls.append(1) or True}
+    assert library_utils.load_cached_capabilities(probes) == {"probe": True}
+    assert calls == [1]
+    with open(cache_path, "r", encoding="utf8") as f:
+        assert json.load(f) == {"probe": True}
+    # Read back from the cache this time
+    assert library_utils.load_cached_capabilities(probes) == {"probe": True}
+    assert calls == [1]
+
+
+def test_import_with_a_malformed_capability_cache(tmp_path):
+    env = dict(os.environ, PYTHONPATH=ROOT, TGE_CACHE_DIR=str(tmp_path))
+    code = "from tge import library_utils; print(library_utils.get_capability_cache_path())"
+    cache_path = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, cwd=ROOT, check=True)
+    with open(cache_path.stdout.strip().splitlines()[-1], "w", encoding="utf8") as f:
+        f.write("[]")
+    result = subprocess.run([sys.executable, "-c", "import tge"], capture_output=True, text=True, env=env, cwd=ROOT)
+    assert result.returncode == 0, result.stderr
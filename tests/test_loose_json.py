@@ -0,0 +1,52 @@
+import pytest
+
+from tge.codec import json as tge_json
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        # Decoded the same way by the older splitting parser
+        ('["x\\"y", 01, -2.5, true, {"k,v": [null]}]', ['x\\"y', 1, -2.5, True, {"k,v": [None]}]),
+        (' \n{"a": {"b": []}, "c": {}}\t', {"a": {"b": []}, "c": {}}),
+        ("[[1], [2, [3]]]", [[1], [2, [3]]]),
+        ('{1: "one", null: "none"}', {1: "one", None: "none"}),
+        ('"[{,:}]"', "[{,:}]"),
+        # Split at the colon by the older parser
+        ('{"a:b": 1}', {"a:b": 1}),
+    ],
+)
+def test_loose_decode_json(text, expected):
+    assert tge_json.loose_decode_json(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # Taken by the older parser, see loose_decode_json
+        '"a" "b"',
+        '"',
+        '["a" "b"]',
+        "[1, 2}",
+        '{"a": 1]',
+        "[",
+        "[1",
+        # Rejected by both
+        "",
+        "[1,]",
+        "[1 2]",
+        '{"a" 1}',
+        "1e5",
+        "[1]]",
+    ],
+)
+def test_loose_decode_json_rejects(text):
+    with pytest.raises(ValueError):
+        tge_json.loose_decode_json(text)
+
+
+def test_iter_tokens_across_chunks():
+    text = '{"key": [1.25, -30, "a\\"b, c", true, null], "other": false}'
+    expected = list(tge_json.iter_tokens([text]))
+    for size in range(1, 8):
+        assert list(tge_json.iter_tokens(text[start:start + size] for start in range(0, len(text), size))) == expected
@@ -0,0 +1,41 @@
+import io
+
+from tge.codec import morse
+
+
+def test_encode_stream_multi_line_text():
+    text = "sos\nhelp me\tnow\r\nend\n" * 2000
+    dst = io.StringIO()
+    morse.encode_stream(io.StringIO(text), dst, chunk_size=37)
+    assert dst.getvalue() == morse.encode(text)
+    # Every whitespace character separates words like a space
+    assert morse.decode(dst.getvalue()) == text.replace("\n", " ").replace("\t", " ").replace("\r", " ")
+
+
+def test_encode_stream_binary_round_trip():
+    text = "first line\nsecond line\n"
+    encoded = io.BytesIO()
+    morse.encode_stream(io.BytesIO(text.encode()), encoded, chunk_size=4)
+    decoded = io.StringIO()
+    morse.decode_stream(io.BytesIO(encoded.getvalue()), decoded, chunk_size=3)
+    assert decoded.getvalue() == "first line second line "
+
+
+def test_encode_and_iter_timings_accept_the_same_characters():
+    for message in ["a\nb", "a\tb", "a b", "sos\r\n", "  x  "]:
+        morse.encode(message)
+        list(morse.iter_timings(message))
+    for message in ["a#b", "~", "a\x00"]:
+        for function in (morse.encode, lambda message: list(morse.iter_timings(message))):
+            try:
+                function(message)
+            except ValueError:
+                continue
+            raise AssertionError(f"{message!r} was accepted")
+
+
+def test_iter_timings_word_gap_for_any_whitespace():
+    unit = 60 / (50 * 20)
+    for separator in [" ", "\n", "\t", " \r\n "]:
+        timings = list(morse.iter_timings(f"e{separator}e"))
+        assert timings == [(True, unit), (False, 7 * unit), (True, unit)]
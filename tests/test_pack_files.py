@@ -0,0 +1,108 @@
+import json
+import os
+import struct
+
+import pytest
+
+from tge import file_operations
+
+
+@pytest.fixture
+def source_directory(tmp_path):
+    directory = tmp_path / "source"
+    (directory / "nested").mkdir(parents=True)
+    contents = {
+        "big.bin": os.urandom(300_000),
+        "empty.txt": b"",
+        "text.txt": "héllo\n".encode() * 1000,
+        "nested/inner.dat": b"\x00" * 5000,
+        "nested/empty": b"",
+    }
+    for name, data in contents.items():
+        (directory / name).write_bytes(data)
+    return str(directory), contents
+
+
+@pytest.mark.parametrize("compression_level", [0, 6])
+def test_pack_round_trip(source_directory, tmp_path, compression_level):
+    directory, contents = source_directory
+    pack_path = str(tmp_path / "files.pack")
+    index = file_operations.pack_files(directory, pack_path, compression_level, recursive=True, chunk_size=4096)
+
+    assert file_operations.read_pack_index(pack_path) == index
+    assert sorted(entry["name"] for entry in index) == sorted(contents)
+    for entry in index:
+        assert entry["size"] == len(contents[entry["name"]])
+        assert file_operations.extract_pack_member(pack_path, entry["name"], chunk_size=1000) == contents[entry["name"]]
+    output_path = str(tmp_path / "big.out")
+    assert file_operations.extract_pack_member(pack_path, "big.bin", output_path) is None
+    with open(output_path, "rb") as f:
+        assert f.read() == contents["big.bin"]
+    with pytest.raises(KeyError):
+        file_operations.extract_pack_member(pack_path, "missing")
+
+
+def test_pack_without_recursion_and_split_file(source_directory, tmp_path):
+    directory, contents = source_directory
+    assert file_operations.combine_files(directory, str(tmp_path), "files", compression_level=1)
+    pack_path = str(tmp_path / "files.encrypted")
+    assert sorted(entry["name"] for entry in file_operations.read_pack_index(pack_path)) == ["big.bin", "empty.txt", "text.txt"]
+    assert file_operations.split_file(pack_path, str(tmp_path / "split"))
+    for name in ("big.bin", "empty.txt", "text.txt"):
+        with open(tmp_path / "split" / name, "rb") as f:
+            assert f.read() == contents[name]
+
+
+def test_pack_of_empty_members_only(tmp_path):
+    (tmp_path / "source").mkdir()
+    (tmp_path / "source" / "a").write_bytes(b"")
+    (tmp_path / "source" / "b").write_bytes(b"")
+    pack_path = str(tmp_path / "empty.pack")
+    for compression_level in (0, 9):
+        file_operations.pack_files(str(tmp_path / "source"), pack_path, compression_level)
+        assert file_operations.extract_pack_member(pack_path, "a") == b""
+        assert file_operations.extract_pack_member(pack_path, "b") == b""
+
+
+def test_truncated_or_corrupt_pack_raises_value_error(source_directory, tmp_path):
+    directory, _ = source_directory
+    pack_path = str(tmp_path / "files.pack")
+    file_operations.pack_files(directory, pack_path, 6)
+    with open(pack_path, "rb") as f:
+        data = f.read()
+    magic, index_offset, index_length = struct.unpack("<8sQQ", data[:24])
+
+    def corrupt(new_data):
+        broken_path = str(tmp_path / "broken.pack")
+        with open(broken_path, "wb") as f:
+            f.write(new_data)
+        return broken_path
+
+    broken_packs = [
+        data[:10],
+        b"NOTAPACK" + data[8:],
+        data[:-5],
+        data[:index_offset],
+        data[:index_offset] + b"{" * index_length,
+        data[:8] + struct.pack("<QQ", 3, index_length) + data[24:],
+    ]
+    for index in (
+        {"name": "x"},
+        [{"name": "x", "offset": 24, "length": 10, "size": 10, "crc32": 0, "compression": "lzma"}],
+        [{"name": "x", "offset": 24, "length": index_offset, "size": 10, "crc32": 0, "compression": None}],
+        [{"name": "x", "offset": -1, "length": 1, "size": 1, "crc32": 0, "compression": None}],
+    ):
+        encoded = json.dumps(index).encode()
+        broken_packs.append(magic + struct.pack("<QQ", index_offset, len(encoded)) + data[24:index_offset] + encoded)
+    for broken in broken_packs:
+        with pytest.raises(ValueError):
+            file_operations.read_pack_index(corrupt(broken))
+        with pytest.raises(ValueError):
+            file_operations.extract_pack_member(corrupt(broken), "big.bin")
+
+    # Damaged member data fails its checksum or decompression
+    entry = next(entry for entry in file_operations.read_pack_index(pack_path) if entry["name"] == "text.txt")
+    position = entry["offset"] + entry["length"] // 2
+    damaged = data[:position] + bytes([data[position] ^ 0xFF]) + data[position + 1:]
+    with pytest.raises(ValueError):
+        file_operations.extract_pack_member(corrupt(damaged), "text.txt")
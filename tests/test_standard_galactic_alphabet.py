@@ -0,0 +1,47 @@
+import io
+import random
+import string
+
+from tge.codec import standard_galactic_alphabet as sga
+
+# Plain text, the code points of the glyphs and some other non-ASCII characters, to be mixed at random
+ALPHABET = string.printable + "".join(sorted(set("".join(sga.DECODING_TABLE)))) + "éß€😀̸̣"
+
+
+def random_texts(count: int = 300, seed: int = 0):
+    generator = random.Random(seed)
+    for _ in range(count):
+        text = "".join(generator.choices(ALPHABET, k=generator.randrange(0, 60)))
+        yield "".join(char for char in text if char not in sga.AMBIGUOUS_CHARACTERS)
+
+
+def test_round_trip():
+    for text in random_texts():
+        assert sga.decode(sga.encode(text)) == text
+
+
+def test_round_trip_of_the_table():
+    letters = "".join(sga.ENCODING_TABLE)
+    assert sga.decode(sga.encode(letters)) == letters
+    # Upper case "X" is the glyph of 6
+    text = letters.upper().replace("X", "") + " \n" + letters
+    assert sga.decode(sga.encode(text)) == text
+
+
+def test_stream_round_trip():
+    for chunk_size, text in zip([1, 2, 3, 5, 8], random_texts(count=5, seed=1)):
+        text *= 20
+        encoded = io.StringIO()
+        sga.encode_stream(io.StringIO(text), encoded, chunk_size=chunk_size)
+        assert encoded.getvalue() == sga.encode(text)
+        decoded = io.StringIO()
+        sga.decode_stream(io.StringIO(encoded.getvalue()), decoded, chunk_size=chunk_size)
+        assert decoded.getvalue() == text
+
+
+def test_ambiguous_characters_are_lossy():
+    assert sga.decode(sga.encode(">")) == "3"
+    assert sga.decode(sga.encode("|:")) == "l"
+    assert sga.decode(sga.encode("┌┐")) == "9"
+    for char in set(string.printable) - sga.AMBIGUOUS_CHARACTERS:
+        assert sga.decode(sga.encode(char)) == char
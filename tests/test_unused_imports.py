@@ -0,0 +1,103 @@
+import textwrap
+
+import pytest
+
+from tge import unused_imports
+
+
+def clean(code, **options):
+    return unused_imports.remove_unused_libraries(textwrap.dedent(code), **options)
+
+
+def test_find_unused_names():
+    code = textwrap.dedent(
+        """\
+        import os
+        import sys, json
+        from typing import List, Dict
+
+        def f(x: List[int]) -> None:
+            unused = 1
+            print(sys.argv, x)
+        """
+    )
+    unused_imports_by_line, unused_variables = unused_imports.find_unused_names(code)
+    assert unused_imports_by_line == {1: ["os"], 2: ["json"], 3: ["typing.Dict"]}
+    assert unused_variables == [6]
+
+
+def test_only_standard_library_imports_are_removed_by_default():
+    code = """\
+        import os
+        import requests
+        from . import sibling
+        """
+    assert clean(code) == "import requests\nfrom . import sibling\n"
+    assert clean(code, remove_all_unused_imports=True) == ""
+
+
+def test_names_in_all_strings_and_comments_are_kept():
+    code = """\
+        import os
+        import json  # kept for plugins
+        from typing import TYPE_CHECKING
+        __all__ = ["os"]
+
+        def f() -> "TYPE_CHECKING":
+            pass
+        """
+    assert clean(code) == textwrap.dedent(code)
+
+
+def test_blocks_left_empty_get_a_pass():
+    code = """\
+        if DEBUG:
+            import json
+
+        def f():
+            result = g()
+            return 1
+        """
+    assert clean(code) == textwrap.dedent(
+        """\
+        if DEBUG:
+            pass
+
+        def f():
+            g()
+            return 1
+        """
+    )
+
+
+def test_parenthesized_imports_keep_their_layout():
+    code = """\
+        from os.path import (
+            join,
+            exists,
+            split,
+        )
+        print(join, split)
+        """
+    assert clean(code) == "from os.path import (\n    join,\n    split,\n)\nprint(join, split)\n"
+
+
+def test_unparsable_and_skipped_code_is_unchanged():
+    assert clean("import os\ndef broken(:\n") == "import os\ndef broken(:\n"
+    assert clean("# autoflake: skip_file\nimport os\n") == "# autoflake: skip_file\nimport os\n"
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import os, sys\nprint(sys)\n",
+        "def f():\n    x = 1\n    y = [2]\n    return y\n",
+        "try:\n    pass\nexcept ValueError as error:\n    pass\n",
+        "import os.path\nimport os\nos.getcwd()\n",
+        "from typing import Any, cast\nv = cast('Any', 1)\n",
+    ],
+)
+def test_same_result_as_autoflake(code):
+    autoflake = pytest.importorskip("autoflake")
+    expected = autoflake.fix_code(code, remove_unused_variables=True)
+    assert unused_imports.remove_unused_libraries(code) == expected
@@ -0,0 +1,88 @@
+import os
+import random
+import zipfile
+
+import pytest
+
+from tge import file_operations
+
+
+@pytest.fixture
+def source_directory(tmp_path):
+    generator = random.Random(0)
+    block_size = file_operations.ZIP_BLOCK_SIZE
+    contents = {
+        # Compressible and incompressible parts, so blocks deflate differently and reference the previous one
+        "big.txt": b"the quick brown fox jumps over the lazy dog\n" * (block_size // 20)
+        + bytes(generator.randrange(256) for _ in range(100_000)),
+        "image.png": bytes(generator.randrange(256) for _ in range(5000)),
+        "empty": b"",
+        "héllo wörld ✓.txt": "non-ASCII name\n".encode() * 50,
+        "nested/deeper/small.txt": b"small",
+    }
+    directory = tmp_path / "source"
+    for name, data in contents.items():
+        path = directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    assert len(contents["big.txt"]) > 2 * block_size
+    return str(directory), contents
+
+
+@pytest.mark.parametrize("compression_level", [6, 0])
+def test_zip_round_trip(source_directory, tmp_path, compression_level):
+    directory, contents = source_directory
+    zip_path = str(tmp_path / "archive.zip")
+    progress = []
+    assert file_operations.zip_directory(
+        directory, zip_path, compression_level=compression_level, progress=lambda done, total: progress.append((done, total)), workers=3
+    ) == (True, True)
+    total = sum(map(len, contents.values()))
+    assert progress[-1] == (total, total)
+
+    with zipfile.ZipFile(zip_path) as archive:
+        assert archive.testzip() is None
+        members = {member.filename: member for member in archive.infolist()}
+        assert set(members) == set(contents)
+        for name, data in contents.items():
+            assert archive.read(name) == data
+            assert members[name].file_size == len(data)
+        assert members["image.png"].compress_type == zipfile.ZIP_STORED
+        expected_method = zipfile.ZIP_DEFLATED if compression_level else zipfile.ZIP_STORED
+        assert members["big.txt"].compress_type == expected_method
+        if compression_level:
+            assert members["big.txt"].compress_size < members["big.txt"].file_size // 2
+        assert members["héllo wörld ✓.txt"].flag_bits & 0x800
+
+    extract_directory = str(tmp_path / "extracted")
+    assert file_operations.unzip_file(zip_path, extract_directory, True, workers=2) == (True, True)
+    for name, data in contents.items():
+        with open(os.path.join(extract_directory, *name.split("/")), "rb") as f:
+            assert f.read() == data
+
+
+def test_cancelled_zip_leaves_no_output(source_directory, tmp_path):
+    directory, _ = source_directory
+    zip_path = str(tmp_path / "cancelled.zip")
+    calls = []
+
+    def progress(done, total):
+        calls.append(done)
+        return False if len(calls) == 2 else None
+
+    assert file_operations.zip_directory(directory, zip_path, progress=progress, workers=2) == (False, True)
+    assert len(calls) == 2
+    assert not os.path.exists(zip_path)
+
+
+def test_cancelled_unzip(source_directory, tmp_path):
+    directory, _ = source_directory
+    zip_path = str(tmp_path / "archive.zip")
+    assert file_operations.zip_directory(directory, zip_path) == (True, True)
+    extract_directory = str(tmp_path / "extracted")
+    assert file_operations.unzip_file(zip_path, extract_directory, True, progress=lambda done, total: False) == (False, True)
+
+
+def test_zip_invalid_arguments():
+    assert file_operations.zip_directory("", "out.zip") == (False, False)
+    assert file_operations.unzip_file("archive.zip", "") == (False, False)
@@ -24,10 +24,13 @@ __doc__ = "https://github.com/Miner3DGaming/TGE/blob/main/README.MD"
 
 
 import sys
-from typing import Literal
+from typing import Literal, List, Dict, Callable
+from functools import partial
+from types import ModuleType
 import subprocess
 import shutil
-import requests
+import importlib
+import importlib.util
 import os
 
 
@@ -38,6 +41,8 @@ def is_tge_outdated() -> bool:
     Returns:
         bool: True if the local file is outdated, False otherwise.
     """
+    import requests
+
     response = requests.get(
         "https://github.com/Miner3DGaming/TGE/raw/main/tge/update.hashed"
     )
@@ -120,6 +125,8 @@ from . import library_utils
 __all__ = [
     "library_utils",
     "is_ffmpeg_installed",
+    "refresh_capabilities",
+    "startup_report",
     "get_system",
     "is_tge_outdated",
     "__name__",
@@ -131,191 +138,301 @@ __all__ = [
 ]
 
 
+# Capability name -> probe, results are cached per environment by library_utils.load_cached_capabilities
+CAPABILITY_PROBES: Dict[str, Callable[[], bool]] = {"ffmpeg": is_ffmpeg_installed}
+for _library in [
+    "pygame",
+    "numpy",
+    "json5",
+    "hjson",
+    "python_minifier",
+    "pytube",
+    "PIL",
+    "gtts",
+    "pyperclip",
+    "pynput",
+    "Xlib",
+    "Quartz",
+    "AppKit",
+    "simpleaudio",
+    "yt_dlp",
+]:
+    CAPABILITY_PROBES[_library] = partial(library_utils.is_library_installed, _library)
+del _library
+
+
+def refresh_capabilities() -> Dict[str, bool]:
+    """
+    Runs every capability probe (FFmpeg and the optional libraries) again and rewrites the capability cache.
+
+    Which submodules get exposed is decided while importing, so changes show up on the next import of tge.
+
+    Returns:
+        Dict[str, bool]: Capability names mapped to whether they are available.
+    """
+    return library_utils.load_cached_capabilities(CAPABILITY_PROBES, refresh=True)
+
+
+def startup_report(
+    package: str = __package__, load_submodules: bool = True
+) -> Dict[str, List[dict]]:
+    """
+    Measures the import cost of `package` (e.g. "tge" or "minified_tge") in a fresh interpreter,
+    like `python -X importtime` does, but returns the numbers instead of printing them.
+
+    Args:
+        package (str): Name of the package to measure. Defaults to this package.
+        load_submodules (bool): Also load every submodule listed in `__all__`, even if lazy imports are enabled.
+
+    Returns:
+        Dict[str, List[dict]]:
+        - "package": Every module of the package.
+        - "third_party": Third-party modules imported directly by the package, including the cost of their own imports.
+        - "modules": Every imported module in import order.
+
+        Every entry has the keys "module", "self", "cumulative", "depth", "imported_by" and "kind", times are in seconds.
+        The first two lists are sorted by cumulative time, slowest first.
+    """
+    entries = library_utils.get_import_times(package, load_submodules)
+
+    def by_cumulative(entry: dict) -> float:
+        return entry["cumulative"]
+
+    kinds = {entry["module"]: entry["kind"] for entry in entries}
+    return {
+        "package": sorted(
+            [entry for entry in entries if entry["kind"] == "package"],
+            key=by_cumulative,
+            reverse=True,
+        ),
+        "third_party": sorted(
+            [
+                entry
+                for entry in entries
+                if entry["kind"] == "third_party"
+                and kinds.get(entry["imported_by"]) == "package"
+            ],
+            key=by_cumulative,
+            reverse=True,
+        ),
+        "modules": entries,
+    }
+
+
+lazy_imports = os.getenv("TGE_LAZY_IMPORTS", "True") != "False"
+
+# Public alias -> submodule it stands for, relative to this package
+SUBMODULE_ALIASES = {
+    "string_utils": ".manipulation.string_utils",
+    "list_utils": ".manipulation.list_utils",
+    "dict_utils": ".manipulation.dictionary_utils",
+    "expansions": ".manipulation.expansions",
+    "tge_pygame": ".compatibility.tge_pygame",
+    "tge_tkinter": ".compatibility.tge_tkinter",
+    "binary_conversion": ".conversion.binary",
+    "temperature_conversion": ".conversion.temperature",
+    "time_conversion": ".conversion.time",
+    "units_conversion": ".conversion.units",
+    "data_conversion": ".conversion.data",
+    "financial_calculations": ".math_functions.financial_calculations",
+    "geometry_calculations": ".math_functions.geometry_calculations",
+    "math_functions": ".math_functions.math_functions",
+    "statistics_calculations": ".math_functions.statistics_calculations",
+    "clipboard": ".system_interactions.clipboard_operations",
+    "cursor": ".system_interactions.cursor_operations",
+    "keyboard": ".system_interactions.keyboard_operations",
+    "window_manager": ".system_interactions.window_manager",
+    "validation": ".validation.validation",
+    "codec": ".codec.codec",
+    "console": ".console_utils",
+    "random": ".random_generators",
+    "internet": ".internet",
+    "tbe": ".tbe",
+    "time_utils": ".time_utils",
+    "file_operations": ".file_operations",
+    "formatting": ".formatting_utils",
+    "bool_operations": ".bool_operations",
+    "image_operations": ".image_processing.image_operations",
+    "function_utils": ".function_utils",
+    "audio": ".audio",
+}
+
+
+def _import_submodule(alias: str) -> ModuleType:
+    "Imports the submodule behind `alias` and binds it as a module attribute"
+    module = importlib.import_module(SUBMODULE_ALIASES[alias], __package__)
+    globals()[alias] = module
+    return module
+
+
+def _is_shadowed_subpackage(name: str, value: object) -> bool:
+    "Whether `value` is the subpackage `name` where an exposed alias of the same name stands for one of its modules"
+    return (
+        name in __all__
+        and SUBMODULE_ALIASES.get(name, f".{name}") != f".{name}"
+        and isinstance(value, ModuleType)
+        and value.__name__ == f"{__package__}.{name}"
+    )
+
+
+class _PackageModule(ModuleType):
+    """
+    Importing a submodule binds its package as an attribute of the parent, so the first import of anything in
+    tge.codec, tge.math_functions or tge.validation would replace the aliases of the same name for good.
+    Those bindings are dropped, leaving the aliases to __getattr__ whatever the import order.
+    """
+
+    def __setattr__(self, name: str, value: object) -> None:
+        if not _is_shadowed_subpackage(name, value):
+            super().__setattr__(name, value)
+
+
+sys.modules[__package__].__class__ = _PackageModule
+
+
+def _expose(*aliases: str) -> None:
+    "Adds the aliases to `__all__` and imports them right away unless lazy imports are enabled"
+    __all__.extend(aliases)
+    for alias in aliases:
+        # Subpackages imported before the alias was exposed
+        if _is_shadowed_subpackage(alias, globals().get(alias)):
+            del globals()[alias]
+    if not lazy_imports:
+        for alias in aliases:
+            _import_submodule(alias)
+
+
+def __getattr__(name: str) -> ModuleType:
+    """
+    Resolves exposed submodule aliases (e.g. `tge.console`) and plain subpackages
+    (e.g. `tge.conversion`) on first access when lazy imports are enabled.
+    """
+    if name in SUBMODULE_ALIASES:
+        if name in __all__:
+            return _import_submodule(name)
+    elif not name.startswith("__") and importlib.util.find_spec(
+        f"{__package__}.{name}"
+    ):
+        return importlib.import_module(f".{name}", __package__)
+    raise AttributeError(f"module {__package__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
 if assured_libraries:
-    __all__.extend(
-        [
-            "string_utils",
-            "list_utils",
-            "dict_utils",
-            "expansions",
-            "tge_pygame",
-            "tge_tkinter",
-            "binary_conversion",
-            "temperature_conversion",
-            "time_conversion",
-            "units_conversion",
-            "data_conversion",
-            "financial_calculations",
-            "geometry_calculations",
-            "math_functions",
-            "statistics_calculations",
-            "clipboard",
-            "cursor",
-            "keyboard",
-            "window_manager",
-            "validation",
-            "codec",
-            "console",
-            "random",
-            "internet",
-            "tbe",
-            "time_utils",
-            "file_operations",
-            "formatting",
-            "bool_operations",
-            "image_operations",
-            "function_utils",
-        ]
+    _expose(
+        "string_utils",
+        "list_utils",
+        "dict_utils",
+        "expansions",
+        "tge_pygame",
+        "tge_tkinter",
+        "binary_conversion",
+        "temperature_conversion",
+        "time_conversion",
+        "units_conversion",
+        "data_conversion",
+        "financial_calculations",
+        "geometry_calculations",
+        "math_functions",
+        "statistics_calculations",
+        "clipboard",
+        "cursor",
+        "keyboard",
+        "window_manager",
+        "validation",
+        "codec",
+        "console",
+        "random",
+        "internet",
+        "tbe",
+        "time_utils",
+        "file_operations",
+        "formatting",
+        "bool_operations",
+        "image_operations",
+        "function_utils",
     )
-    from .manipulation import string_utils
-    from .manipulation import list_utils
-    from .manipulation import dictionary_utils as dict_utils
-    from .manipulation import expansions
-
-    from .compatibility import tge_pygame
-    from .compatibility import tge_tkinter
-
-    from .conversion import binary as binary_conversion
-    from .conversion import temperature as temperature_conversion
-    from .conversion import time as time_conversion
-    from .conversion import units as units_conversion
-    from .conversion import data as data_conversion
-
-    from .math_functions import financial_calculations
-    from .math_functions import geometry_calculations
-    from .math_functions import math_functions
-    from .math_functions import statistics_calculations
-
-    from .system_interactions import clipboard_operations as clipboard
-    from .system_interactions import cursor_operations as cursor
-    from .system_interactions import keyboard_operations as keyboard
-    from .system_interactions import window_manager
-
-    from .validation import validation
-    from .codec import codec
-
-    from . import console_utils as console
-    from . import random_generators as random
-    from . import internet
-    from . import tbe
-    from . import time_utils
-    from . import file_operations
-    from . import formatting_utils as formatting
-    from . import bool_operations
-    from .image_processing import image_operations
-    from . import function_utils
-
-    if is_ffmpeg_installed():
-        from . import audio
-
-        __all__.append("audio")
+
+    if library_utils.load_cached_capabilities({"ffmpeg": is_ffmpeg_installed})["ffmpeg"]:
+        _expose("audio")
 else:
-    pygame_installed = library_utils.is_library_installed("pygame")
-    numpy_installed = library_utils.is_library_installed("numpy")
-    json5_installed = library_utils.is_library_installed("json5")
-    hjson_installed = library_utils.is_library_installed("hjson")
-    python_minifier_installed = library_utils.is_library_installed("python_minifier")
-    pytube_installed = library_utils.is_library_installed("pytube")
-    pillow_installed = library_utils.is_library_installed("PIL")
-    gtts_installed = library_utils.is_library_installed("gtts")
-    pyperclip_installed = library_utils.is_library_installed("pyperclip")
-    pynput_installed = library_utils.is_library_installed("pynput")
-    xlib_installed = library_utils.is_library_installed("Xlib")
-    quartz_installed = library_utils.is_library_installed("Quartz")
-    appKit_installed = library_utils.is_library_installed("AppKit")
-    simpleaudio_installed = library_utils.is_library_installed("simpleaudio")
-    yt_dlp_installed = library_utils.is_library_installed("yt_dlp")
-
-    __all__.extend(
-        [
-            "string_utils",
-            "list_utils",
-            "dict_utils",
-            "expansions",
-            "binary_conversion",
-            "temperature_conversion",
-            "time_conversion",
-            "units_conversion",
-            "data_conversion",
-            "tge_tkinter",
-            "financial_calculations",
-            "geometry_calculations",
-            "function_utils",
-            "time_utils",
-            "formatting",
-            "bool_operations",
-            "validation",
-        ]
+    capabilities = library_utils.load_cached_capabilities(CAPABILITY_PROBES)
+    pygame_installed = capabilities["pygame"]
+    numpy_installed = capabilities["numpy"]
+    json5_installed = capabilities["json5"]
+    hjson_installed = capabilities["hjson"]
+    python_minifier_installed = capabilities["python_minifier"]
+    pytube_installed = capabilities["pytube"]
+    pillow_installed = capabilities["PIL"]
+    gtts_installed = capabilities["gtts"]
+    pyperclip_installed = capabilities["pyperclip"]
+    pynput_installed = capabilities["pynput"]
+    xlib_installed = capabilities["Xlib"]
+    quartz_installed = capabilities["Quartz"]
+    appKit_installed = capabilities["AppKit"]
+    simpleaudio_installed = capabilities["simpleaudio"]
+    yt_dlp_installed = capabilities["yt_dlp"]
+
+    _expose(
+        "string_utils",
+        "list_utils",
+        "dict_utils",
+        "expansions",
+        "tge_tkinter",
+        "binary_conversion",
+        "temperature_conversion",
+        "time_conversion",
+        "units_conversion",
+        "data_conversion",
+        "financial_calculations",
+        "geometry_calculations",
+        "validation",
+        "time_utils",
+        "formatting",
+        "bool_operations",
+        "function_utils",
     )
-    from .manipulation import string_utils
-    from .manipulation import list_utils
-    from .manipulation import dictionary_utils as dict_utils
-    from .manipulation import expansions
-    from .compatibility import tge_tkinter
-    from .conversion import binary as binary_conversion
-    from .conversion import temperature as temperature_conversion
-    from .conversion import time as time_conversion
-    from .conversion import units as units_conversion
-    from .conversion import data as data_conversion
-    from .math_functions import financial_calculations
-    from .math_functions import geometry_calculations
-    from .validation import validation
-    from . import time_utils
-    from . import formatting_utils as formatting
-    from . import bool_operations
-    from . import function_utils
 
     if pygame_installed:
-        __all__.extend(["tge_pygame"])
-        from .compatibility import tge_pygame
+        _expose("tge_pygame")
 
     if numpy_installed:
-        __all__.extend(["math_functions", "statistics_calculations"])
-        from .math_functions import math_functions
-        from .math_functions import statistics_calculations
+        _expose("math_functions", "statistics_calculations")
 
     if SYSTEM_NAME == "windows" or pyperclip_installed:
-        __all__.append("clipboard")
-        from .system_interactions import clipboard_operations as clipboard
-    
+        _expose("clipboard")
+
     if SYSTEM_NAME == "windows" or pynput_installed:
-        __all__.append("cursor")
-        from .system_interactions import cursor_operations as cursor
-    
+        _expose("cursor")
+
     if SYSTEM_NAME == "windows" or xlib_installed:
-        __all__.append("keyboard")
-        from .system_interactions import keyboard_operations as keyboard
-    
+        _expose("keyboard")
+
     if (
         SYSTEM_NAME == "windows"
         or SYSTEM_NAME == "linux"
         or (quartz_installed and appKit_installed)
     ):
-        __all__.append("window_manager")
-        from .system_interactions import window_manager
+        _expose("window_manager")
 
     if json5_installed and hjson_installed:
-        __all__.extend(["codec", "random", "file_operations"])
-        from .codec import codec
-        from . import random_generators as random
-        from . import file_operations
+        _expose("codec", "random", "file_operations")
 
     if python_minifier_installed:
-        __all__.extend(["tbe", "console_utils"])
-        from . import tbe
-        from . import console_utils as console
+        _expose("tbe", "console")
+
     if pytube_installed and yt_dlp_installed:
-        __all__.append("internet")
-        from . import internet
+        _expose("internet")
 
     if pillow_installed and numpy_installed:
-        __all__.append("image_processing")
-        from .image_processing import image_operations
+        _expose("image_operations")
 
     if gtts_installed and simpleaudio_installed:
-        if is_ffmpeg_installed():
-            __all__.append("audio")
-            from . import audio
+        if capabilities["ffmpeg"]:
+            _expose("audio")
 
     if assured_libraries is None:
         if not pygame_installed:
@@ -1,8 +1,10 @@
+import codecs
 from binascii import hexlify, unhexlify, Error as BinasciiError
 from typing import List, Union, Tuple, Any
 
 
 
+from . import streaming
 from . import msy
 from . import morse
 from . import html
@@ -19,86 +21,314 @@ html, json
 
 
 
-def base_x_encode_binary(binary_data:bytes, base:int) -> str:
-    decimal_value = int.from_bytes(binary_data, byteorder='big')
+BASE_X_DIGITS = """0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~ """
+BASE_X_DIGIT_VALUES = {char: index for index, char in enumerate(BASE_X_DIGITS)}
+BLOCK_FORMAT_PREFIX = "~"
 
-    if base < 2 or base > 95:
-        raise ValueError("Base must be between 2 and 95 included")
-
-    digits = """0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!"#$%&'()*+,-./:;<=>?@[\]^_`{|}~ """
-    result = ""
+_BLOCK_LAYOUTS = {}
 
-    while decimal_value > 0:
-        result = digits[decimal_value % base] + result
-        decimal_value //= base
 
-    return result or "0"
-
-def base_x_decode_to_binary(data_in_base_x:str, base:int) -> bytes:
+def _check_base(base: int) -> None:
     if base < 2 or base > 95:
         raise ValueError("Base must be between 2 and 95 included")
 
-    digits = """0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!"#$%&'()*+,-./:;<=>?@[\]^_`{|}~ """
-    digit_map = {char: index for index, char in enumerate(digits)}
 
-    decimal_value = 0
-    for char in data_in_base_x:
-        if char not in digit_map:
-            raise ValueError(f"Invalid character {char} for base {base}")
-        decimal_value = decimal_value * base + digit_map[char]
+def get_block_layout(base: int) -> Tuple[int, int, dict]:
+    """
+    Returns how the block codec splits data for a base, computed once per base.
 
-    binary_data = decimal_value.to_bytes((decimal_value.bit_length() + 7) // 8, byteorder='big')
+    Args:
+        base (int): The base, between 2 and 95.
 
-    return binary_data
+    Returns:
+        Tuple[int, int, dict]: The bytes per block, the digits per block, and the number of bytes for each
+            length of a shorter final digit group.
+    """
+    layout = _BLOCK_LAYOUTS.get(base)
+    if layout is None:
+        _check_base(base)
+
+        def digits_needed(byte_count: int) -> int:
+            digit_count, limit = 0, 1
+            while limit < 256 ** byte_count:
+                digit_count += 1
+                limit *= base
+            return digit_count
+
+        # The group size with the fewest digits per byte wins, like 4 bytes to 5 digits for base 85
+        block_bytes = min(range(1, 17), key=lambda byte_count: digits_needed(byte_count) / byte_count)
+        partial_bytes = {digits_needed(byte_count): byte_count for byte_count in range(1, block_bytes)}
+        layout = _BLOCK_LAYOUTS[base] = (block_bytes, digits_needed(block_bytes), partial_bytes)
+    return layout
+
+
+_BYTE_TABLES = {}
+
+
+def _get_byte_table(base: int) -> List[str]:
+    """The digit group of every byte value, for bases that encode one byte per group."""
+    table = _BYTE_TABLES.get(base)
+    if table is None:
+        block_digits = get_block_layout(base)[1]
+        table = []
+        for value in range(256):
+            group = []
+            for _ in range(block_digits):
+                value, digit = divmod(value, base)
+                group.append(BASE_X_DIGITS[digit])
+            table.append("".join(reversed(group)))
+        _BYTE_TABLES[base] = table
+    return table
+
+
+def _legacy_encode_binary(binary_data: bytes, base: int) -> str:
+    """The original big integer conversion, leading zero bytes get lost."""
+    value = int.from_bytes(binary_data, byteorder='big')
+    # Peel off as many digits at once as fit in one machine word, which keeps every big division a fast one
+    digits_per_step = 1
+    while base ** (digits_per_step + 1) < 2 ** 30:
+        digits_per_step += 1
+    step = base ** digits_per_step
+
+    chunks = []
+    while value >= step:
+        value, chunk = divmod(value, step)
+        for _ in range(digits_per_step):
+            chunk, digit = divmod(chunk, base)
+            chunks.append(BASE_X_DIGITS[digit])
+    while value > 0:
+        value, digit = divmod(value, base)
+        chunks.append(BASE_X_DIGITS[digit])
+
+    return "".join(reversed(chunks)) or "0"
+
+
+def _legacy_decode_to_binary(data_in_base_x: str, base: int) -> bytes:
+    digits_per_step = 1
+    while base ** (digits_per_step + 1) < 2 ** 30:
+        digits_per_step += 1
+
+    if not data_in_base_x:
+        return b""
+    first_step = len(data_in_base_x) % digits_per_step or digits_per_step
+    chunks = [data_in_base_x[:first_step]] + [
+        data_in_base_x[start:start + digits_per_step] for start in range(first_step, len(data_in_base_x), digits_per_step)
+    ]
+    step = base ** digits_per_step
 
+    decimal_value = 0
+    for chunk in chunks:
+        chunk_value = 0
+        for char in chunk:
+            digit = BASE_X_DIGIT_VALUES.get(char, base)
+            if digit >= base:
+                raise ValueError(f"Invalid character {char} for base {base}")
+            chunk_value = chunk_value * base + digit
+        decimal_value = decimal_value * (step if len(chunk) == digits_per_step else base ** len(chunk)) + chunk_value
 
+    return decimal_value.to_bytes((decimal_value.bit_length() + 7) // 8, byteorder='big')
 
 
+def base_x_encode_binary(binary_data:bytes, base:int, legacy: bool = False) -> str:
+    """
+    Encodes bytes with the digits of a base between 2 and 95, in linear time.
 
+    The data is split into fixed size byte groups which each become a fixed width digit group, like base85
+    (4 bytes to 5 digits) and a shorter group for the remaining bytes, so leading zero bytes are kept.
 
+    Args:
+        binary_data (bytes): The data to encode.
+        base (int): The base to use, between 2 and 95.
+        legacy (bool, optional): Encode the whole data as one big number like older versions did, which is
+            quadratic and drops leading zero bytes. Defaults to False.
 
-def encode(x: str) -> str:
+    Returns:
+        str: The encoded data.
     """
-    Encode a string using base64 and hexadecimal encoding.
+    _check_base(base)
+    if legacy:
+        return _legacy_encode_binary(binary_data, base)
+
+    block_bytes, block_digits, partial_bytes = get_block_layout(base)
+    digits = BASE_X_DIGITS
+    from_bytes = int.from_bytes
+    binary_data = bytes(binary_data)
+    full_length = len(binary_data) - len(binary_data) % block_bytes
+
+    if block_bytes == 1:
+        # Bases like 2 and 16 have one byte per group, a table lookup per byte beats any arithmetic
+        return "".join(map(_get_byte_table(base).__getitem__, binary_data))
+
+    result = []
+    for start in range(0, full_length, block_bytes):
+        value = from_bytes(binary_data[start:start + block_bytes], 'big')
+        group = [None] * block_digits
+        for index in range(block_digits - 1, -1, -1):
+            value, group[index] = divmod(value, base)
+        result.append("".join([digits[digit] for digit in group]))
+
+    remaining = len(binary_data) - full_length
+    if remaining:
+        value = from_bytes(binary_data[full_length:], 'big')
+        group_digits = next(length for length, byte_count in partial_bytes.items() if byte_count == remaining)
+        group = [None] * group_digits
+        for index in range(group_digits - 1, -1, -1):
+            value, group[index] = divmod(value, base)
+        result.append("".join([digits[digit] for digit in group]))
+
+    return "".join(result)
+
+
+def base_x_decode_to_binary(data_in_base_x:str, base:int, legacy: bool = False) -> bytes:
+    """
+    Decodes data made by base_x_encode_binary back into bytes.
 
     Args:
-        x (str): The string to be encoded.
+        data_in_base_x (str): The encoded data, bytes are read as ASCII.
+        base (int): The base it was encoded with, between 2 and 95.
+        legacy (bool, optional): Decode data from the big number encoding of older versions. Defaults to False.
 
     Returns:
-        Tuple[bool, Union[str, bytes]]: A tuple containing a boolean value indicating whether
-            the encoding was successful or not, and either the encoded string or an error message
-            if the encoding failed.
-    """
-    x = base_x_encode_binary(x.encode(), 95)
-    x = hexlify(x.encode()).decode("utf8")
-    return x
-
+        bytes: The decoded data.
 
-def decode(data: str) -> str:
+    Raises:
+        ValueError: If the data contains characters outside of the base or isn't validly grouped.
     """
-    Decodes a string from hexadecimal and base64 encoding.
+    _check_base(base)
+    if isinstance(data_in_base_x, (bytes, bytearray, memoryview)):
+        data_in_base_x = bytes(data_in_base_x).decode("latin-1")
+    if legacy:
+        return _legacy_decode_to_binary(data_in_base_x, base)
+
+    block_bytes, block_digits, partial_bytes = get_block_layout(base)
+    values = BASE_X_DIGIT_VALUES
+    full_length = len(data_in_base_x) - len(data_in_base_x) % block_digits
+    remaining = len(data_in_base_x) - full_length
+    if remaining and remaining not in partial_bytes:
+        raise ValueError(f"Invalid length {len(data_in_base_x)} for base {base}")
+
+    if block_bytes == 1:
+        byte_values = {group: value for value, group in enumerate(_get_byte_table(base))}
+        try:
+            return bytes([byte_values[data_in_base_x[start:start + block_digits]] for start in range(0, len(data_in_base_x), block_digits)])
+        except KeyError as error:
+            raise ValueError(f"Invalid digit group {error.args[0]} for base {base}") from None
+
+    result = bytearray()
+    for start in range(0, len(data_in_base_x), block_digits):
+        group = data_in_base_x[start:start + block_digits]
+        byte_count = block_bytes if len(group) == block_digits else partial_bytes[len(group)]
+        value = 0
+        for char in group:
+            digit = values.get(char, base)
+            if digit >= base:
+                raise ValueError(f"Invalid character {char} for base {base}")
+            value = value * base + digit
+        try:
+            result += value.to_bytes(byte_count, 'big')
+        except OverflowError:
+            raise ValueError(f"Invalid digit group {group} for base {base}") from None
+
+    return bytes(result)
+
+
+def encode(x: str, legacy: bool = False) -> str:
+    """
+    Encode a string using base 95 and hexadecimal encoding.
 
     Args:
-        data (str): A string to decode.
+        x (str): The string to be encoded.
+        legacy (bool, optional): Produce the big number encoding of older versions instead of the block
+            encoding, which is marked with a leading BLOCK_FORMAT_PREFIX. Defaults to False.
 
     Returns:
-        A tuple containing a boolean indicating whether the decoding was successful and
-        the decoded string if successful, or an error message if unsuccessful.
+        str: The encoded string.
     """
-    data = unhexlify(data)
-    decoded_data = base_x_decode_to_binary(data, 95).decode("utf8")
-    return decoded_data
-
-
+    encoded = hexlify(base_x_encode_binary(x.encode(), 95, legacy).encode()).decode("utf8")
+    return encoded if legacy else BLOCK_FORMAT_PREFIX + encoded
 
 
+def decode(data: Union[str, bytes]) -> str:
+    """
+    Decodes a string made by encode, in either the block or the older big number encoding.
 
+    Streams encode each chunk on its own, so block encoded data may be several prefixed segments.
 
+    Args:
+        data (Union[str, bytes]): A string to decode.
 
+    Returns:
+        str: The decoded string.
+    """
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode("ascii")
+    if not data.startswith(BLOCK_FORMAT_PREFIX):
+        return base_x_decode_to_binary(unhexlify(data), 95, True).decode("utf8")
+    segments = data.split(BLOCK_FORMAT_PREFIX)[1:]
+    return b"".join([base_x_decode_to_binary(unhexlify(segment), 95) for segment in segments]).decode("utf8")
+
+
+class IncrementalEncoder(streaming.IncrementalEncoder):
+    def _buffer_encode(self, input: str, errors: str, final: bool) -> tuple:
+        # Each chunk becomes a segment of its own, so nothing is ever held back
+        return (encode(input) if input else ""), len(input)
+
+
+class IncrementalDecoder(streaming.IncrementalDecoder):
+    def reset(self) -> None:
+        super().reset()
+        self._legacy = None
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")(self.errors)
+
+    def _buffer_decode(self, input: str, errors: str, final: bool) -> tuple:
+        if self._legacy is None:
+            if not input:
+                return "", 0
+            self._legacy = not input.startswith(BLOCK_FORMAT_PREFIX)
+        if self._legacy:
+            # One big number, which can only be decoded once it is all there
+            if not final:
+                return "", 0
+            return base_x_decode_to_binary(unhexlify(input), 95, True).decode("utf8"), len(input)
+
+        # The text before the first prefix continues the segment of the previous chunk, all but the last segment
+        # are complete, and the last one is decoded up to its last full digit group
+        segments = input.split(BLOCK_FORMAT_PREFIX)
+        group_length = 2 * get_block_layout(95)[1]
+        last = segments.pop()
+        decodable = len(last) if final else len(last) - len(last) % group_length
+        segments.append(last[:decodable])
+        binary_data = b"".join([base_x_decode_to_binary(unhexlify(segment), 95) for segment in segments])
+        return self._text_decoder.decode(binary_data, final), len(input) - len(last) + decodable
+
+
+def encode_stream(src: Any, dst: Any, chunk_size: int = streaming.DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Encodes a text or binary file object like encode, one chunk at a time.
 
+    Args:
+        src (Any): The file object to read.
+        dst (Any): The file object to write the encoded text to.
+        chunk_size (int, optional): How much to read at once. Defaults to streaming.DEFAULT_CHUNK_SIZE.
 
+    Returns:
+        int: The number of characters written.
+    """
+    return streaming.transform_stream(src, dst, IncrementalEncoder().encode_text, chunk_size)
 
 
+def decode_stream(src: Any, dst: Any, chunk_size: int = streaming.DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Decodes a text or binary file object made by encode or encode_stream, one chunk at a time.
 
+    Data in the older big number encoding can only be decoded whole, so it is held in memory.
 
+    Args:
+        src (Any): The file object to read the encoded text from.
+        dst (Any): The file object to write the decoded text to.
+        chunk_size (int, optional): How much to read at once. Defaults to streaming.DEFAULT_CHUNK_SIZE.
 
+    Returns:
+        int: The number of characters written.
+    """
+    return streaming.transform_stream(src, dst, IncrementalDecoder().decode_text, chunk_size)
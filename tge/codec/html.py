@@ -1,11 +1,65 @@
 import re
+from html.entities import html5
+from typing import Any, Iterable, List
+
+from . import streaming
+
+
+# Every HTML5 named entity, like "amp;" -> "&", including the legacy ones that also work without a ;
+NAMED_ENTITIES = html5
+# How HTML5 (and html.unescape) replaces the numeric references to NUL, carriage return and the C1 controls, which
+# point into windows-1252 rather than Unicode like browsers read them (but the 5 code points windows-1252 leaves out)
+INVALID_REFERENCES = {
+    0x00: "\uFFFD",
+    0x0D: "\r",
+    **{
+        number: chr(number) if number in (0x81, 0x8D, 0x8F, 0x90, 0x9D) else bytes([number]).decode("cp1252")
+        for number in range(0x80, 0xA0)
+    },
+}
+# The control characters and noncharacters whose numeric references are dropped
+INVALID_CODE_POINTS = frozenset(
+    [*range(0x01, 0x09), 0x0B, *range(0x0E, 0x20), *range(0x7F, 0xA0), *range(0xFDD0, 0xFDF0)]
+    + [plane + end for plane in range(0, 0x110000, 0x10000) for end in (0xFFFE, 0xFFFF)]
+)
+
+_ENTITY = re.compile(r"&(?:#([0-9]+);?|#[xX]([0-9a-fA-F]+);?|([^\t\n\f <&#;]{1,%d};?))" % max(map(len, NAMED_ENTITIES)))
+
+# Longer runs after an & can't be the start of a named entity, so streams never hold back more than this
+MAX_ENTITY_LENGTH = max(map(len, NAMED_ENTITIES)) + 1
+
+
+def _decode_entity(match: re.Match) -> str:
+    decimal, hexadecimal, name = match.groups()
+    if name is None:
+        number = int(decimal) if decimal is not None else int(hexadecimal, 16)
+        if number in INVALID_REFERENCES:
+            return INVALID_REFERENCES[number]
+        if 0xD800 <= number <= 0xDFFF or number > 0x10FFFF:
+            return "\uFFFD"
+        if number in INVALID_CODE_POINTS:
+            return ""
+        return chr(number)
+
+    character = NAMED_ENTITIES.get(name)
+    if character is not None:
+        return character
+    # A legacy entity without its ; like &copy2024, the longest one that fits wins
+    for end in range(len(name) - 1, 1, -1):
+        character = NAMED_ENTITIES.get(name[:end])
+        if character is not None:
+            return character + name[end:]
+    return match.group(0)
+
+
 def decode(text: str) -> str:
     """
     Decode HTML-encoded characters in the given text.
 
-    This function takes a string containing HTML-encoded characters and replaces them
-    with their corresponding decoded characters. It supports a predefined set of special
-    HTML-encoded characters.
+    Every HTML5 named entity is supported, as well as decimal (&#233;) and hexadecimal (&#x1F600;) references,
+    all replaced in a single pass. Unknown entities are left as they are. Like html.unescape, references to
+    surrogates and beyond U+10FFFF become U+FFFD, the C1 controls are read as windows-1252 and the other control
+    characters and noncharacters are dropped.
 
     Args:
         text (str): The input text containing HTML-encoded characters.
@@ -13,377 +67,210 @@ def decode(text: str) -> str:
     Returns:
         str: The input text with HTML-encoded characters replaced by their decoded counterparts.
     """
-    special_encoding = [
-        "&Agrave;",
-        "&Aacute;",
-        "&Acirc;",
-        "&Atilde;",
-        "&Auml;",
-        "&Aring;",
-        "&agrave;",
-        "&aacute;",
-        "&acirc;",
-        "&atilde;",
-        "&auml;",
-        " &aring;",
-        "&AElig;",
-        "&aelig;",
-        "&szlig;",
-        "&Ccedil;",
-        "&ccedil;",
-        "&Egrave;",
-        "&Eacute;",
-        "&Ecirc;",
-        "&Euml;",
-        "&egrave;",
-        "&eacute;",
-        "&ecirc;",
-        "&euml;",
-        "&#131;",
-        "&Igrave;",
-        "&Iacute;",
-        "&Icirc;",
-        "&Iuml;",
-        "&igrave;",
-        "&iacute;",
-        "&icirc;",
-        "&iuml;",
-        "&Ntilde;",
-        "&ntilde;",
-        "&Ograve;",
-        "&Oacute;",
-        "&Ocirc;",
-        "&Otilde;",
-        "&Ouml;",
-        "&ograve;",
-        "&oacute;",
-        "&ocirc;",
-        "&otilde;",
-        "&ouml;",
-        "&Oslash;",
-        "&oslash;",
-        "&#140;",
-        "&#156;",
-        "&#138;",
-        "&#154;",
-        "&Ugrave;",
-        "&Uacute;",
-        "&Ucirc;",
-        "&Uuml;",
-        "&ugrave;",
-        "&uacute;",
-        "&ucirc;",
-        "&uuml;",
-        "&#181;",
-        "&#215;",
-        "&Yacute;",
-        "&#159;",
-        "&yacute;",
-        "&yuml;",
-        "&#176;",
-        "&#134;",
-        "&#135;",
-        "&lt;",
-        "&gt;",
-        "&#177;",
-        "&#171;",
-        "&#187;",
-        "&#191;",
-        "&#161;",
-        "&#183;",
-        "&#149;",
-        "&#153;",
-        "&copy;",
-        "&reg;",
-        "&#167;",
-        "&#182;",
-    ]
-    special_character = [
-        "À",
-        "Á",
-        "Â",
-        "Ã",
-        "Ä",
-        "Å",
-        "à",
-        "á",
-        "â",
-        "ã",
-        "ä",
-        "å",
-        "Æ",
-        "æ",
-        "ß",
-        "Ç",
-        "ç",
-        "È",
-        "É",
-        "Ê",
-        "Ë",
-        "è",
-        "é",
-        "ê",
-        "ë",
-        "ƒ",
-        "Ì",
-        "Í",
-        "Î",
-        "Ï",
-        "ì",
-        "í",
-        "î",
-        "ï",
-        "Ñ",
-        "ñ",
-        "Ò",
-        "Ó",
-        "Ô",
-        "Õ",
-        "Ö",
-        "ò",
-        "ó",
-        "ô",
-        "õ",
-        "ö",
-        "Ø",
-        "ø",
-        "Œ",
-        "œ",
-        "Š",
-        "š",
-        "Ù",
-        "Ú",
-        "Û",
-        "Ü",
-        "ù",
-        "ú",
-        "û",
-        "ü",
-        "µ",
-        "×",
-        "Ý",
-        "Ÿ",
-        "ý",
-        "ÿ",
-        "°",
-        "†",
-        "‡",
-        "<",
-        ">",
-        "±",
-        "«",
-        "»",
-        "¿",
-        "¡",
-        "·",
-        "•",
-        "™",
-        "©",
-        "®",
-        "§",
-        "¶",
-    ]
-
-    # Use regex to find HTML-encoded characters within the text
-    encoded_chars = re.findall("&\w+;", text)
-
-    # Iterate over the found encoded characters and replace them with decoded counterparts
-    for encoded_char in encoded_chars:
-        if encoded_char in special_encoding:
-            index = special_encoding.index(encoded_char)
-            decoded_char = special_character[index]
-            text = text.replace(encoded_char, decoded_char)
+    if "&" not in text:
+        return text
+    return _ENTITY.sub(_decode_entity, text)
 
-    return text
 
+def decode_many(texts: Iterable[str]) -> List[str]:
+    """
+    Decodes the HTML-encoded characters of many texts, see decode.
+
+    Args:
+        texts (Iterable[str]): The texts to decode.
 
-def encode(text: str) -> str:
+    Returns:
+        List[str]: The decoded texts, in the same order.
+    """
+    substitute = _ENTITY.sub
+    return [substitute(_decode_entity, text) if "&" in text else text for text in texts]
+
+
+# What encode replaces, in one pass with the translation tables made from it
+SPECIAL_CHARACTERS = {
+    "À": "&Agrave;",
+    "Á": "&Aacute;",
+    "Â": "&Acirc;",
+    "Ã": "&Atilde;",
+    "Ä": "&Auml;",
+    "Å": "&Aring;",
+    "à": "&agrave;",
+    "á": "&aacute;",
+    "â": "&acirc;",
+    "ã": "&atilde;",
+    "ä": "&auml;",
+    "å": "&aring;",
+    "Æ": "&AElig;",
+    "æ": "&aelig;",
+    "ß": "&szlig;",
+    "Ç": "&Ccedil;",
+    "ç": "&ccedil;",
+    "È": "&Egrave;",
+    "É": "&Eacute;",
+    "Ê": "&Ecirc;",
+    "Ë": "&Euml;",
+    "è": "&egrave;",
+    "é": "&eacute;",
+    "ê": "&ecirc;",
+    "ë": "&euml;",
+    "ƒ": "&#131;",
+    "Ì": "&Igrave;",
+    "Í": "&Iacute;",
+    "Î": "&Icirc;",
+    "Ï": "&Iuml;",
+    "ì": "&igrave;",
+    "í": "&iacute;",
+    "î": "&icirc;",
+    "ï": "&iuml;",
+    "Ñ": "&Ntilde;",
+    "ñ": "&ntilde;",
+    "Ò": "&Ograve;",
+    "Ó": "&Oacute;",
+    "Ô": "&Ocirc;",
+    "Õ": "&Otilde;",
+    "Ö": "&Ouml;",
+    "ò": "&ograve;",
+    "ó": "&oacute;",
+    "ô": "&ocirc;",
+    "õ": "&otilde;",
+    "ö": "&ouml;",
+    "Ø": "&Oslash;",
+    "ø": "&oslash;",
+    "Œ": "&#140;",
+    "œ": "&#156;",
+    "Š": "&#138;",
+    "š": "&#154;",
+    "Ù": "&Ugrave;",
+    "Ú": "&Uacute;",
+    "Û": "&Ucirc;",
+    "Ü": "&Uuml;",
+    "ù": "&ugrave;",
+    "ú": "&uacute;",
+    "û": "&ucirc;",
+    "ü": "&uuml;",
+    "µ": "&#181;",
+    "×": "&#215;",
+    "Ý": "&Yacute;",
+    "Ÿ": "&#159;",
+    "ý": "&yacute;",
+    "ÿ": "&yuml;",
+    "°": "&#176;",
+    "†": "&#134;",
+    "‡": "&#135;",
+    "<": "&lt;",
+    ">": "&gt;",
+    "±": "&#177;",
+    "«": "&#171;",
+    "»": "&#187;",
+    "¿": "&#191;",
+    "¡": "&#161;",
+    "·": "&#183;",
+    "•": "&#149;",
+    "™": "&#153;",
+    "©": "&copy;",
+    "®": "&reg;",
+    "§": "&#167;",
+    "¶": "&#182;",
+}
+MARKUP_ESCAPES = {"&": "&amp;"}
+QUOTE_ESCAPES = {'"': "&quot;", "'": "&#x27;"}
+
+_ENCODING_TABLES = {}
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def _get_encoding_table(escape: bool, quote: bool) -> dict:
+    table = _ENCODING_TABLES.get((escape, quote))
+    if table is None:
+        table = _ENCODING_TABLES[escape, quote] = str.maketrans({
+            **SPECIAL_CHARACTERS, **(MARKUP_ESCAPES if escape else {}), **(QUOTE_ESCAPES if quote else {})
+        })
+    return table
+
+
+def _encode_numeric_reference(match: re.Match) -> str:
+    return f"&#{ord(match.group())};"
+
+
+def encode(text: str, escape: bool = False, quote: bool = False, ascii_only: bool = False) -> str:
     """
     Encodes special characters in the input text into their corresponding HTML character entities.
 
-    This function takes a string as input and replaces specific special characters with their equivalent
-    HTML character entity codes. The conversion includes characters like accented letters, symbols, and
-    other non-standard characters commonly used in text.
+    The special characters (accented letters, symbols and < >, see SPECIAL_CHARACTERS) are replaced in a single
+    pass with a translation table.
 
     Args:
         text (str): The input text containing special characters to be encoded.
+        escape (bool, optional): Also encode &, so the result decodes back to the same text. Defaults to False.
+        quote (bool, optional): Also encode " and ', for use in attribute values. Defaults to False.
+        ascii_only (bool, optional): Encode every other non-ASCII character as a numeric reference, like &#8364;.
+            Defaults to False.
 
     Returns:
         str: The input text with special characters replaced by their corresponding HTML character entities.
     """
-    special_encoding = [
-        "&Agrave;",
-        "&Aacute;",
-        "&Acirc;",
-        "&Atilde;",
-        "&Auml;",
-        "&Aring;",
-        "&agrave;",
-        "&aacute;",
-        "&acirc;",
-        "&atilde;",
-        "&auml;",
-        " &aring;",
-        "&AElig;",
-        "&aelig;",
-        "&szlig;",
-        "&Ccedil;",
-        "&ccedil;",
-        "&Egrave;",
-        "&Eacute;",
-        "&Ecirc;",
-        "&Euml;",
-        "&egrave;",
-        "&eacute;",
-        "&ecirc;",
-        "&euml;",
-        "&#131;",
-        "&Igrave;",
-        "&Iacute;",
-        "&Icirc;",
-        "&Iuml;",
-        "&igrave;",
-        "&iacute;",
-        "&icirc;",
-        "&iuml;",
-        "&Ntilde;",
-        "&ntilde;",
-        "&Ograve;",
-        "&Oacute;",
-        "&Ocirc;",
-        "&Otilde;",
-        "&Ouml;",
-        "&ograve;",
-        "&oacute;",
-        "&ocirc;",
-        "&otilde;",
-        "&ouml;",
-        "&Oslash;",
-        "&oslash;",
-        "&#140;",
-        "&#156;",
-        "&#138;",
-        "&#154;",
-        "&Ugrave;",
-        "&Uacute;",
-        "&Ucirc;",
-        "&Uuml;",
-        "&ugrave;",
-        "&uacute;",
-        "&ucirc;",
-        "&uuml;",
-        "&#181;",
-        "&#215;",
-        "&Yacute;",
-        "&#159;",
-        "&yacute;",
-        "&yuml;",
-        "&#176;",
-        "&#134;",
-        "&#135;",
-        "&lt;",
-        "&gt;",
-        "&#177;",
-        "&#171;",
-        "&#187;",
-        "&#191;",
-        "&#161;",
-        "&#183;",
-        "&#149;",
-        "&#153;",
-        "&copy;",
-        "&reg;",
-        "&#167;",
-        "&#182;",
-    ]
-    special_character = [
-        "À",
-        "Á",
-        "Â",
-        "Ã",
-        "Ä",
-        "Å",
-        "à",
-        "á",
-        "â",
-        "ã",
-        "ä",
-        "å",
-        "Æ",
-        "æ",
-        "ß",
-        "Ç",
-        "ç",
-        "È",
-        "É",
-        "Ê",
-        "Ë",
-        "è",
-        "é",
-        "ê",
-        "ë",
-        "ƒ",
-        "Ì",
-        "Í",
-        "Î",
-        "Ï",
-        "ì",
-        "í",
-        "î",
-        "ï",
-        "Ñ",
-        "ñ",
-        "Ò",
-        "Ó",
-        "Ô",
-        "Õ",
-        "Ö",
-        "ò",
-        "ó",
-        "ô",
-        "õ",
-        "ö",
-        "Ø",
-        "ø",
-        "Œ",
-        "œ",
-        "Š",
-        "š",
-        "Ù",
-        "Ú",
-        "Û",
-        "Ü",
-        "ù",
-        "ú",
-        "û",
-        "ü",
-        "µ",
-        "×",
-        "Ý",
-        "Ÿ",
-        "ý",
-        "ÿ",
-        "°",
-        "†",
-        "‡",
-        "<",
-        ">",
-        "±",
-        "«",
-        "»",
-        "¿",
-        "¡",
-        "·",
-        "•",
-        "™",
-        "©",
-        "®",
-        "§",
-        "¶",
-    ]
-
-    # Iterate over the special characters and replace them with their encoded counterparts
-    for encoding, character in zip(special_encoding, special_character):
-        text = text.replace(character, encoding)
-
+    text = text.translate(_get_encoding_table(escape, quote))
+    if ascii_only and not text.isascii():
+        text = _NON_ASCII.sub(_encode_numeric_reference, text)
     return text
+
+
+class IncrementalEncoder(streaming.IncrementalEncoder):
+    def _buffer_encode(self, input: str, errors: str, final: bool) -> tuple:
+        return encode(input), len(input)
+
+
+class IncrementalDecoder(streaming.IncrementalDecoder):
+    def _buffer_decode(self, input: str, errors: str, final: bool) -> tuple:
+        consumed = len(input)
+        if not final:
+            # Keep an entity cut by the chunk boundary until its ; arrives
+            start = input.rfind("&", max(0, consumed - MAX_ENTITY_LENGTH))
+            if start != -1 and ";" not in input[start:]:
+                consumed = start
+        return decode(input[:consumed]), consumed
+
+
+def encode_stream(
+    src: Any,
+    dst: Any,
+    chunk_size: int = streaming.DEFAULT_CHUNK_SIZE,
+    escape: bool = False,
+    quote: bool = False,
+    ascii_only: bool = False,
+) -> int:
+    """
+    Encodes special characters of a text or binary file object into HTML entities, one chunk at a time.
+
+    Args:
+        src (Any): The file object to read.
+        dst (Any): The file object to write the encoded text to.
+        chunk_size (int, optional): How much to read at once. Defaults to streaming.DEFAULT_CHUNK_SIZE.
+        escape (bool, optional): Also encode &, see encode. Defaults to False.
+        quote (bool, optional): Also encode " and ', see encode. Defaults to False.
+        ascii_only (bool, optional): Encode every other non-ASCII character as a numeric reference, see encode.
+            Defaults to False.
+
+    Returns:
+        int: The number of characters written.
+    """
+    # Every character is encoded on its own, so chunks need no special care
+    def encode_chunk(text: str, final: bool) -> str:
+        return encode(text, escape, quote, ascii_only)
+
+    return streaming.transform_stream(src, dst, encode_chunk, chunk_size)
+
+
+def decode_stream(src: Any, dst: Any, chunk_size: int = streaming.DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Decodes the HTML entities of a text or binary file object, one chunk at a time.
+
+    Args:
+        src (Any): The file object to read the encoded text from.
+        dst (Any): The file object to write the decoded text to.
+        chunk_size (int, optional): How much to read at once. Defaults to streaming.DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        int: The number of characters written.
+    """
+    return streaming.transform_stream(src, dst, IncrementalDecoder().decode_text, chunk_size)
@@ -1,234 +1,657 @@
+import glob
+import hashlib
+import io
 import json
 import json5
 import hjson
+import mmap
+import os
 import re
+import shutil
+import timeit
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from . import streaming
+
+
+FORMAT_EXTENSIONS = {"json": ".json", "json5": ".json5", "hjson": ".hjson"}
+CONVERSION_CACHE_VERSION = 1
+# Beyond this size, the conversion cache drops the outputs used the longest time ago
+CONVERSION_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+_LOADERS = {"json": json.loads, "json5": json5.loads, "hjson": hjson.loads}
+_DUMPERS = {"json": json.dumps, "json5": json5.dumps, "hjson": hjson.dumps}
+
+
+def convert(string: str, source_format: str, target_format: str) -> str:
+    """
+    Converts a document between the "json", "json5" and "hjson" formats.
+
+    Strict JSON is also valid JSON5 and HJSON, so it is read with the much faster json module first.
+
+    Args:
+        string (str): The document to convert.
+        source_format (str): The format of the document.
+        target_format (str): The format to convert it to.
+
+    Returns:
+        str: The converted document.
+    """
+    if source_format not in _LOADERS or target_format not in _DUMPERS:
+        raise ValueError(f"Unknown format, expected one of {', '.join(FORMAT_EXTENSIONS)}")
+    try:
+        data = json.loads(string)
+    except ValueError:
+        if source_format == "json":
+            raise
+        data = _LOADERS[source_format](string)
+    return _DUMPERS[target_format](data)
 
 
 def json5_to_json(string: str):
-    return json.dumps(json5.loads(string))
+    return convert(string, "json5", "json")
 
 
 def json_to_json5(string: str):
-    return json5.dumps(json.loads(string))
+    return convert(string, "json", "json5")
 
 
 
 def hjson_to_json(string: str):
-    return json.dumps(hjson.loads(string))
+    return convert(string, "hjson", "json")
 
 
 def json_to_hjson(string: str):
-    return hjson.dumps(json.loads(string))
+    return convert(string, "json", "hjson")
 
 
 
 def hjson_to_json5(string: str):
-    return json5.dumps(hjson.loads(string))
+    return convert(string, "hjson", "json5")
 
 
 def json5_to_hjson(string: str):
-    return hjson.dumps(json5.loads(string))
-
-
-
-def loose_decode_json(json_str):
-    def parse_value(s):
-        s = s.strip()
-        if s.startswith('"') and s.endswith('"'):
-            return s[1:-1]
-        elif s == 'true':
-            return True
-        elif s == 'false':
-            return False
-        elif s == 'null':
-            return None
-        elif re.match(r'^-?\d+(\.\d+)?$', s):
-            return int(s) if '.' not in s else float(s)
-        elif s.startswith('['):
-            return parse_array(s)
-        elif s.startswith('{'):
-            return parse_object(s)
+    return convert(string, "json5", "hjson")
+
+
+def _collect_files_to_convert(source: Union[str, Iterable[str]]) -> List[Tuple[str, str]]:
+    """
+    Returns every (file, directory its output path is relative to) of a directory, glob or list of paths.
+
+    Outputs keep the layout below the directory, below the part of a glob before its first wildcard, or below the
+    common directory of a list of paths.
+    """
+    if isinstance(source, str) and os.path.isdir(source):
+        files = []
+        for root, _, file_names in os.walk(source):
+            files += [(os.path.join(root, name), source) for name in sorted(file_names)
+                      if os.path.splitext(name)[1].lower() in FORMAT_EXTENSIONS.values()]
+        return files
+    if isinstance(source, str):
+        paths = sorted(glob.glob(source, recursive=True))
+        drive, pattern = os.path.splitdrive(source)
+        literal_parts = []
+        for part in re.split(r"[\\/]", pattern)[:-1]:
+            if glob.has_magic(part):
+                break
+            literal_parts.append(part)
+        # "a/*.json" and "a/**/*.json" are relative to "a", "/*.json" to "/" and "*.json" to "."
+        base = drive + (os.sep.join(literal_parts) or (os.sep if pattern[:1] in ("/", "\\") else "."))
+        return [(path, base) for path in paths if os.path.isfile(path)]
+    paths = [path for path in source if os.path.isfile(path)]
+    try:
+        base = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths]) if paths else "."
+    except ValueError:  # Files on different drives, each is relative to its own directory
+        return [(path, os.path.dirname(path) or ".") for path in paths]
+    return [(path, base) for path in paths]
+
+
+def _evict_conversion_cache(cache_directory: str, max_bytes: int = None) -> None:
+    """Deletes the least recently used outputs of the conversion cache until it holds at most max_bytes."""
+    if max_bytes is None:
+        max_bytes = CONVERSION_CACHE_MAX_BYTES
+    entries = []
+    total = 0
+    with os.scandir(cache_directory) as scanner:
+        for entry in scanner:
+            try:
+                stat_result = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat_result.st_mtime_ns, stat_result.st_size, entry.path))
+            total += stat_result.st_size
+    if total <= max_bytes:
+        return
+    # Cache hits touch their entry, so the modification time is the time of last use
+    for _, size, path in sorted(entries):
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        if total <= max_bytes:
+            break
+
+
+def _convert_file_contents(contents: bytes, source_format: str, target_format: str) -> bytes:
+    return convert(contents.decode("utf-8-sig"), source_format, target_format).encode("utf-8")
+
+
+def convert_files(
+    source: Union[str, Iterable[str]],
+    target_format: str,
+    output_directory: Union[str, None] = None,
+    source_format: Union[str, None] = None,
+    workers: Union[int, None] = None,
+    use_cache: bool = True,
+) -> Dict[str, str]:
+    """
+    Converts many config files between JSON, JSON5 and HJSON in a process pool, reusing cached outputs.
+
+    Outputs are cached by the hash of the input contents in the tge cache directory, so unchanged files are only
+    copied on the next run. The least recently used outputs are evicted beyond CONVERSION_CACHE_MAX_BYTES.
+
+    Args:
+        source (Union[str, Iterable[str]]): A directory (searched recursively for .json, .json5 and .hjson files),
+            a glob pattern or a list of file paths.
+        target_format (str): "json", "json5" or "hjson".
+        output_directory (Union[str, None], optional): Where to write the outputs, keeping the layout below the
+            source directory, the part of the glob before its first wildcard or the common directory of the paths.
+            Defaults to next to each input.
+        source_format (Union[str, None], optional): The format of every input. Defaults to guessing it from each
+            file extension.
+        workers (Union[int, None], optional): Number of processes. Defaults to the ProcessPoolExecutor default.
+        use_cache (bool, optional): Whether to read and fill the conversion cache. Defaults to True.
+
+    Returns:
+        Dict[str, str]: The output path of every converted file.
+
+    Raises:
+        ValueError: If a file isn't valid in its format, its format can't be guessed, or two files would be
+            converted to the same output path.
+    """
+    if target_format not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown format {target_format}, expected one of {', '.join(FORMAT_EXTENSIONS)}")
+    extension_formats = {extension: name for name, extension in FORMAT_EXTENSIONS.items()}
+    cache_directory = None
+    if use_cache:
+        from ..library_utils import get_user_cache_directory
+
+        cache_directory = os.path.join(get_user_cache_directory(), "json_conversions")
+        os.makedirs(cache_directory, exist_ok=True)
+
+    # The output path of every input, all checked before anything is written
+    outputs = {}
+    # The input converted to every normalized output path, inputs already in the target format included
+    output_sources = {}
+    for path, relative_to in _collect_files_to_convert(source):
+        root, extension = os.path.splitext(path)
+        if output_directory is None:
+            output_path = root + FORMAT_EXTENSIONS[target_format]
         else:
-            raise ValueError(f"Unexpected value: {s}")
-
-    def parse_array(s):
-        s = s[1:-1].strip()
-        if not s:
-            return []
-        elements = split_by_comma(s)
-        return [parse_value(elem) for elem in elements]
-
-    def parse_object(s):
-        s = s[1:-1].strip()
-        if not s:
-            return {}
-        items = split_by_comma(s)
-        obj = {}
-        for item in items:
-            key, value = item.split(':', 1)
-            key = parse_value(key.strip())
-            value = parse_value(value.strip())
-            obj[key] = value
-        return obj
-
-    def split_by_comma(s):
-        result = []
-        depth_list = 0
-        depth_dict = 0
-        last_index = 0
-        inside_string = False
-        escape = False
-
-        def is_opening_bracket(char):
-            return char in '[{'
-
-        def is_closing_bracket(char):
-            return char in ']}'
-
-        def matches_opening_closing(opening, closing):
-            return (opening == '[' and closing == ']') or (opening == '{' and closing == '}')
-
-        for i, char in enumerate(s):
-            if char == '"':
-                if not escape:
-                    inside_string = not inside_string
-                escape = False
-            elif char == '\\':
-                escape = not escape
+            output_path = os.path.join(output_directory, os.path.relpath(root, relative_to) + FORMAT_EXTENSIONS[target_format])
+        normalized_output_path = os.path.normcase(os.path.abspath(output_path))
+        if normalized_output_path in output_sources:
+            raise ValueError(f"{output_sources[normalized_output_path]} and {path} would both be converted to {output_path}")
+        output_sources[normalized_output_path] = path
+        if normalized_output_path != os.path.normcase(os.path.abspath(path)):
+            outputs[path] = output_path
+
+    # (input path, output path, source format, contents, cache path) of every file missing from the cache
+    pending = []
+    for path, output_path in outputs.items():
+        file_format = source_format or extension_formats.get(os.path.splitext(path)[1].lower())
+        if file_format is None:
+            raise ValueError(f"Can't tell the format of {path}")
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        with open(path, "rb") as f:
+            contents = f.read()
+        cache_path = None
+        if cache_directory is not None:
+            key = hashlib.sha256(f"{CONVERSION_CACHE_VERSION} {file_format} {target_format} ".encode() + contents).hexdigest()
+            cache_path = os.path.join(cache_directory, key + FORMAT_EXTENSIONS[target_format])
+            try:
+                shutil.copyfile(cache_path, output_path)
+                # Marks the entry as recently used for _evict_conversion_cache
+                os.utime(cache_path)
+                continue
+            except FileNotFoundError:
+                pass
+        pending.append((path, output_path, file_format, contents, cache_path))
+
+    def write_output(job: tuple, converted: bytes) -> None:
+        path, output_path, _, _, cache_path = job
+        with open(output_path, "wb") as f:
+            f.write(converted)
+        if cache_path is not None:
+            # Written under a temporary name first, so other processes never see half of a cache entry
+            temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as f:
+                f.write(converted)
+            os.replace(temporary_path, cache_path)
+
+    def conversion_error(job: tuple, error: Exception) -> ValueError:
+        return ValueError(f"Could not convert {job[0]} from {job[2]}: {error}")
+
+    if len(pending) < 2 or workers == 1:
+        # Starting processes costs more than converting a single file
+        for job in pending:
+            try:
+                converted = _convert_file_contents(job[3], job[2], target_format)
+            except ValueError as error:
+                raise conversion_error(job, error) from error
+            write_output(job, converted)
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = {executor.submit(_convert_file_contents, job[3], job[2], target_format): job for job in pending}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    converted = future.result()
+                except ValueError as error:
+                    for other_future in futures:
+                        other_future.cancel()
+                    raise conversion_error(job, error) from error
+                write_output(job, converted)
+
+    if cache_directory is not None and pending:
+        _evict_conversion_cache(cache_directory)
+    return outputs
+
+
+# One loose JSON token: a structural character, a string (kept raw, escapes included), a number or a literal
+_TOKEN = re.compile(r'\s*(?:([\[\]{},:])|"([^"\\]*(?:\\.[^"\\]*)*)"|(-?\d+(?:\.\d+)?)|(true|false|null))', re.DOTALL)
+_WHITESPACE = re.compile(r"\s*")
+_LITERALS = {"true": True, "false": False, "null": None}
+_CLOSING_BRACKETS = {"[": "]", "{": "}"}
+
+
+def iter_tokens(chunks: Iterable[str]) -> Iterator[Tuple[str, Any, int]]:
+    """
+    Splits loose JSON into tokens in a single pass, a token cut between two chunks is read once it is complete.
+
+    Args:
+        chunks (Iterable[str]): The text, in one or more pieces.
+
+    Returns:
+        Iterator[Tuple[str, Any, int]]: The kind of each token (a structural character, or "value" for strings,
+            numbers and literals), its value and its position in the text.
+
+    Raises:
+        ValueError: If the text contains something that isn't a token.
+    """
+    find_tokens = _TOKEN.finditer
+    match_whitespace = _WHITESPACE.match
+    literals = _LITERALS
+    buffer, offset = "", 0
+    for chunk in chain(chunks, [None]):
+        final = chunk is None
+        if not final:
+            if buffer.startswith('"') and '"' not in chunk:
+                # Still inside a long string, no need to look for its end again
+                buffer += chunk
+                continue
+            buffer += chunk
+
+        position, end = 0, len(buffer)
+        for match in find_tokens(buffer):
+            kind = match.lastindex
+            # Stop at anything that isn't a token, and keep a number or literal touching the end of the chunk,
+            # as it may go on in the next one like the 1 of 1.5
+            if match.start() != position or not final and kind > 2 and match.end() + 1 >= end:
+                break
+            start = match.start(kind)
+            if kind == 1:
+                yield match.group(1), None, offset + start
+            elif kind == 2:
+                yield "value", match.group(2), offset + start - 1
+            elif kind == 3:
+                number = match.group(3)
+                yield "value", float(number) if "." in number else int(number), offset + start
+            else:
+                yield "value", literals[match.group(4)], offset + start
+            position = match.end()
+
+        position = match_whitespace(buffer, position).end()
+        if position < end and _TOKEN.match(buffer, position) is None:
+            # Not a token, unless it is the start of one cut by the end of the chunk, like an unclosed string
+            if final or buffer[position] != '"' and end - position > 5:
+                raise ValueError(f"Unexpected value at position {offset + position}: {buffer[position:position + 20]!r}")
+        buffer = buffer[position:]
+        offset += position
+
+
+def iter_events(tokens: Iterable[Tuple[str, Any, int]]) -> Iterator[Tuple[str, Any]]:
+    """
+    Checks the structure of loose JSON tokens and turns them into parsing events.
+
+    Args:
+        tokens (Iterable[Tuple[str, Any, int]]): Tokens from iter_tokens.
+
+    Returns:
+        Iterator[Tuple[str, Any]]: Events like ("start_map", None), ("map_key", key), ("value", value),
+            ("end_map", None), ("start_array", None) and ("end_array", None).
+
+    Raises:
+        ValueError: If the tokens aren't a single valid value.
+    """
+    stack = []
+    # What can come next: a value, a key, a colon, a comma or closing bracket, or nothing
+    expected = "value"
+    first = False
+    for kind, value, position in tokens:
+        if expected == "value":
+            if kind == "value":
+                yield "value", value
+                expected, first = ("next" if stack else "end"), False
+            elif kind == "[":
+                stack.append("[")
+                yield "start_array", None
+                first = True
+            elif kind == "{":
+                stack.append("{")
+                yield "start_map", None
+                expected, first = "key", True
+            elif kind == "]" and first:
+                stack.pop()
+                yield "end_array", None
+                expected, first = ("next" if stack else "end"), False
+            else:
+                raise ValueError(f"Expected a value at position {position}")
+        elif expected == "key":
+            if kind == "value":
+                yield "map_key", value
+                expected = ":"
+            elif kind == "}" and first:
+                stack.pop()
+                yield "end_map", None
+                expected = "next" if stack else "end"
             else:
-                if not inside_string:
-                    if is_opening_bracket(char):
-                        if char == '[':
-                            depth_list += 1
-                        elif char == '{':
-                            depth_dict += 1
-                    elif is_closing_bracket(char):
-                        if char == ']':
-                            if depth_list == 0:
-                                raise ValueError("Unexpected closing bracket ']'")
-                            depth_list -= 1
-                        elif char == '}':
-                            if depth_dict == 0:
-                                raise ValueError("Unexpected closing bracket '}'")
-                            depth_dict -= 1
-                    elif char == ',' and depth_list == 0 and depth_dict == 0:
-                        result.append(s[last_index:i].strip())
-                        last_index = i + 1
-
-            if i == len(s) - 1:
-                result.append(s[last_index:].strip())
-
-        if depth_list != 0:
-            raise ValueError("Unmatched opening bracket '['")
-        if depth_dict != 0:
-            raise ValueError("Unmatched opening bracket '{'")
-
-        return result
-
-    
-    json_str = json_str.strip()
-    return parse_value(json_str)
-
-
-
-
-def is_valid_json(json_str):
-    valid = True
-    def parse_value(s):
-        nonlocal valid
-        s = s.strip()
-        if s.startswith('"') and s.endswith('"'):
-            return s[1:-1]
-        elif s == 'true':
-            return True
-        elif s == 'false':
-            return False
-        elif s == 'null':
-            return None
-        elif re.match(r'^-?\d+(\.\d+)?$', s):
-            return int(s) if '.' not in s else float(s)
-        elif s.startswith('['):
-            return parse_array(s)
-        elif s.startswith('{'):
-            return parse_object(s)
+                raise ValueError(f"Expected an object key at position {position}")
+            first = False
+        elif expected == ":":
+            if kind != ":":
+                raise ValueError(f"Expected ':' at position {position}")
+            expected = "value"
+        elif expected == "next":
+            if kind == ",":
+                expected = "value" if stack[-1] == "[" else "key"
+            elif kind == _CLOSING_BRACKETS[stack[-1]]:
+                yield ("end_array" if stack.pop() == "[" else "end_map"), None
+                expected = "next" if stack else "end"
+            else:
+                raise ValueError(f"Expected ',' or '{_CLOSING_BRACKETS[stack[-1]]}' at position {position}")
+        else:
+            raise ValueError(f"Extra data at position {position}")
+
+    if expected != "end":
+        raise ValueError("Unexpected end of data")
+
+
+def loose_decode_json(json_str: str) -> Any:
+    """
+    Decodes loose JSON, in which strings are kept as written and object keys can be any string, number or literal.
+
+    Every string, number and literal is a token read by iter_tokens, so the grammar is stricter than the one of the
+    older, splitting parser, which took a few malformed inputs:
+
+    - a quoted value with unescaped quotes inside, like '"a" "b"' (then 'a" "b') or a lone '"' (then ''),
+    - a root array or object closed by the wrong character or not closed, like '[1, 2}' or '[' (its last
+      character was dropped unchecked).
+
+    Those now raise ValueError like other invalid input. Object keys containing ":", like '{"a:b": 1}', which the
+    older parser split at the colon, are decoded.
+
+    Args:
+        json_str (str): The text to decode.
+
+    Returns:
+        Any: The decoded value.
+
+    Raises:
+        ValueError: If the text isn't valid loose JSON.
+    """
+    # The root value goes in a list of its own, so every value is added to a container the same way
+    stack, keys = [[]], []
+    for event, value in iter_events(iter_tokens([json_str])):
+        if event == "start_array":
+            stack.append([])
+            continue
+        if event == "start_map":
+            stack.append({})
+            continue
+        if event == "map_key":
+            keys.append(value)
+            continue
+        if event != "value":
+            value = stack.pop()
+        container = stack[-1]
+        if type(container) is list:
+            container.append(value)
+        else:
+            container[keys.pop()] = value
+    return stack[0][0]
+
+
+def iterparse(fp: Any, chunk_size: int = streaming.DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[tuple, Any]]:
+    """
+    Reads loose JSON from a file object without building it, yielding every leaf value with its path.
+
+    Args:
+        fp (Any): A text or binary (UTF-8) file object.
+        chunk_size (int, optional): How much to read at once. Defaults to streaming.DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        Iterator[Tuple[tuple, Any]]: The path (object keys and array indexes) and value of every string, number
+            and literal, and of every empty array or object, like (("items", 0, "name"), "sword").
+
+    Raises:
+        ValueError: If the file isn't valid loose JSON.
+    """
+    path = []
+    # Whether each open container is an array, and whether it has any item yet
+    containers = []
+    for event, value in iter_events(iter_tokens(streaming.iter_text_chunks(fp, chunk_size))):
+        if event == "map_key":
+            path[-1] = value
+            continue
+        if event == "start_array" or event == "start_map":
+            containers.append([event == "start_array", False])
+            path.append(0 if event == "start_array" else None)
+            continue
+        if event == "value":
+            yield tuple(path), value
         else:
-            valid = False
-
-    def parse_array(s):
-        s = s[1:-1].strip()
-        if not s:
-            return []
-        elements = split_by_comma(s)
-        return [parse_value(elem) for elem in elements]
-
-    def parse_object(s):
-        s = s[1:-1].strip()
-        if not s:
-            return {}
-        items = split_by_comma(s)
-        obj = {}
-        for item in items:
-            key, value = item.split(':', 1)
-            key = parse_value(key.strip())
-            value = parse_value(value.strip())
-            obj[key] = value
-        return obj
-
-    def split_by_comma(s):
-        nonlocal valid
-        result = []
-        depth_list = 0
-        depth_dict = 0
-        last_index = 0
-        inside_string = False
-        escape = False
-
-        def is_opening_bracket(char):
-            return char in '[{'
-
-        def is_closing_bracket(char):
-            return char in ']}'
-
-        def matches_opening_closing(opening, closing):
-            return (opening == '[' and closing == ']') or (opening == '{' and closing == '}')
-
-        for i, char in enumerate(s):
-            if char == '"':
-                if not escape:
-                    inside_string = not inside_string
-                escape = False
-            elif char == '\\':
-                escape = not escape
+            path.pop()
+            if not containers.pop()[1]:
+                yield tuple(path), [] if event == "end_array" else {}
+        if containers:
+            containers[-1][1] = True
+            if containers[-1][0]:
+                path[-1] += 1
+
+
+# The same tokens as _TOKEN, told apart by which empty group matched so nothing gets extracted:
+# [ ] { } , : then strings, numbers and literals
+_VALIDATION_TOKEN_PATTERN = r'\s*(?:(\[)|(\])|(\{)|(\})|(,)|(:)|"[^"\\]*(?:\\.[^"\\]*)*"()|-?\d+(?:\.\d+)?()|(?:true|false|null)())'
+_VALIDATION_TOKEN = re.compile(_VALIDATION_TOKEN_PATTERN, re.DOTALL)
+_BYTES_VALIDATION_TOKEN = re.compile(_VALIDATION_TOKEN_PATTERN.encode(), re.DOTALL)
+_BYTES_WHITESPACE = re.compile(rb"\s*")
+
+_EXPECT_VALUE, _EXPECT_KEY, _EXPECT_COLON, _EXPECT_NEXT, _EXPECT_END = range(5)
+
+
+class _JSONValidator:
+    """Checks loose JSON fed in one or more pieces, keeping only a stack of the open brackets."""
+
+    def __init__(self):
+        # 1 for an open array, 0 for an open object
+        self.stack = bytearray()
+        self.expected = _EXPECT_VALUE
+        self.first = False
+        self.offset = 0
+        self.error = None
+
+    def feed(self, data: Any, final: bool) -> int:
+        """Checks the next piece, returning how much of it was used, the rest has to be fed again with more data."""
+        is_text = isinstance(data, str)
+        find_tokens = (_VALIDATION_TOKEN if is_text else _BYTES_VALIDATION_TOKEN).finditer
+        match_whitespace = (_WHITESPACE if is_text else _BYTES_WHITESPACE).match
+        stack = self.stack
+        expected, first = self.expected, self.first
+        position, end = 0, len(data)
+        reason = None
+
+        for match in find_tokens(data):
+            kind = match.lastindex
+            if match.start() != position or not final and kind > 7 and match.end() + 1 >= end:
+                break
+            if expected == _EXPECT_VALUE:
+                if kind > 6:
+                    expected, first = (_EXPECT_NEXT if stack else _EXPECT_END), False
+                elif kind == 1:
+                    stack.append(1)
+                    first = True
+                elif kind == 3:
+                    stack.append(0)
+                    expected, first = _EXPECT_KEY, True
+                elif kind == 2 and first:
+                    stack.pop()
+                    expected, first = (_EXPECT_NEXT if stack else _EXPECT_END), False
+                else:
+                    reason = "expected a value"
+            elif expected == _EXPECT_KEY:
+                if kind > 6:
+                    expected, first = _EXPECT_COLON, False
+                elif kind == 4 and first:
+                    stack.pop()
+                    expected, first = (_EXPECT_NEXT if stack else _EXPECT_END), False
+                else:
+                    reason = "expected an object key"
+            elif expected == _EXPECT_COLON:
+                if kind == 6:
+                    expected = _EXPECT_VALUE
+                else:
+                    reason = "expected ':'"
+            elif expected == _EXPECT_NEXT:
+                if kind == 5:
+                    expected = _EXPECT_VALUE if stack[-1] else _EXPECT_KEY
+                elif kind == 2 + 2 * (not stack[-1]):
+                    stack.pop()
+                    expected = _EXPECT_NEXT if stack else _EXPECT_END
+                else:
+                    reason = "expected ',' or ']'" if stack[-1] else "expected ',' or '}'"
             else:
-                if not inside_string:
-                    if is_opening_bracket(char):
-                        if char == '[':
-                            depth_list += 1
-                        elif char == '{':
-                            depth_dict += 1
-                    elif is_closing_bracket(char):
-                        if char == ']':
-                            if depth_list == 0:
-                                valid = False
-                            depth_list -= 1
-                        elif char == '}':
-                            if depth_dict == 0:
-                                valid = False
-                            depth_dict -= 1
-                    elif char == ',' and depth_list == 0 and depth_dict == 0:
-                        result.append(s[last_index:i].strip())
-                        last_index = i + 1
-
-            if i == len(s) - 1:
-                result.append(s[last_index:].strip())
-
-        if depth_list != 0:
-            valid = False
-        if depth_dict != 0:
-            valid = False
-
-        return result
-
-    json_str = json_str.strip()
-    parse_value(json_str)
-    return  valid
+                reason = "extra data"
+            if reason is not None:
+                self.error = (self.offset + match_whitespace(data, position).end(), reason)
+                return position
+            position = match.end()
+
+        self.expected, self.first = expected, first
+        position = match_whitespace(data, position).end()
+        if position < end:
+            token = (_VALIDATION_TOKEN if is_text else _BYTES_VALIDATION_TOKEN).match(data, position)
+            is_string = data[position:position + 1] in ('"', b'"')
+            # Anything but a token is an error, unless it may be the start of one cut by the end of the piece
+            if token is None and (final or not is_string and end - position > 5):
+                self.error = (self.offset + position, "unterminated string" if is_string else "unexpected character")
+        elif final and expected != _EXPECT_END:
+            self.error = (self.offset + position, "unexpected end of data")
+        self.offset += position
+        return position
+
+
+def _find_json_error_in_file(fp: Any, chunk_size: int) -> Union[Tuple[int, str], None]:
+    start = fp.tell() if fp.seekable() else 0
+    if hasattr(fp, "getbuffer"):
+        with fp.getbuffer() as buffer:
+            return find_json_error(buffer[start:])
+    try:
+        fileno = fp.fileno()
+        size = os.fstat(fileno).st_size
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        size = 0
+    mode = getattr(fp, "mode", "")
+    if size > start and isinstance(mode, str) and "b" in mode:
+        with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            return find_json_error(view[start:])
+
+    # Pipes and other streams are checked a chunk at a time
+    validator = _JSONValidator()
+    pending = None
+    while validator.error is None:
+        chunk = fp.read(chunk_size)
+        final = not chunk
+        if pending and not final and pending[:1] in ('"', b'"') and chunk.find(pending[:1]) == -1:
+            # Still inside a long string, no need to look for its end again
+            pending += chunk
+            continue
+        data = pending + chunk if pending else chunk
+        consumed = validator.feed(data, final)
+        if final:
+            break
+        pending = data[consumed:]
+    return validator.error
+
+
+def find_json_error(data: Any, chunk_size: int = streaming.DEFAULT_CHUNK_SIZE) -> Union[Tuple[int, str], None]:
+    """
+    Finds the first error of loose JSON (as read by loose_decode_json) in a single pass, without building any value.
+
+    Args:
+        data (Any): The JSON as str, bytes, bytearray, memoryview, mmap or a file object. Regular binary files are
+            memory mapped, other file objects are read a chunk at a time.
+        chunk_size (int, optional): How much to read at once from file objects that can't be memory mapped.
+            Defaults to streaming.DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        Union[Tuple[int, str], None]: None if the JSON is valid, else the offset of the first error (in bytes,
+            or in characters for str and text files) and the reason.
+    """
+    if hasattr(data, "read") and not isinstance(data, mmap.mmap):
+        return _find_json_error_in_file(data, chunk_size)
+    if isinstance(data, memoryview) and (data.format != "B" or not data.contiguous):
+        data = data.cast("B") if data.contiguous else data.tobytes()
+    validator = _JSONValidator()
+    validator.feed(data, True)
+    return validator.error
+
+
+def is_valid_json(json_str: Any) -> bool:
+    """
+    Checks whether loose JSON (as read by loose_decode_json) is valid, see find_json_error for what it accepts.
+    """
+    return find_json_error(json_str) is None
+
+
+def benchmark_is_valid_json(data: Union[str, bytes] = None, repeat: int = 3) -> Dict[str, float]:
+    """
+    Measures the throughput of is_valid_json against building the values with loose_decode_json and json.loads.
+
+    Args:
+        data (Union[str, bytes], optional): The JSON to check. Defaults to a generated document of about 5 MB.
+        repeat (int, optional): How many times to run each, the fastest run counts. Defaults to 3.
+
+    Returns:
+        Dict[str, float]: The megabytes per second of "is_valid_json", "loose_decode_json" and "json.loads".
+    """
+    if data is None:
+        item = '{"name": "item", "count": 12, "weight": 1.5, "tags": ["a", "b"], "enabled": true, "owner": null}'
+        data = "[" + ", ".join([item] * 50000) + "]"
+    text = data if isinstance(data, str) else bytes(data).decode("utf-8")
+    binary_data = text.encode("utf-8")
+
+    contenders = {
+        "is_valid_json": lambda: is_valid_json(binary_data),
+        "loose_decode_json": lambda: loose_decode_json(text),
+        "json.loads": lambda: json.loads(binary_data),
+    }
+    throughputs = {}
+    for name, contender in contenders.items():
+        fastest = min(timeit.repeat(contender, number=1, repeat=repeat))
+        throughputs[name] = len(binary_data) / 1_000_000 / fastest
+    return throughputs
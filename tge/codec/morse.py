@@ -1,152 +1,300 @@
+import re
+from typing import Any, Iterable, Iterator, List, Tuple
+
+from . import streaming
+
+
+# Every character Morse code can encode, " " being the word separator
+MORSE_CODE = {
+    "a": ".-",
+    "b": "-...",
+    "c": "-.-.",
+    "d": "-..",
+    "e": ".",
+    "f": "..-.",
+    "g": "--.",
+    "h": "....",
+    "i": "..",
+    "j": ".---",
+    "k": "-.-",
+    "l": ".-..",
+    "m": "--",
+    "n": "-.",
+    "o": "---",
+    "p": ".--.",
+    "q": "--.-",
+    "r": ".-.",
+    "s": "...",
+    "t": "-",
+    "u": "..-",
+    "v": "...-",
+    "w": ".--",
+    "x": "-..-",
+    "y": "-.--",
+    "z": "--..",
+    "1": ".----",
+    "2": "..---",
+    "3": "...--",
+    "4": "....-",
+    "5": ".....",
+    "6": "-....",
+    "7": "--...",
+    "8": "---..",
+    "9": "----.",
+    "0": "-----",
+    ",": "--..--",
+    ".": ".-.-.-",
+    "?": "..--..",
+    "/": "-..-.",
+    "-": "-....-",
+    "(": "-.--.",
+    ")": "-.--.-",
+    "&": ".-...",
+    "@": ".--.-.",
+    "!": "-.-.--",
+    "$": "...-..-",
+    "%": ".-.-.",
+    "=": "-...-",
+    "+": ".-.-.",
+    "_": "..--.-",
+    '"': ".-..-.",
+    "<": ".-.-",
+    ">": ".-..-.",
+    ":": "---...",
+    ";": "-.-.-.",
+    " ": "/",
+}
+# % and > have no code of their own and share those of + and ", which is what these codes decode to
+ENCODING_ALIASES = {"%", ">"}
+DECODING_TABLE = {code: char for char, code in MORSE_CODE.items() if char not in ENCODING_ALIASES}
+DECODING_TABLE["|"] = " "
+
+MAX_CODE_LENGTH = max(map(len, DECODING_TABLE))
+
+
+def _build_decoding_tree() -> List[str]:
+    """The Morse tree as an array: the root is 1, a dot goes to 2 * node and a dash to 2 * node + 1."""
+    tree = [None] * 2 ** (MAX_CODE_LENGTH + 1)
+    for code, char in DECODING_TABLE.items():
+        if code.strip(".-"):
+            continue
+        node = 1
+        for symbol in code:
+            node = 2 * node + (symbol == "-")
+        tree[node] = char
+    return tree
+
+
+_DECODING_TREE = _build_decoding_tree()
+
+# Dot and dash runs, word separators, and anything else (which is invalid), whitespace separates letters
+_TOKEN = re.compile(r"[.\-]+|\S")
+# Longest run of dots and dashes without separator kept back by the incremental decoder
+MAX_HELD_RUN = 256
+
+# Durations in units: dot, dash, and the silences inside a letter, between letters and between words
+DOT_UNITS, DASH_UNITS, SYMBOL_GAP_UNITS, LETTER_GAP_UNITS, WORD_GAP_UNITS = 1, 3, 1, 3, 7
+
+
+def _get_whitespace_code(letter: str) -> str:
+    """The code of a character missing from MORSE_CODE: any whitespace (newlines, tabs...) separates words like " "."""
+    if letter.isspace():
+        return MORSE_CODE[" "]
+    raise ValueError(f"No Morse code for {letter!r}")
+
+
 def encode(message: str) -> str:
     """
     Encode a given message into Morse code.
 
-    This function takes a string message and encodes it into Morse code
-    using a predefined dictionary of characters and their corresponding
-    Morse code representations.
+    Letters are separated by a space and words by " / ", like ".... .. / - .... . .-. .", so the output can
+    be decoded back. Letters are not case sensitive, and every whitespace character separates words like a space.
 
     Args:
         message (str): The message to be encoded into Morse code.
 
     Returns:
         str: The encoded message in Morse code.
+
+    Raises:
+        ValueError: If the message contains a character that has no Morse code.
     """
-    morse_code = {
-        "a": ".-",
-        "b": "-...",
-        "c": "-.-.",
-        "d": "-..",
-        "e": ".",
-        "f": "..-.",
-        "g": "--.",
-        "h": "....",
-        "i": "..",
-        "j": ".---",
-        "k": "-.-",
-        "l": ".-..",
-        "m": "--",
-        "n": "-.",
-        "o": "---",
-        "p": ".--.",
-        "q": "--.-",
-        "r": ".-.",
-        "s": "...",
-        "t": "-",
-        "u": "..-",
-        "v": "...-",
-        "w": ".--",
-        "x": "-..-",
-        "y": "-.--",
-        "z": "--..",
-        "1": ".----",
-        "2": "..---",
-        "3": "...--",
-        "4": "....-",
-        "5": ".....",
-        "6": "-....",
-        "7": "--...",
-        "8": "---..",
-        "9": "----.",
-        "0": "-----",
-        ",": "--..--",
-        ".": ".-.-.-",
-        "?": "..--..",
-        "/": "-..-.",
-        "-": "-....-",
-        "(": "-.--.",
-        ")": "-.--.-",
-        "&": ".-...",
-        "@": ".--.-.",
-        "!": "-.-.--",
-        "$": "...-..-",
-        "%": ".-.-.",
-        "=": "-...-",
-        "+": ".-.-.",
-        "_": "..--.-",
-        '"': ".-..-.",
-        "<": ".-.-",
-        ">": ".-..-.",
-        ":": "---...",
-        ";": "-.-.-.",
-        " ": "/",
-    }
-
-    return "".join([morse_code[letter] for letter in message.lower()])
+    get_code = MORSE_CODE.get
+    return " ".join([get_code(letter) or _get_whitespace_code(letter) for letter in message.lower()])
+
+
+def _iter_run_letters(run: str) -> Iterator[Tuple[str, int]]:
+    """Splits a run of dots and dashes with no separators into letters, longest match first, with where each ends."""
+    tree = _DECODING_TREE
+    tree_size = len(tree)
+    start, length = 0, len(run)
+    while start < length:
+        node, position = 1, start
+        letter, end = None, start
+        while position < length:
+            node = 2 * node + (run[position] == "-")
+            if node >= tree_size:
+                break
+            position += 1
+            if tree[node] is not None:
+                letter, end = tree[node], position
+        if letter is None:
+            raise ValueError(f"Invalid Morse code {run[start:start + MAX_CODE_LENGTH]!r}")
+        yield letter, end
+        start = end
 
 
 def decode(message: str) -> str:
     """
     Decodes a Morse code message into plain text.
 
+    Letters are separated by whitespace and words by "/" or "|". A run of dots and dashes that isn't a single
+    letter, like unseparated Morse code, is split into letters by taking the longest code that fits each time.
+
     Args:
         message (str): The Morse code message to be decoded.
 
     Returns:
-        str: The decoded plain text message.
+        str: The decoded plain text message, in lowercase.
+
+    Raises:
+        ValueError: If the message contains something other than dots, dashes, separators and whitespace.
+    """
+    table = DECODING_TABLE
+    letters = []
+    for token in _TOKEN.findall(message):
+        letter = table.get(token)
+        if letter is not None:
+            letters.append(letter)
+        elif token[0] in ".-":
+            letters += [letter for letter, _ in _iter_run_letters(token)]
+        else:
+            raise ValueError(f"Invalid Morse code character {token!r}")
+    return "".join(letters)
+
+
+def encode_many(messages: Iterable[str]) -> List[str]:
+    """
+    Encodes many messages into Morse code, see encode.
+
+    Args:
+        messages (Iterable[str]): The messages to encode.
+
+    Returns:
+        List[str]: The encoded messages, in the same order.
+    """
+    return [encode(message) for message in messages]
+
+
+def decode_many(messages: Iterable[str]) -> List[str]:
+    """
+    Decodes many Morse code messages, see decode.
+
+    Args:
+        messages (Iterable[str]): The messages to decode.
 
-    Morse code dictionary:
-        The function uses a predefined dictionary `morse_code` to map Morse code sequences
-        to their corresponding plain text characters. Each character is separated by a space.
+    Returns:
+        List[str]: The decoded messages, in the same order.
+    """
+    return [decode(message) for message in messages]
+
+
+def iter_timings(message: str, words_per_minute: float = 20) -> Iterator[Tuple[bool, float]]:
+    """
+    Yields how to play a message in Morse code, as sound or light, without building the encoded string.
+
+    Any run of whitespace is one word gap, leading and trailing whitespace are silent.
+
+    Args:
+        message (str): The plain text message.
+        words_per_minute (float, optional): The speed, with the standard word "PARIS " being 50 units long.
+            Defaults to 20.
+
+    Returns:
+        Iterator[Tuple[bool, float]]: Whether the signal is on or off, and for how many seconds.
+
+    Raises:
+        ValueError: If the message contains a character that has no Morse code.
+    """
+    unit = 60 / (50 * words_per_minute)
+    gap = None
+    word_separator = MORSE_CODE[" "]
+    for letter in message.lower():
+        # The same characters as encode, whitespace being the word separator
+        code = MORSE_CODE.get(letter) or _get_whitespace_code(letter)
+        if code == word_separator:
+            if gap is not None:
+                gap = WORD_GAP_UNITS
+            continue
+        if gap is not None:
+            yield False, gap * unit
+        for index, symbol in enumerate(code):
+            if index:
+                yield False, SYMBOL_GAP_UNITS * unit
+            yield True, (DOT_UNITS if symbol == "." else DASH_UNITS) * unit
+        gap = LETTER_GAP_UNITS
+
+
+class IncrementalEncoder(streaming.IncrementalEncoder):
+    def reset(self) -> None:
+        super().reset()
+        self._started = False
+
+    def _buffer_encode(self, input: str, errors: str, final: bool) -> tuple:
+        encoded = encode(input)
+        if encoded and self._started:
+            # The letter separator between this chunk and the previous one
+            encoded = " " + encoded
+        self._started = self._started or bool(encoded)
+        return encoded, len(input)
+
+
+class IncrementalDecoder(streaming.IncrementalDecoder):
+    def _buffer_decode(self, input: str, errors: str, final: bool) -> tuple:
+        if final:
+            return decode(input), len(input)
+        # The dots and dashes at the end may be a letter that goes on in the next chunk
+        consumed = len(input.rstrip(".-"))
+        decoded = decode(input[:consumed])
+        held = len(input) - consumed
+        if held > MAX_HELD_RUN:
+            # Unseparated Morse code, every letter but those near the end is already known
+            letters, last_end = [], 0
+            for letter, end in _iter_run_letters(input[consumed:]):
+                if end > held - MAX_CODE_LENGTH:
+                    break
+                letters.append(letter)
+                last_end = end
+            decoded += "".join(letters)
+            consumed += last_end
+        return decoded, consumed
+
+
+def encode_stream(src: Any, dst: Any, chunk_size: int = streaming.DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Encodes a text or binary file object into Morse code, one chunk at a time.
+
+    Args:
+        src (Any): The file object to read.
+        dst (Any): The file object to write the encoded text to.
+        chunk_size (int, optional): How much to read at once. Defaults to streaming.DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        int: The number of characters written.
+    """
+    return streaming.transform_stream(src, dst, IncrementalEncoder().encode_text, chunk_size)
+
+
+def decode_stream(src: Any, dst: Any, chunk_size: int = streaming.DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Decodes Morse code from a text or binary file object, one chunk at a time.
+
+    Args:
+        src (Any): The file object to read the encoded text from.
+        dst (Any): The file object to write the decoded text to.
+        chunk_size (int, optional): How much to read at once. Defaults to streaming.DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        int: The number of characters written.
     """
-    morse_code = {
-        ".-": "a",
-        "-...": "b",
-        "-.-.": "c",
-        "-..": "d",
-        ".": "e",
-        "..-.": "f",
-        "--.": "g",
-        "....": "h",
-        "..": "i",
-        ".---": "j",
-        "-.-": "k",
-        ".-..": "l",
-        "--": "m",
-        "-.": "n",
-        "---": "o",
-        ".--.": "p",
-        "--.-": "q",
-        ".-.": "r",
-        "...": "s",
-        "-": "t",
-        "..-": "u",
-        "...-": "v",
-        ".--": "w",
-        "-..-": "x",
-        "-.--": "y",
-        "--..": "z",
-        ".----": "1",
-        "..---": "2",
-        "...--": "3",
-        "....-": "4",
-        ".....": "5",
-        "-....": "6",
-        "--...": "7",
-        "---..": "8",
-        "----.": "9",
-        "-----": "0",
-        "--..--": ",",
-        ".-.-.-": ".",
-        "..--..": "?",
-        "-..-.": "/",
-        "-....-": "-",
-        "-.--.": "(",
-        "-.--.-": ")",
-        ".-...": "&",
-        ".--.-.": "@",
-        "-.-.--": "!",
-        "...-..-": "$",
-        ".-.-.": "%",
-        "-...-": "=",
-        ".-.-.": "+",
-        "..--.-": "_",
-        ".-..-.": '"',
-        ".-.-": "<",
-        ".-..-.": ">",
-        "---...": ":",
-        "-.-.-.": ";",
-        "/": " ",
-    }
-    message = message.replace(" ", "/").replace("_", "/")
-    return "".join([morse_code[letter] for letter in message.lower()])
+    return streaming.transform_stream(src, dst, IncrementalDecoder().decode_text, chunk_size)
@@ -1,36 +1,100 @@
 # Miner3D's Simplified YAML
-def decode(data: str) -> dict:
+import io
+from itertools import islice
+from typing import Any, Iterator, Tuple
+
+
+DUMP_BATCH_SIZE = 1024
+
+
+def iter_sections(fp: Any) -> Iterator[Tuple[str, Iterator[str]]]:
     """
-    Returns a dictionary based on the inputted string (msy format)
+    Reads the msy format from a text file object (or any iterable of lines) one line at a time, yielding
+    every list name with an iterator over its items, so lists are never built in memory.
+
+    Items left unread when asking for the next list are skipped.
     """
-    parsed_data = {}
-    current_list_name = None
+    lines = iter(fp)
+    next_header = None
+
+    def iter_items() -> Iterator[str]:
+        nonlocal next_header
+        for line in lines:
+            line = line.strip()
+            if line.startswith("#"):
+                next_header = line
+                return
+            if line:
+                yield line
 
-    lines = data.split("\n")
     for line in lines:
         line = line.strip()
         if line.startswith("#"):
-            current_list_name = line[1:].strip()
-            parsed_data[current_list_name] = []
+            next_header = line
+            break
+        if line:
+            raise ValueError("Data format error: Item found before list name.")
+
+    while next_header is not None:
+        list_name, next_header = next_header[1:].strip(), None
+        items = iter_items()
+        yield list_name, items
+        for _ in items:
+            pass
+
+
+def load(fp: Any) -> dict:
+    """
+    Returns a dictionary read from a text file object (or any iterable of lines) in the msy format, one line at a time
+    """
+    parsed_data = {}
+    current_list = None
+
+    for line in fp:
+        line = line.strip()
+        if line.startswith("#"):
+            current_list = parsed_data[line[1:].strip()] = []
         elif line:
-            if current_list_name is not None:
-                parsed_data[current_list_name].append(line)
+            if current_list is not None:
+                current_list.append(line)
             else:
                 raise ValueError("Data format error: Item found before list name.")
 
     return parsed_data
 
 
+def dump(obj: dict, fp: Any) -> None:
+    """
+    Writes a dictionary in the msy format to a text file object, one list at a time
+    """
+    write = fp.write
+    for list_name, items in obj.items():
+        write(f"#{list_name}\n")
+        items = iter(items)
+        # Batches of items go in one write each, which is much faster than a write per item and never holds a
+        # whole list as text
+        for batch in iter(lambda: list(islice(items, DUMP_BATCH_SIZE)), []):
+            write("\n".join(map(str, batch)) + "\n")
+        write("\n")
+
+
+def decode(data: str) -> dict:
+    """
+    Returns a dictionary based on the inputted string (msy format)
+    """
+    return load(data.split("\n"))
+
+
 def encode(data: dict) -> str:
     """
     Returns a a str (msy formatted) from the inputted dictionary
     """
-    formatted_text = ""
+    buffer = io.StringIO()
+    dump(data, buffer)
+    return buffer.getvalue()
 
-    for list_name, items in data.items():
-        formatted_text += f"#{list_name}\n"
-        for item in items:
-            formatted_text += f"{item}\n"
-        formatted_text += "\n"
 
-    return formatted_text
\ No newline at end of file
+# The names of the streaming interface shared with the other codecs, msy maps dictionaries rather than text so it
+# has no incremental encoder or decoder
+encode_stream = dump
+decode_stream = load
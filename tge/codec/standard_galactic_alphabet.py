@@ -1,3 +1,66 @@
+import timeit
+from typing import Any, Dict
+
+from . import streaming
+
+
+# The letter or digit of every glyph, some glyphs being several code points like "|:" or "┌┐"
+ENCODING_TABLE = {
+    "a": "ᔑ",
+    "b": "ܠ",
+    "c": "i",
+    "d": "↸",
+    "e": "ᒷ",
+    "f": "⎓",
+    "g": "├",
+    "h": "₸",
+    "i": "╎",
+    "j": "⋮",
+    "k": "ꖌ",
+    "l": "|:",
+    "m": "٦",
+    "n": "リ",
+    "o": "フ",
+    "p": "¡ǃ",
+    "q": "ᑖ",
+    "r": "∴",
+    "s": "߆",
+    "t": "ℸ ̣",
+    "u": "⚍",
+    "v": "⍊",
+    "w": "∷",
+    "x": "˙̸ ",
+    "y": "॥",
+    "z": "⋂",
+    "1": "⥍",
+    "2": "∠",
+    "3": ">",
+    "4": "⊐",
+    "5": "ⵎ",
+    "6": "X",
+    "7": "Δ",
+    "8": "⎕",
+    "9": "┌┐",
+    "0": "└┘",
+}
+DECODING_TABLE = {glyph: char for char, glyph in ENCODING_TABLE.items()}
+
+_ENCODING_TRANSLATION = str.maketrans(ENCODING_TABLE)
+_DECODING_TRANSLATION = str.maketrans({glyph: char for glyph, char in DECODING_TABLE.items() if len(glyph) == 1})
+# The glyphs of several code points, longest first. Each starts with a code point found nowhere else in the table,
+# so they never overlap, and they decode to letters and digits which aren't glyphs, so replacing them before
+# translating the single code point glyphs gives the same result as one longest match pass
+_MULTI_CODE_POINT_GLYPHS = [
+    (glyph, DECODING_TABLE[glyph]) for glyph in sorted(DECODING_TABLE, key=len, reverse=True) if len(glyph) > 1
+]
+# What the incremental decoder holds back at the end of a chunk, as the rest of the glyph may be in the next one
+_GLYPH_PREFIXES = {glyph[:end] for glyph in DECODING_TABLE for end in range(1, len(glyph))}
+MAX_GLYPH_LENGTH = max(map(len, DECODING_TABLE))
+# The characters left unchanged by encode that start a glyph, like ">" (3) or "|" of "|:" (l): decode reads them as
+# the letter or digit, so text without them always round-trips
+AMBIGUOUS_CHARACTERS = frozenset(glyph[0] for glyph in DECODING_TABLE) - frozenset(ENCODING_TABLE)
+
+
 def encode(text: str) -> str:
     """
     Encodes a string by replacing each character with a corresponding symbol from a predefined table.
@@ -9,53 +72,18 @@ def encode(text: str) -> str:
         str: The encoded string with characters replaced by symbols.
 
     Notes:
-        Characters not found in the encoding table remain unchanged.
+        Characters not found in the encoding table remain unchanged. The encoding is lossy for those which are
+        glyphs themselves, see AMBIGUOUS_CHARACTERS: decode(encode(">")) is "3" and decode(encode("|:")) is "l".
     """
-    table = {
-        "a": "ᔑ",
-        "b": "ܠ",
-        "c": "i",
-        "d": "↸",
-        "e": "ᒷ",
-        "f": "⎓",
-        "g": "├",
-        "h": "₸",
-        "i": "╎",
-        "j": "⋮",
-        "k": "ꖌ",
-        "l": "|:",
-        "m": "٦",
-        "n": "リ",
-        "o": "フ",
-        "p": "¡ǃ",
-        "q": "ᑖ",
-        "r": "∴",
-        "s": "߆",
-        "t": "ℸ ̣",
-        "u": "⚍",
-        "v": "⍊",
-        "w": "∷",
-        "x": "˙̸ ",
-        "y": "॥",
-        "z": "⋂",
-        "1": "⥍",
-        "2": "∠",
-        "3": ">",
-        "4": "⊐",
-        "5": "ⵎ",
-        "6": "X",
-        "7": "Δ",
-        "8": "⎕",
-        "9": "┌┐",
-        "0": "└┘",
-    }
-    return "".join(table.get(char, char) for char in text)
+    return text.translate(_ENCODING_TRANSLATION)
 
 
 def decode(text: str) -> str:
     """
     Decodes a string by replacing each symbol with the corresponding character from a predefined table.
 
+    Symbols made of several code points, like "|:" for l, are matched whole, the longest first.
+
     Args:
         text (str): The encoded string to be decoded.
 
@@ -63,44 +91,86 @@ def decode(text: str) -> str:
         str: The decoded string with symbols replaced by characters.
 
     Notes:
-        Symbols not found in the decoding table remain unchanged.
+        Symbols not found in the decoding table remain unchanged. decode(encode(text)) == text for any text
+        without AMBIGUOUS_CHARACTERS.
     """
-    table = {
-        "ᔑ": "a",
-        "ܠ": "b",
-        "i": "c",
-        "↸": "d",
-        "ᒷ": "e",
-        "⎓": "f",
-        "├": "g",
-        "₸": "h",
-        "╎": "i",
-        "⋮": "j",
-        "ꖌ": "k",
-        "|:": "l",
-        "٦": "m",
-        "リ": "n",
-        "フ": "o",
-        "¡ǃ": "p",
-        "ᑖ": "q",
-        "∴": "r",
-        "߆": "s",
-        "ℸ ̣": "t",
-        "⚍": "u",
-        "⍊": "v",
-        "∷": "w",
-        "˙̸ ": "x",
-        "॥": "y",
-        "⋂": "z",
-        "⥍": "1",
-        "∠": "2",
-        ">": "3",
-        "⊐": "4",
-        "ⵎ": "5",
-        "X": "6",
-        "Δ": "7",
-        "⎕": "8",
-        "┌┐": "9",
-        "└┘": "0",
+    for glyph, char in _MULTI_CODE_POINT_GLYPHS:
+        if glyph in text:
+            text = text.replace(glyph, char)
+    return text.translate(_DECODING_TRANSLATION)
+
+
+def benchmark_throughput(size: int = 1_000_000, repeat: int = 3) -> Dict[str, float]:
+    """
+    Measures how fast encode and decode go, against looking every character up on its own like older versions.
+
+    Args:
+        size (int, optional): The number of characters of the generated text. Defaults to 1_000_000.
+        repeat (int, optional): How many times to run each, the fastest run counts. Defaults to 3.
+
+    Returns:
+        Dict[str, float]: The megabytes of UTF-8 per second of "encode", "decode", "encode per character" and
+            "decode per character".
+    """
+    sample = "the quick brown fox jumps over the lazy dog 1234567890\n"
+    text = (sample * (size // len(sample) + 1))[:size]
+    encoded = encode(text)
+
+    contenders = {
+        "encode": (lambda: encode(text), text),
+        "decode": (lambda: decode(encoded), encoded),
+        "encode per character": (lambda: "".join([ENCODING_TABLE.get(char, char) for char in text]), text),
+        "decode per character": (lambda: "".join([DECODING_TABLE.get(char, char) for char in encoded]), encoded),
     }
-    return "".join(table.get(char, char) for char in text)
+    throughputs = {}
+    for name, (contender, data) in contenders.items():
+        fastest = min(timeit.repeat(contender, number=1, repeat=repeat))
+        throughputs[name] = len(data.encode("utf-8")) / 1_000_000 / fastest
+    return throughputs
+
+
+class IncrementalEncoder(streaming.IncrementalEncoder):
+    def _buffer_encode(self, input: str, errors: str, final: bool) -> tuple:
+        return encode(input), len(input)
+
+
+class IncrementalDecoder(streaming.IncrementalDecoder):
+    def _buffer_decode(self, input: str, errors: str, final: bool) -> tuple:
+        consumed = len(input)
+        if not final:
+            # Keep the start of a glyph cut by the chunk boundary, the longest such end first
+            for length in range(min(MAX_GLYPH_LENGTH - 1, consumed), 0, -1):
+                if input[-length:] in _GLYPH_PREFIXES:
+                    consumed -= length
+                    break
+        return decode(input[:consumed]), consumed
+
+
+def encode_stream(src: Any, dst: Any, chunk_size: int = streaming.DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Encodes a text or binary file object into the Standard Galactic Alphabet, one chunk at a time.
+
+    Args:
+        src (Any): The file object to read.
+        dst (Any): The file object to write the encoded text to.
+        chunk_size (int, optional): How much to read at once. Defaults to streaming.DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        int: The number of characters written.
+    """
+    return streaming.transform_stream(src, dst, IncrementalEncoder().encode_text, chunk_size)
+
+
+def decode_stream(src: Any, dst: Any, chunk_size: int = streaming.DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Decodes the Standard Galactic Alphabet from a text or binary file object, one chunk at a time.
+
+    Args:
+        src (Any): The file object to read the encoded text from.
+        dst (Any): The file object to write the decoded text to.
+        chunk_size (int, optional): How much to read at once. Defaults to streaming.DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        int: The number of characters written.
+    """
+    return streaming.transform_stream(src, dst, IncrementalDecoder().decode_text, chunk_size)
@@ -0,0 +1,216 @@
+import codecs
+import importlib
+import io
+from typing import Any, Iterator, Type, Union
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# codecs.lookup names (hyphens work too) and the tge.codec module implementing them
+CODEC_MODULES = {
+    "tge_codec": "codec",
+    "tge_morse": "morse",
+    "tge_html": "html",
+    "tge_sga": "standard_galactic_alphabet",
+    "tge_standard_galactic_alphabet": "standard_galactic_alphabet",
+}
+
+
+class IncrementalEncoder(codecs.BufferedIncrementalEncoder):
+    """
+    Base of the incremental encoders of the tge codecs, which turn text into the UTF-8 bytes of its encoding.
+
+    Subclasses implement _buffer_encode(input, errors, final) returning the encoded text and how many characters
+    of input it used, the unused end is handed back at the start of the next call.
+    Subclasses with state of their own set it up in reset.
+    """
+
+    def __init__(self, errors: str = "strict"):
+        super().__init__(errors)
+        self.reset()
+
+    def encode_text(self, input: str, final: bool = False) -> str:
+        """Encodes the next piece of text, returning the encoded text instead of bytes."""
+        return super().encode(input, final)
+
+    def encode(self, input: str, final: bool = False) -> bytes:
+        return self.encode_text(input, final).encode("utf-8")
+
+
+class IncrementalDecoder(codecs.BufferedIncrementalDecoder):
+    """
+    Base of the incremental decoders of the tge codecs, which turn UTF-8 bytes of encoded text back into text.
+
+    Subclasses implement _buffer_decode(input, errors, final) on text, returning the decoded text and how many
+    characters of input it used, so a token cut by a chunk boundary is kept until the rest of it arrives.
+    Subclasses with state of their own set it up in reset.
+    """
+
+    def __init__(self, errors: str = "strict"):
+        super().__init__(errors)
+        self._utf8_decoder = codecs.getincrementaldecoder("utf-8")(errors)
+        self.reset()
+
+    def decode_text(self, input: str, final: bool = False) -> str:
+        """Decodes the next piece of encoded text."""
+        return super().decode(input, final)
+
+    def decode(self, input: bytes, final: bool = False) -> str:
+        return self.decode_text(self._utf8_decoder.decode(input, final), final)
+
+    def reset(self) -> None:
+        super().reset()
+        self.buffer = ""
+        self._utf8_decoder.reset()
+
+    def getstate(self) -> tuple:
+        # The held back text goes back to the bytes it came from, as io.TextIOWrapper.tell expects
+        return self.buffer.encode("utf-8") + self._utf8_decoder.getstate()[0], 0
+
+    def setstate(self, state: tuple) -> None:
+        self.reset()
+        self.buffer = self._utf8_decoder.decode(state[0])
+
+
+class StreamWriter(codecs.StreamWriter):
+    incremental_encoder = IncrementalEncoder
+
+    def __init__(self, stream: Any, errors: str = "strict"):
+        super().__init__(stream, errors)
+        self._encoder = self.incremental_encoder(errors)
+
+    def encode(self, input: str, errors: str = "strict") -> tuple:
+        # Nothing tells a StreamWriter that writing ended, so every write is flushed whole
+        return self._encoder.encode(input, True), len(input)
+
+    def reset(self) -> None:
+        self._encoder.reset()
+
+
+class StreamReader(codecs.StreamReader):
+    incremental_decoder = IncrementalDecoder
+
+    def __init__(self, stream: Any, errors: str = "strict"):
+        super().__init__(stream, errors)
+        self._decoder = self.incremental_decoder(errors)
+
+    def decode(self, input: bytes, errors: str = "strict") -> tuple:
+        return self._decoder.decode(input), len(input)
+
+    def read(self, size: int = -1, chars: int = -1, firstline: bool = False) -> str:
+        # codecs.StreamReader.read never tells the decoder that the stream ended, which would lose the tokens
+        # held back at the end, so the read loop is redone with the final flag
+        if self.linebuffer:
+            self.charbuffer = "".join(self.linebuffer)
+            self.linebuffer = None
+        if chars < 0:
+            chars = size
+
+        while chars < 0 or len(self.charbuffer) < chars:
+            data = self.stream.read() if size < 0 else self.stream.read(size)
+            self.charbuffer += self._decoder.decode(data, not data)
+            if not data:
+                break
+
+        if chars < 0:
+            result, self.charbuffer = self.charbuffer, ""
+        else:
+            result, self.charbuffer = self.charbuffer[:chars], self.charbuffer[chars:]
+        return result
+
+    def reset(self) -> None:
+        super().reset()
+        self._decoder.reset()
+
+
+def make_codec_info(name: str, encoder_class: Type[IncrementalEncoder], decoder_class: Type[IncrementalDecoder]) -> codecs.CodecInfo:
+    """
+    Builds the codecs.CodecInfo of a tge codec from its incremental encoder and decoder.
+
+    Args:
+        name (str): The name of the codec.
+        encoder_class (Type[IncrementalEncoder]): The incremental encoder of the codec.
+        decoder_class (Type[IncrementalDecoder]): The incremental decoder of the codec.
+
+    Returns:
+        codecs.CodecInfo: The codec, encoding text into UTF-8 bytes of the encoded text.
+    """
+    def encode(input: str, errors: str = "strict") -> tuple:
+        return encoder_class(errors).encode(input, True), len(input)
+
+    def decode(input: bytes, errors: str = "strict") -> tuple:
+        return decoder_class(errors).decode(bytes(input), True), len(input)
+
+    return codecs.CodecInfo(
+        encode,
+        decode,
+        incrementalencoder=encoder_class,
+        incrementaldecoder=decoder_class,
+        streamwriter=type("StreamWriter", (StreamWriter,), {"incremental_encoder": encoder_class}),
+        streamreader=type("StreamReader", (StreamReader,), {"incremental_decoder": decoder_class}),
+        name=name,
+    )
+
+
+def _search_codec(name: str) -> Union[codecs.CodecInfo, None]:
+    name = name.replace("-", "_")
+    module_name = CODEC_MODULES.get(name)
+    if module_name is None:
+        return None
+    module = importlib.import_module(f".{module_name}", __package__)
+    return make_codec_info(name, module.IncrementalEncoder, module.IncrementalDecoder)
+
+
+codecs.register(_search_codec)
+
+
+def iter_text_chunks(src: Any, chunk_size: int) -> Iterator[str]:
+    """Reads a text or binary file object in chunks, binary ones being read as UTF-8."""
+    utf8_decoder = None
+    while True:
+        chunk = src.read(chunk_size)
+        if isinstance(chunk, (bytes, bytearray)):
+            if utf8_decoder is None:
+                utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+            text = utf8_decoder.decode(chunk, not chunk)
+        else:
+            text = chunk
+        if text:
+            yield text
+        if not chunk:
+            return
+
+
+def _get_write(dst: Any):
+    mode = getattr(dst, "mode", "")
+    if isinstance(dst, (io.RawIOBase, io.BufferedIOBase)) or (isinstance(mode, str) and "b" in mode):
+        return lambda text: dst.write(text.encode("utf-8"))
+    return dst.write
+
+
+def transform_stream(src: Any, dst: Any, transform, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Runs an incremental text transform from one file object to another, one chunk at a time.
+
+    Args:
+        src (Any): The file object to read, text or binary (read as UTF-8).
+        dst (Any): The file object to write, text or binary (written as UTF-8).
+        transform: Called with each chunk of text and whether it is the last one, returning the text to write,
+            like IncrementalEncoder.encode_text.
+        chunk_size (int, optional): How much to read at once. Defaults to DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        int: The number of characters written.
+    """
+    write = _get_write(dst)
+    written = 0
+    for chunk in iter_text_chunks(src, chunk_size):
+        output = transform(chunk, False)
+        if output:
+            write(output)
+            written += len(output)
+    output = transform("", True)
+    if output:
+        write(output)
+        written += len(output)
+    return written
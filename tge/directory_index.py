@@ -0,0 +1,593 @@
+"""
+An opt-in index of the file metadata of a directory tree.
+
+A DirectoryIndex scans its tree once into SQLite and then keeps the index current with Linux inotify, or by
+rescanning every few seconds where inotify isn't available. While an index is open, the file_operations helpers
+(find_files_with_extension, count_items_in_directory, get_file_size_of_directory,
+get_latest_file_in_directory_from_all_filenames_that_are_real_numbers and the incremental generate_uuid_from_directory)
+answer from it instead of the disk for any directory inside its tree:
+
+    with DirectoryIndex("assets"):
+        find_files_with_extension("assets", ".png")  # no directory walk
+"""
+import os
+import sys
+import stat
+import struct
+import select
+import sqlite3
+import hashlib
+import threading
+from typing import Union, Tuple, Iterable, List, Dict
+
+
+DEFAULT_POLL_INTERVAL = 2.0
+INDEX_FORMAT_VERSION = 1
+
+# Entry kinds, symlinks to files are files with the stat of their target (like os.path.isfile)
+FILE, DIRECTORY, FILE_LINK, DIRECTORY_LINK, OTHER = range(5)
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path BLOB PRIMARY KEY,
+    parent BLOB NOT NULL,
+    name BLOB NOT NULL,
+    reversed_name BLOB NOT NULL,
+    kind INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent);
+CREATE INDEX IF NOT EXISTS entries_reversed_name ON entries (reversed_name);
+CREATE INDEX IF NOT EXISTS entries_size ON entries (size);
+CREATE INDEX IF NOT EXISTS entries_mtime ON entries (mtime_ns);
+"""
+
+_active_indexes: List["DirectoryIndex"] = []
+_active_indexes_lock = threading.Lock()
+
+
+def _load_inotify():
+    """Returns the libc with inotify, or None where it isn't available."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def _prefix_upper_bound(prefix: bytes) -> Union[bytes, None]:
+    """The smallest byte string above every string starting with prefix, None if there is none."""
+    prefix = prefix.rstrip(b"\xff")
+    return prefix[:-1] + bytes((prefix[-1] + 1,)) if prefix else None
+
+
+def _make_row(parent: bytes, name: bytes, path: bytes, lstat_result: os.stat_result) -> tuple:
+    """The entries row of a directory entry from its lstat."""
+    stat_result = lstat_result
+    mode = lstat_result.st_mode
+    if stat.S_ISREG(mode):
+        kind = FILE
+    elif stat.S_ISDIR(mode):
+        kind = DIRECTORY
+    elif stat.S_ISLNK(mode):
+        try:
+            target = os.stat(path)
+        except OSError:
+            kind = OTHER
+        else:
+            if stat.S_ISREG(target.st_mode):
+                kind, stat_result = FILE_LINK, target
+            else:
+                kind = DIRECTORY_LINK if stat.S_ISDIR(target.st_mode) else OTHER
+    else:
+        kind = OTHER
+    relative_path = parent + b"/" + name if parent else name
+    return (
+        relative_path, parent, name, name[::-1], kind, stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino
+    )
+
+
+class DirectoryIndex:
+    """
+    Keeps the metadata of every entry below a directory in SQLite, current through inotify or polling.
+
+    Open it with start() (or a with block) and close it with close(). Every query first takes in the changes the
+    kernel already reported, so with inotify a query sees the changes made before it, while with polling queries can
+    be up to poll_interval seconds behind the disk.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        database_path: Union[str, None] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+    ) -> None:
+        """
+        Args:
+            root (str): The directory to index.
+            database_path (Union[str, None], optional): Where to keep the index, ":memory:" to keep it in memory.
+                Defaults to a file in the tge cache directory.
+            poll_interval (float, optional): Seconds between rescans when polling. Defaults to DEFAULT_POLL_INTERVAL.
+            use_inotify (bool, optional): Whether to follow changes with inotify where available instead of polling.
+                Defaults to True.
+        """
+        self.root = os.path.abspath(root)
+        self._root = os.fsencode(self.root)
+        if database_path is None:
+            from .library_utils import get_user_cache_directory
+
+            root_id = hashlib.sha1(self._root).hexdigest()
+            directory = os.path.join(get_user_cache_directory(), "directory_indexes")
+            os.makedirs(directory, exist_ok=True)
+            database_path = os.path.join(directory, f"{root_id}.v{INDEX_FORMAT_VERSION}.sqlite3")
+        self.database_path = database_path
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.mode = None
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._connection = None
+        self._libc = None
+        self._inotify_fd = None
+        self._watches: Dict[int, bytes] = {}
+        self._watched_directories: Dict[bytes, int] = {}
+        self._watch_failed = False
+
+    def __enter__(self) -> "DirectoryIndex":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def start(self) -> "DirectoryIndex":
+        """
+        Scans the tree into the index and starts following its changes.
+
+        Returns:
+            DirectoryIndex: The index itself.
+        """
+        with self._lock:
+            if self._connection is not None:
+                return self
+            self._connection = sqlite3.connect(self.database_path, check_same_thread=False, timeout=30)
+            # The index can always be rebuilt from the disk, so it isn't worth syncing
+            self._connection.execute("PRAGMA synchronous = OFF")
+            self._connection.executescript(_SCHEMA)
+
+            libc = _load_inotify() if self.use_inotify else None
+            if libc is not None:
+                fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+                if fd >= 0:
+                    self._libc, self._inotify_fd = libc, fd
+            self.refresh()
+            if self._watch_failed:
+                # Out of inotify watches (see fs.inotify.max_user_watches), the tree is followed by polling instead
+                self._close_inotify()
+                self.refresh()
+            self.mode = "polling" if self._inotify_fd is None else "inotify"
+
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._follow_changes, name=f"DirectoryIndex({self.root})", daemon=True)
+            self._thread.start()
+        with _active_indexes_lock:
+            _active_indexes.append(self)
+        return self
+
+    def close(self) -> None:
+        """Stops following changes and closes the index."""
+        with _active_indexes_lock:
+            if self in _active_indexes:
+                _active_indexes.remove(self)
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self._close_inotify()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            self.mode = None
+
+    def refresh(self) -> None:
+        """Rebuilds the index with a full scan of the tree."""
+        rows = self._scan(b"")
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries")
+            self._connection.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _close_inotify(self) -> None:
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+        self._inotify_fd = None
+        self._watches.clear()
+        self._watched_directories.clear()
+        self._watch_failed = False
+
+    def _absolute(self, relative_path: bytes) -> bytes:
+        return self._root + b"/" + relative_path if relative_path else self._root
+
+    def _add_watch(self, relative_path: bytes) -> None:
+        if self._inotify_fd is None or self._watch_failed:
+            return
+        wd = self._libc.inotify_add_watch(self._inotify_fd, self._absolute(relative_path), WATCH_MASK)
+        if wd < 0:
+            import ctypes
+            import errno
+
+            # A directory removed while being scanned doesn't matter, running out of watches does
+            if ctypes.get_errno() == errno.ENOSPC:
+                self._watch_failed = True
+            return
+        old_path = self._watches.get(wd)
+        if old_path is not None and self._watched_directories.get(old_path) == wd:
+            del self._watched_directories[old_path]
+        self._watches[wd] = relative_path
+        self._watched_directories[relative_path] = wd
+
+    def _remove_watches(self, relative_path: bytes) -> None:
+        prefix = relative_path + b"/"
+        for directory in [directory for directory in self._watched_directories if directory == relative_path or directory.startswith(prefix)]:
+            wd = self._watched_directories.pop(directory)
+            self._watches.pop(wd, None)
+            self._libc.inotify_rm_watch(self._inotify_fd, wd)
+
+    def _scan(self, relative_directory: bytes) -> List[tuple]:
+        """The rows of everything below a directory, watching every directory before it is listed."""
+        rows = []
+        pending = [relative_directory]
+        while pending:
+            parent = pending.pop()
+            self._add_watch(parent)
+            try:
+                with os.scandir(self._absolute(parent)) as entries:
+                    for entry in entries:
+                        try:
+                            row = _make_row(parent, entry.name, entry.path, entry.stat(follow_symlinks=False))
+                        except OSError:
+                            continue
+                        rows.append(row)
+                        if row[4] == DIRECTORY:
+                            pending.append(row[0])
+            except OSError:
+                pass
+        return rows
+
+    def _delete(self, relative_path: bytes) -> None:
+        """Removes an entry and, if it is a directory, everything below it."""
+        self._connection.execute(
+            "DELETE FROM entries WHERE path = ? OR (path >= ? AND path < ?)",
+            (relative_path, relative_path + b"/", relative_path + b"0"),
+        )
+        if self._inotify_fd is not None:
+            self._remove_watches(relative_path)
+
+    def _follow_changes(self) -> None:
+        while not self._stopped.is_set():
+            fd = self._inotify_fd
+            if fd is None:
+                # Polling, from the start or since the watches ran out
+                if not self._stopped.wait(self.poll_interval):
+                    self.refresh()
+                continue
+            try:
+                readable, _, _ = select.select([fd], [], [], 0.5)
+            except (OSError, ValueError):
+                # Closed by a query that switched to polling
+                continue
+            if readable and not self._stopped.is_set():
+                self._sync()
+
+    def _sync(self) -> None:
+        """Applies the changes inotify reported so far."""
+        with self._lock:
+            if self._inotify_fd is None:
+                return
+            events = []
+            while True:
+                try:
+                    data = os.read(self._inotify_fd, 64 * 1024)
+                except BlockingIOError:
+                    break
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                    offset += _EVENT_HEADER.size
+                    events.append((wd, mask, data[offset:offset + length].rstrip(b"\0")))
+                    offset += length
+            if events:
+                self._apply_events(events)
+
+    def _apply_events(self, events: List[Tuple[int, int, bytes]]) -> None:
+        changed = {}
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                self.refresh()
+                return
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                if self._watched_directories.get(directory) == wd:
+                    del self._watched_directories[directory]
+                del self._watches[wd]
+            elif name:
+                changed[directory + b"/" + name if directory else name] = None
+            elif not directory and mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                # The root itself went away
+                self.refresh()
+                return
+
+        stats = {}
+        with self._connection:
+            # Removals first, so a directory moved inside the tree loses its old watch before it is watched again
+            for relative_path in changed:
+                try:
+                    stats[relative_path] = os.lstat(self._absolute(relative_path))
+                except OSError:
+                    self._delete(relative_path)
+            for relative_path, lstat_result in stats.items():
+                parent, _, name = relative_path.rpartition(b"/")
+                row = _make_row(parent, name, self._absolute(relative_path), lstat_result)
+                old = self._connection.execute("SELECT kind FROM entries WHERE path = ?", (relative_path,)).fetchone()
+                if row[4] == DIRECTORY and old != (DIRECTORY,):
+                    self._delete(relative_path)
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [row] + self._scan(relative_path)
+                    )
+                else:
+                    if old == (DIRECTORY,) and row[4] != DIRECTORY:
+                        self._delete(relative_path)
+                    self._connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+        if self._watch_failed:
+            self._close_inotify()
+            self.mode = "polling"
+            self.refresh()
+
+    def _relative_directory(self, directory: str) -> Union[bytes, None]:
+        """The indexed path of a directory inside the tree, None if it is outside or not a directory."""
+        self._sync()
+        relative_path = os.path.relpath(os.path.abspath(directory), self.root)
+        if relative_path == os.curdir:
+            return b""
+        if relative_path == os.pardir or relative_path.startswith(os.pardir + os.sep):
+            return None
+        relative_path = os.fsencode(relative_path.replace(os.sep, "/"))
+        with self._lock:
+            row = self._connection.execute("SELECT kind FROM entries WHERE path = ?", (relative_path,)).fetchone()
+        return relative_path if row == (DIRECTORY,) else None
+
+    def covers(self, directory: str) -> bool:
+        """
+        Checks if a directory is inside the indexed tree.
+
+        Args:
+            directory (str): The path to the directory.
+
+        Returns:
+            bool: True if the index can answer queries about the directory.
+        """
+        return self._connection is not None and self._relative_directory(directory) is not None
+
+    def _query(
+        self, directory: str, columns: str, condition: str = "", parameters: tuple = (), recursive: bool = True
+    ) -> Tuple[bytes, List[tuple]]:
+        """The indexed path of directory and the rows selected from the entries below it (or in it)."""
+        relative_path = self._relative_directory(directory)
+        if relative_path is None:
+            raise ValueError(f"{directory} is not a directory indexed by {self.root}")
+        if not recursive:
+            where, where_parameters = "parent = ?", (relative_path,)
+        elif relative_path:
+            where, where_parameters = "path >= ? AND path < ?", (relative_path + b"/", relative_path + b"0")
+        else:
+            where, where_parameters = "1", ()
+        sql = f"SELECT {columns} FROM entries WHERE {where}{condition}"
+        with self._lock:
+            return relative_path, self._connection.execute(sql, where_parameters + parameters).fetchall()
+
+    @staticmethod
+    def _join(directory: str, relative_directory: bytes, relative_path: bytes) -> str:
+        """The path of an entry below directory, from the indexed paths of both."""
+        if relative_directory:
+            relative_path = relative_path[len(relative_directory) + 1:]
+        return os.path.join(directory, os.fsdecode(relative_path).replace("/", os.sep))
+
+    def list_directory(self, directory: str) -> List[str]:
+        """
+        Lists the names of the entries of a directory, like os.listdir.
+
+        Args:
+            directory (str): The path to the directory.
+
+        Returns:
+            List[str]: The names of the files and directories in it.
+        """
+        return [os.fsdecode(name) for name, in self._query(directory, "name", recursive=False)[1]]
+
+    def count_items(self, directory: str) -> int:
+        """
+        Counts the entries of a directory, like len(os.listdir(directory)).
+
+        Args:
+            directory (str): The path to the directory.
+
+        Returns:
+            int: The number of files and directories in it.
+        """
+        return self._query(directory, "COUNT(*)", recursive=False)[1][0][0]
+
+    def find_files_with_extensions(self, directory: str, file_extensions: Iterable[str]) -> List[str]:
+        """
+        Finds the files below a directory whose names end with any of the extensions, like find_files_with_extensions.
+
+        Args:
+            directory (str): The path to the directory.
+            file_extensions (Iterable[str]): The file extensions (or any file name endings) to search for, like ".txt".
+
+        Returns:
+            List[str]: The paths of the matching files, joined to directory.
+        """
+        relative_directory, relative_paths = b"", set()
+        for extension in set(file_extensions):
+            reversed_extension = os.fsencode(extension)[::-1]
+            condition, parameters = f" AND kind NOT IN ({DIRECTORY}, {DIRECTORY_LINK})", ()
+            if reversed_extension:
+                # A suffix of the name is a prefix of the reversed name, which is a range of its index
+                upper_bound = _prefix_upper_bound(reversed_extension)
+                condition += " AND reversed_name >= ?" + (" AND reversed_name < ?" if upper_bound else "")
+                parameters = (reversed_extension, upper_bound) if upper_bound else (reversed_extension,)
+            relative_directory, rows = self._query(directory, "path", condition, parameters)
+            relative_paths.update(path for path, in rows)
+        return [self._join(directory, relative_directory, relative_path) for relative_path in sorted(relative_paths)]
+
+    def find_files_by_size(self, directory: str, min_size: int = 0, max_size: Union[int, None] = None) -> List[Tuple[str, int]]:
+        """
+        Finds the files below a directory within a size range.
+
+        Args:
+            directory (str): The path to the directory.
+            min_size (int, optional): The smallest size in bytes. Defaults to 0.
+            max_size (Union[int, None], optional): The biggest size in bytes. Defaults to no limit.
+
+        Returns:
+            List[Tuple[str, int]]: The paths of the files, joined to directory, with their sizes, smallest first.
+        """
+        condition, parameters = f" AND kind IN ({FILE}, {FILE_LINK}) AND size >= ?", (min_size,)
+        if max_size is not None:
+            condition, parameters = condition + " AND size <= ?", parameters + (max_size,)
+        relative_directory, rows = self._query(directory, "path, size", condition + " ORDER BY size, path", parameters)
+        return [(self._join(directory, relative_directory, relative_path), size) for relative_path, size in rows]
+
+    def get_latest_file(self, directory: str, recursive: bool = True) -> Union[str, None]:
+        """
+        Finds the most recently modified file in a directory.
+
+        Args:
+            directory (str): The path to the directory.
+            recursive (bool, optional): Whether to also look in its subdirectories. Defaults to True.
+
+        Returns:
+            Union[str, None]: The path of the file, joined to directory, or None if there are no files.
+        """
+        condition = f" AND kind IN ({FILE}, {FILE_LINK}) ORDER BY mtime_ns DESC LIMIT 1"
+        relative_directory, rows = self._query(directory, "path", condition, recursive=recursive)
+        return self._join(directory, relative_directory, rows[0][0]) if rows else None
+
+    def get_latest_numbered_file(self, directory: str) -> Union[str, None]:
+        """
+        Finds the file of a directory whose name (without extension) is the highest integer,
+        like get_latest_file_in_directory_from_all_filenames_that_are_real_numbers.
+
+        Args:
+            directory (str): The path to the directory.
+
+        Returns:
+            Union[str, None]: The name of the file, or None if no file name is an integer.
+        """
+        max_num = -1
+        latest_file = None
+        for name, in self._query(directory, "name", f" AND kind IN ({FILE}, {FILE_LINK})", recursive=False)[1]:
+            file = os.fsdecode(name)
+            try:
+                file_number = int(os.path.splitext(file)[0])
+            except ValueError:
+                continue
+            if file_number > max_num:
+                max_num = file_number
+                latest_file = file
+        return latest_file
+
+    def get_total_size(self, directory: str, blacklisted_file_extensions: Iterable[str] = (), chunk_size: int = 1) -> int:
+        """
+        Sums the sizes of the files below a directory, leaving out symlinks like get_file_size_of_directory.
+
+        Args:
+            directory (str): The path to the directory.
+            blacklisted_file_extensions (Iterable[str], optional): File extensions to exclude from the sum.
+            chunk_size (int, optional): The chunk size to round every file size up to. Defaults to 1 (no rounding).
+
+        Returns:
+            int: The total size in bytes.
+        """
+        condition, parameters = f" AND kind = {FILE}", ()
+        for extension in set(blacklisted_file_extensions):
+            extension = os.fsencode(extension)
+            if not extension:
+                return 0
+            condition += " AND substr(name, ?) != ?"
+            parameters += (-len(extension), extension)
+        chunk_size = int(chunk_size)
+        rows = self._query(directory, f"SUM((size + {chunk_size - 1}) / {chunk_size} * {chunk_size})", condition, parameters)[1]
+        return rows[0][0] or 0
+
+    def get_files(self, directory: str, blacklisted_extensions: Iterable[str] = ()) -> Dict[str, Tuple[str, int, int, int]]:
+        """
+        Maps the path relative to directory (with "/" separators) of every file below it to (path, size, mtime_ns, inode).
+
+        Args:
+            directory (str): The path to the directory.
+            blacklisted_extensions (Iterable[str], optional): File extensions to leave out.
+
+        Returns:
+            Dict[str, Tuple[str, int, int, int]]: The files, symlinks to files included with the stat of their target.
+        """
+        blacklisted_extensions = tuple(blacklisted_extensions)
+        relative_directory, rows = self._query(directory, "path, name, size, mtime_ns, inode", f" AND kind IN ({FILE}, {FILE_LINK})")
+        skip = len(relative_directory) + 1 if relative_directory else 0
+        files = {}
+        for relative_path, name, size, mtime_ns, inode in rows:
+            if blacklisted_extensions and os.fsdecode(name).endswith(blacklisted_extensions):
+                continue
+            relative_path = os.fsdecode(relative_path[skip:])
+            files[relative_path] = (os.path.join(directory, relative_path.replace("/", os.sep)), size, mtime_ns, inode)
+        return files
+
+
+def find_directory_index(directory: str) -> Union[DirectoryIndex, None]:
+    """
+    Finds an open DirectoryIndex that can answer queries about a directory.
+
+    Args:
+        directory (str): The path to the directory.
+
+    Returns:
+        Union[DirectoryIndex, None]: The index, or None if no open index covers the directory.
+    """
+    with _active_indexes_lock:
+        indexes = list(_active_indexes)
+    for index in indexes:
+        if index.covers(directory):
+            return index
+    return None
@@ -1,16 +1,24 @@
 import os
+import sys
 import shutil
-from ast import parse as ast_parse, walk as ast_walk, FunctionDef as ast_FunctionDef
 import zipfile
-import math
 import hashlib
 import uuid
-from typing import Union, Tuple, Iterable, List
-from collections import defaultdict
+import json
+import time
+import threading
+import mmap
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+import fnmatch
+from typing import Any, Union, Tuple, Iterable, List, Dict, Callable
+from collections import defaultdict, deque
 import tkinter as tk
 import re
 
-from .codec.codec import decode, base_x_decode_to_binary, base_x_encode_binary
+from .codec.codec import decode
+from .source_analysis import analyze_files, get_functions, find_python_files
 from . import SYSTEM_NAME
 
 def make_legal_filename(filename: str, replacer:str="_") -> str:
@@ -273,53 +281,215 @@ def get_folder_name(path: str) -> str:
         return final_file_path
 
 
-def combine_files(directory: str, output_directory: str, name: str) -> bool:
+PACK_MAGIC = b"TGEPACK1"
+_PACK_HEADER = struct.Struct("<8sQQ")
+
+
+def pack_files(
+    directory: str,
+    output_path: str,
+    compression_level: int = 0,
+    recursive: bool = False,
+    chunk_size: int = 1024 * 1024,
+) -> List[dict]:
     """
-    Combines multiple files from a directory into a single encrypted file.
+    Packs the files of a directory into one file, streaming each file from disk in chunks.
+
+    The pack starts with a fixed header pointing to a JSON index of every member's name, offset, length,
+    uncompressed size, CRC-32 and compression, which is written after the member data. Members can be read back
+    one at a time with extract_pack_member without touching the rest of the pack.
+
+    Args:
+        directory (str): The directory containing the files to pack.
+        output_path (str): The path of the pack file to write.
+        compression_level (int, optional): zlib level from 1 to 9 to compress every member with, 0 stores them as is. Defaults to 0.
+        recursive (bool, optional): Also pack the files in sub directories, named by their relative path with '/'. Defaults to False.
+        chunk_size (int, optional): How many bytes to read at once. Defaults to 1 MiB.
+
+    Returns:
+        List[dict]: The index of the pack.
+    """
+    if recursive:
+        file_paths = sorted((relative_path, path) for relative_path, (path, *_) in _scan_directory_files(directory).items())
+    else:
+        file_paths = sorted(
+            (file_name, os.path.join(directory, file_name))
+            for file_name in os.listdir(directory)
+            if os.path.isfile(os.path.join(directory, file_name))
+        )
+
+    index = []
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(output_path, "wb") as pack:
+        pack.write(_PACK_HEADER.pack(PACK_MAGIC, 0, 0))
+        for name, file_path in file_paths:
+            offset = pack.tell()
+            size = checksum = 0
+            compressor = zlib.compressobj(compression_level) if compression_level else None
+            with open(file_path, "rb", buffering=0) as file:
+                while True:
+                    read = file.readinto(buffer)
+                    if not read:
+                        break
+                    chunk = view[:read]
+                    size += read
+                    checksum = zlib.crc32(chunk, checksum)
+                    pack.write(compressor.compress(chunk) if compressor else chunk)
+            if compressor:
+                pack.write(compressor.flush())
+            index.append({
+                "name": name,
+                "offset": offset,
+                "length": pack.tell() - offset,
+                "size": size,
+                "crc32": checksum,
+                "compression": "zlib" if compressor else None,
+            })
+
+        index_offset = pack.tell()
+        encoded_index = json.dumps(index, separators=(",", ":")).encode()
+        pack.write(encoded_index)
+        pack.seek(0)
+        pack.write(_PACK_HEADER.pack(PACK_MAGIC, index_offset, len(encoded_index)))
+    return index
+
+
+def read_pack_index(pack_path: str) -> List[dict]:
+    """
+    Reads the index of a pack made by pack_files.
+
+    Args:
+        pack_path (str): The path of the pack file.
+
+    Returns:
+        List[dict]: Every member's "name", "offset", "length", "size", "crc32" and "compression".
+
+    Raises:
+        ValueError: If the file isn't a pack, or its index is truncated or corrupt.
+    """
+    with open(pack_path, "rb") as pack:
+        header = pack.read(_PACK_HEADER.size)
+        if len(header) != _PACK_HEADER.size or header[:len(PACK_MAGIC)] != PACK_MAGIC:
+            raise ValueError(f"{pack_path} is not a tge pack")
+        _, index_offset, index_length = _PACK_HEADER.unpack(header)
+        pack_size = os.fstat(pack.fileno()).st_size
+        if index_offset < _PACK_HEADER.size or index_offset + index_length > pack_size:
+            raise ValueError(f"{pack_path} is truncated, its index is missing")
+        pack.seek(index_offset)
+        try:
+            index = json.loads(pack.read(index_length))
+        except ValueError as error:
+            raise ValueError(f"{pack_path} has a corrupt index: {error}") from None
+    if not isinstance(index, list) or not all(_is_pack_entry(entry, index_offset) for entry in index):
+        raise ValueError(f"{pack_path} has a corrupt index")
+    return index
+
+
+def _is_pack_entry(entry: Any, data_end: int) -> bool:
+    """Whether an index entry has every field with the right type, its data lying before the index."""
+    if not isinstance(entry, dict) or not isinstance(entry.get("name"), str):
+        return False
+    if entry.get("compression") not in (None, "zlib"):
+        return False
+    numbers = [entry.get(key) for key in ("offset", "length", "size", "crc32")]
+    if not all(type(number) is int and number >= 0 for number in numbers):
+        return False
+    return _PACK_HEADER.size <= entry["offset"] and entry["offset"] + entry["length"] <= data_end
+
+
+def _iter_pack_member(pack: mmap.mmap, entry: dict, chunk_size: int) -> Iterable[bytes]:
+    """Yield the uncompressed data of a pack member in chunks, checking its CRC-32 at the end."""
+    decompressor = zlib.decompressobj() if entry["compression"] == "zlib" else None
+    checksum = 0
+    end = entry["offset"] + entry["length"]
+    try:
+        for position in range(entry["offset"], end, chunk_size):
+            chunk = pack[position:min(position + chunk_size, end)]
+            if decompressor:
+                chunk = decompressor.decompress(chunk)
+            checksum = zlib.crc32(chunk, checksum)
+            yield chunk
+        if decompressor:
+            chunk = decompressor.flush()
+            checksum = zlib.crc32(chunk, checksum)
+            yield chunk
+    except zlib.error as error:
+        raise ValueError(f"Corrupt data for {entry['name']}: {error}") from None
+    if checksum != entry["crc32"] or decompressor and not decompressor.eof:
+        raise ValueError(f"Checksum mismatch for {entry['name']}")
+
+
+def _pack_member_output_path(output_directory: str, name: str) -> str:
+    """Where a member gets extracted to, refusing names that would end up outside of output_directory."""
+    parts = name.split("/")
+    if os.path.isabs(name) or any(part in ("", ".", "..") for part in parts):
+        raise ValueError(f"Unsafe member name {name!r}")
+    return os.path.join(output_directory, *parts)
+
+
+def extract_pack_member(pack_path: str, name: str, output_path: Union[str, None] = None, chunk_size: int = 1024 * 1024) -> Union[bytes, None]:
+    """
+    Extracts a single member of a pack made by pack_files, only reading that member's data.
+
+    Args:
+        pack_path (str): The path of the pack file.
+        name (str): The name of the member.
+        output_path (Union[str, None], optional): Stream the member into this file instead of returning it. Defaults to None.
+        chunk_size (int, optional): How many bytes to handle at once. Defaults to 1 MiB.
+
+    Returns:
+        Union[bytes, None]: The member's data, or None when it was written to output_path.
+
+    Raises:
+        KeyError: If the pack has no member with that name.
+        ValueError: If the pack's index is corrupt, or the member's data doesn't match its checksum.
+    """
+    for entry in read_pack_index(pack_path):
+        if entry["name"] == name:
+            break
+    else:
+        raise KeyError(name)
+
+    with open(pack_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as pack:
+        if output_path is None:
+            return b"".join(_iter_pack_member(pack, entry, chunk_size))
+        with open(output_path, "wb") as output:
+            for chunk in _iter_pack_member(pack, entry, chunk_size):
+                output.write(chunk)
+    return None
+
+
+def combine_files(directory: str, output_directory: str, name: str, compression_level: int = 0) -> bool:
+    """
+    Combines the files of a directory into a single pack file, see pack_files.
 
     Args:
         directory (str): The directory path containing the files to be combined.
         output_directory (str): The directory path where the combined file will be saved.
         name (str): The name of the combined file (without extension).
+        compression_level (int, optional): zlib level to compress the files with, 0 stores them as is. Defaults to 0.
 
     Returns:
-        bool: True if the files are successfully combined and saved as an encrypted file,
+        bool: True if the files are successfully combined and saved as name.encrypted,
               False if an error occurs during the process.
 
     Raises:
         Any exceptions raised during the execution will be caught and cause the function to return False.
     """
     try:
-        file_data = []
-        for file_name in os.listdir(directory):
-            file_path = os.path.join(directory, file_name)
-
-            if os.path.isfile(file_path):
-                with open(file_path, "rb") as file:
-                    file_bytes = file.read()
-                    file_data.append((file_name, file_bytes))
-
-        combined_data = b""
-        for file_name, file_bytes in file_data:
-            combined_data += file_name.encode() + b":" + file_bytes + b"|"
-
-        encoded_data = base_x_encode_binary(combined_data)
-
-        output_file = os.path.join(output_directory, name + ".encrypted")
-        with open(output_file, "wb") as file:
-            file.write(encoded_data)
-
+        pack_files(directory, os.path.join(output_directory, name + ".encrypted"), compression_level)
         return True
-    except:
+    except Exception:
         return False
 
 
 def split_file(directory: str, output_directory: str) -> bool:
     """
-    Splits a combined encrypted file into individual files and saves them to the output directory.
+    Splits a file made by combine_files back into individual files and saves them to the output directory.
 
     Args:
-        directory (str): The path of the combined encrypted file.
+        directory (str): The path of the combined file.
         output_directory (str): The directory path where the individual files will be saved.
 
     Returns:
@@ -330,20 +500,16 @@ def split_file(directory: str, output_directory: str) -> bool:
         Any exceptions raised during the execution will be caught and cause the function to return False.
     """
     try:
-        with open(directory, "rb") as file:
-            encoded_data = file.read()
-
-        combined_data = base_x_decode_to_binary(encoded_data).decode("utf-8")
-
-        file_data = combined_data.split(b"|")[:-1] 
-
-        for data in file_data:
-            file_name, file_bytes = data.split(b":", 1)
-            output_file_path = os.path.join(output_directory, file_name.decode())
-            with open(output_file_path, "wb") as file:
-                file.write(file_bytes)
+        index = read_pack_index(directory)
+        with open(directory, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as pack:
+            for entry in index:
+                output_file_path = _pack_member_output_path(output_directory, entry["name"])
+                os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+                with open(output_file_path, "wb") as output:
+                    for chunk in _iter_pack_member(pack, entry, 1024 * 1024):
+                        output.write(chunk)
         return True
-    except:
+    except Exception:
         return False
 
 
@@ -387,21 +553,106 @@ def delete_file(directory: str) -> bool:
     os.remove(directory)
 
 
-def compare_file(directory1: str, directory2: str) -> bool:
+def compare_file(directory1: str, directory2: str, chunk_size: int = 1024 * 1024) -> bool:
     """
     Compares the contents of two files and returns True if they are identical, False otherwise.
 
+    The sizes are compared first, then both files are streamed in chunks and the comparison stops at the first
+    chunk that differs, so big files are never fully read into memory.
+
     Args:
         directory1 (str): The path to the first file.
         directory2 (str): The path to the second file.
+        chunk_size (int, optional): How many bytes to compare at once. Defaults to 1 MiB.
 
     Returns:
         bool: True if the contents of the files are identical, False otherwise.
 
 
     """
-    with open(directory1, "rb") as f1, open(directory2, "rb") as f2:
-        return f1.read() == f2.read()
+    if os.path.getsize(directory1) != os.path.getsize(directory2):
+        return False
+    if os.path.samefile(directory1, directory2):
+        return True
+
+    buffer1, buffer2 = bytearray(chunk_size), bytearray(chunk_size)
+    view1, view2 = memoryview(buffer1), memoryview(buffer2)
+    with open(directory1, "rb", buffering=0) as f1, open(directory2, "rb", buffering=0) as f2:
+        while True:
+            read1 = f1.readinto(buffer1)
+            read2 = f2.readinto(buffer2)
+            # Unbuffered reads can come back short, top up the smaller one so both chunks line up
+            while read1 != read2:
+                if read1 < read2:
+                    extra = f1.readinto(view1[read1:read2])
+                    if not extra:
+                        return False
+                    read1 += extra
+                else:
+                    extra = f2.readinto(view2[read2:read1])
+                    if not extra:
+                        return False
+                    read2 += extra
+            if not read1:
+                return True
+            if view1[:read1] != view2[:read2]:
+                return False
+
+
+def compare_directories(
+    directory1: str,
+    directory2: str,
+    dir1_blacklist: Iterable[str] = (),
+    dir2_blacklist: Iterable[str] = (),
+    stop_at_first_difference: bool = False,
+    workers: Union[int, None] = None,
+) -> Dict[str, List[str]]:
+    """
+    Compares two directories file by file.
+
+    The file lists and sizes are compared first, only the files that exist on both sides with the same size are
+    read, concurrently and with compare_file so every pair stops at its first differing chunk.
+
+    Args:
+        directory1 (str): The path to the first directory.
+        directory2 (str): The path to the second directory.
+        dir1_blacklist (Iterable[str], optional): File extensions to ignore in the first directory.
+        dir2_blacklist (Iterable[str], optional): File extensions to ignore in the second directory.
+        stop_at_first_difference (bool, optional): Stop reading file contents as soon as any difference is found, the
+            result then isn't complete. Defaults to False.
+        workers (Union[int, None], optional): Number of threads comparing file contents. Defaults to the ThreadPoolExecutor default.
+
+    Returns:
+        Dict[str, List[str]]: The sorted relative paths that are "added" (only in directory2), "removed" (only in
+        directory1) and "changed" (different content).
+    """
+    files1 = _scan_directory_files(os.path.abspath(directory1), dir1_blacklist)
+    files2 = _scan_directory_files(os.path.abspath(directory2), dir2_blacklist)
+
+    difference = {
+        "added": sorted(files2.keys() - files1.keys()),
+        "removed": sorted(files1.keys() - files2.keys()),
+        "changed": sorted(path for path in files1.keys() & files2.keys() if files1[path][1] != files2[path][1]),
+    }
+    if stop_at_first_difference and any(difference.values()):
+        return difference
+
+    same_size = sorted((path for path in files1.keys() & files2.keys() if files1[path][1] == files2[path][1]), key=lambda path: files1[path][1])
+    changed = []
+    if same_size:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {executor.submit(compare_file, files1[path][0], files2[path][0]): path for path in same_size}
+            for future in as_completed(futures):
+                if not future.result():
+                    changed.append(futures[future])
+                    if stop_at_first_difference:
+                        break
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    difference["changed"] = sorted(difference["changed"] + changed)
+    return difference
 
 
 def are_directories_the_same(
@@ -409,22 +660,35 @@ def are_directories_the_same(
     directory2: str,
     dir1_blacklist: list = [],
     dir2_blacklist: list = [],
-) -> bool:
+    return_difference: bool = False,
+) -> Union[bool, Dict[str, List[str]]]:
     """
+    Checks if two directories hold the same files with the same contents, stopping at the first difference.
 
     Args:
         directory1 (str): The path to the first directory.
         directory2 (str): The path to the second directory.
+        dir1_blacklist (list, optional): File extensions to ignore in the first directory.
+        dir2_blacklist (list, optional): File extensions to ignore in the second directory.
+        return_difference (bool, optional): Return the full difference instead of a bool, see compare_directories.
 
     Returns:
-        Union[bool, str]:
+        Union[bool, Dict[str, List[str]]]:
         - If the directories are the same, returns True
         - If the directories are different, returns False
+        - With return_difference, the "added", "removed" and "changed" relative paths
     """
+    if return_difference:
+        return compare_directories(directory1, directory2, dir1_blacklist, dir2_blacklist)
+    difference = compare_directories(directory1, directory2, dir1_blacklist, dir2_blacklist, stop_at_first_difference=True)
+    return not any(difference.values())
 
-    return generate_uuid_from_directory(
-        directory1, dir1_blacklist
-    ) == generate_uuid_from_directory(directory2, dir2_blacklist)
+
+def _get_directory_index(directory: str):
+    """Returns the open DirectoryIndex covering directory, if any (see tge.directory_index)."""
+    # No index can be open before its module is imported, so the helpers don't pay for importing it
+    directory_index = sys.modules.get(f"{__package__}.directory_index")
+    return None if directory_index is None else directory_index.find_directory_index(directory)
 
 
 def count_items_in_directory(directory_path) -> int:
@@ -437,6 +701,9 @@ def count_items_in_directory(directory_path) -> int:
     Returns:
         int: The total count of items in the directory.
     """
+    index = _get_directory_index(directory_path)
+    if index is not None:
+        return index.count_items(directory_path)
     return len(os.listdir(directory_path))
 
 
@@ -544,17 +811,11 @@ def count_functions_in_file(file_path: str) -> Tuple[int, list]:
 
         If an error occurs during file reading or parsing, the function returns (0, []).
     """
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            tree = ast_parse(file.read())
-            functions = [
-                node.name
-                for node in ast_walk(tree)
-                if isinstance(node, ast_FunctionDef)
-            ]
-            return len(functions), functions
-    except:
+    analysis = analyze_files([file_path])[file_path]
+    if analysis is None or "functions" not in analysis:
         return 0, []
+    functions = [function["name"] for function in analysis["functions"] if not function["async"]]
+    return len(functions), functions
 
 
 def count_functions_in_directory(directory_path: str) -> Tuple[int, dict, list]:
@@ -587,22 +848,14 @@ def count_functions_in_directory(directory_path: str) -> Tuple[int, dict, list]:
     total_function_count = 0
     error_files = []
 
-    for root, dirs, files in os.walk(directory_path):
-        for file in files:
-            if file.endswith(".py"):
-                file_path = os.path.join(root, file)
-                try:
-                    with open(file_path, "r", encoding="utf-8") as file:
-                        tree = ast_parse(file.read())
-                        functions = [
-                            node.name
-                            for node in ast_walk(tree)
-                            if isinstance(node, ast_FunctionDef)
-                        ]
-                        function_counts[file_path] = (len(functions), functions)
-                        total_function_count += len(functions)
-                except IOError:
-                    error_files.append(file_path)
+    # Parsed in a process pool and cached by content, see tge.source_analysis
+    for file_path, analysis in analyze_files(find_python_files(directory_path)).items():
+        if analysis is None:
+            error_files.append(file_path)
+            continue
+        functions = [function["name"] for function in get_functions(file_path, analysis) if not function["async"]]
+        function_counts[file_path] = (len(functions), functions)
+        total_function_count += len(functions)
 
     return total_function_count, function_counts, error_files
 
@@ -719,45 +972,225 @@ def input_directory_path() -> str:
     return save_path
 
 
+ZIP_BLOCK_SIZE = 1024 * 1024
+# Already compressed formats, deflating them again only costs time
+ZIP_STORE_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ogg", ".mp3", ".mp4", ".webm", ".zip", ".gz", ".bz2", ".xz", ".7z",
+)
+_ZIP_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_ZIP_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_ZIP_END_RECORD = struct.Struct("<IHHHHIIH")
+_ZIP64_END_RECORD = struct.Struct("<IQHHIIQQQQ")
+_ZIP64_END_LOCATOR = struct.Struct("<IIQI")
+
+
+class _ZipCancelled(Exception):
+    """Raised when a progress callback returns False."""
+
+
+def _deflate_block(block: bytes, previous_tail: bytes, level: int, final: bool) -> bytes:
+    """
+    Raw deflates one block of a member. Blocks end on a byte boundary (Z_SYNC_FLUSH) and use the end of the previous
+    block as dictionary, so the compressed blocks of a member joined together are one deflate stream, as in pigz.
+    """
+    if previous_tail:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=previous_tail)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _ZipWriter:
+    """Writes the members of a zip file from data compressed elsewhere, and the central directory on close."""
+
+    def __init__(self, fp) -> None:
+        self.fp = fp
+        self.members = []
+        self.create_system = 0 if SYSTEM_NAME == "windows" else 3
+
+    def start_member(self, name: str, stat_result: os.stat_result, method: int) -> list:
+        try:
+            encoded_name, flags = name.encode("ascii"), 0
+        except UnicodeEncodeError:
+            encoded_name, flags = name.encode("utf-8"), 0x800
+        year, month, day, hour, minute, second = time.localtime(stat_result.st_mtime)[:6]
+        if year < 1980:
+            year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+        elif year > 2107:
+            year, month, day, hour, minute, second = 2107, 12, 31, 23, 59, 59
+        dos_time = hour << 11 | minute << 5 | second // 2
+        dos_date = (year - 1980) << 9 | month << 5 | day
+        # Like zipfile, the sizes go in a ZIP64 extra field if the member could come near 4 GiB
+        zip64 = stat_result.st_size * 1.05 > zipfile.ZIP64_LIMIT
+        extra = struct.pack("<HHQQ", 1, 16, 0, 0) if zip64 else b""
+        member = [
+            encoded_name, flags, method, dos_time, dos_date, (stat_result.st_mode & 0xFFFF) << 16,
+            self.fp.tell(), zip64, 0, 0, 0,
+        ]
+        self.fp.write(
+            _ZIP_LOCAL_HEADER.pack(
+                0x04034B50, 45 if zip64 else 20, flags, method, dos_time, dos_date, 0, 0, 0, len(encoded_name), len(extra)
+            )
+            + encoded_name
+            + extra
+        )
+        self.members.append(member)
+        return member
+
+    def finish_member(self, member: list, crc: int, compress_size: int, file_size: int) -> None:
+        """Fills in the CRC and sizes of the local header of a member once all of its data is written."""
+        member[8:] = crc, compress_size, file_size
+        end = self.fp.tell()
+        self.fp.seek(member[6] + 14)
+        if member[7]:
+            self.fp.write(struct.pack("<III", crc, 0xFFFFFFFF, 0xFFFFFFFF))
+            self.fp.seek(member[6] + _ZIP_LOCAL_HEADER.size + len(member[0]) + 4)
+            self.fp.write(struct.pack("<QQ", file_size, compress_size))
+        else:
+            self.fp.write(struct.pack("<III", crc, compress_size, file_size))
+        self.fp.seek(end)
+
+    def close(self) -> None:
+        central_directory_offset = self.fp.tell()
+        for encoded_name, flags, method, dos_time, dos_date, external_attr, offset, _, crc, compress_size, file_size in self.members:
+            # Only the values that don't fit go in the ZIP64 extra field, in this order
+            zip64_values = []
+            if file_size > zipfile.ZIP64_LIMIT:
+                zip64_values.append(file_size)
+                file_size = 0xFFFFFFFF
+            if compress_size > zipfile.ZIP64_LIMIT:
+                zip64_values.append(compress_size)
+                compress_size = 0xFFFFFFFF
+            if offset > zipfile.ZIP64_LIMIT:
+                zip64_values.append(offset)
+                offset = 0xFFFFFFFF
+            extra = struct.pack(f"<HH{len(zip64_values)}Q", 1, 8 * len(zip64_values), *zip64_values) if zip64_values else b""
+            version = 45 if zip64_values else 20
+            self.fp.write(
+                _ZIP_CENTRAL_HEADER.pack(
+                    0x02014B50, self.create_system << 8 | version, version, flags, method, dos_time, dos_date,
+                    crc, compress_size, file_size, len(encoded_name), len(extra), 0, 0, 0, external_attr, offset,
+                )
+                + encoded_name
+                + extra
+            )
+        central_directory_end = self.fp.tell()
+        count = len(self.members)
+        central_directory_size = central_directory_end - central_directory_offset
+        if count >= 0xFFFF or central_directory_offset > zipfile.ZIP64_LIMIT or central_directory_size > zipfile.ZIP64_LIMIT:
+            self.fp.write(
+                _ZIP64_END_RECORD.pack(
+                    0x06064B50, _ZIP64_END_RECORD.size - 12, 45, 45, 0, 0, count, count,
+                    central_directory_size, central_directory_offset,
+                )
+                + _ZIP64_END_LOCATOR.pack(0x07064B50, 0, central_directory_end, 1)
+            )
+            count = min(count, 0xFFFF)
+            central_directory_offset = min(central_directory_offset, 0xFFFFFFFF)
+            central_directory_size = min(central_directory_size, 0xFFFFFFFF)
+        self.fp.write(
+            _ZIP_END_RECORD.pack(0x06054B50, 0, 0, count, count, central_directory_size, central_directory_offset, 0)
+        )
+
+
 def unzip_file(
-    zip_path: str, extract_dir: str, create_missing_directory_bool: bool = False
+    zip_path: str,
+    extract_dir: str,
+    create_missing_directory_bool: bool = False,
+    progress: Union[Callable[[int, int], Union[bool, None]], None] = None,
+    workers: Union[int, None] = None,
 ) -> Tuple[bool, bool]:
     """
-    Unzips a zip file to the specified extract directory.
+    Unzips a zip file to the specified extract directory, extracting the members in parallel threads.
 
     Args:
         zip_path (str): path to the zip file.
         extract_dir (str): Directory to extract the contents of the zip file to.
+        create_missing_directory_bool (bool, optional): Whether to create extract_dir if it doesn't exist.
+        progress (Union[Callable[[int, int], Union[bool, None]], None], optional): Called with the number of bytes
+            extracted so far and the total after every member, returning False cancels the extraction.
+        workers (Union[int, None], optional): Number of extraction threads. Defaults to the ThreadPoolExecutor default.
+
+    Returns:
+        Tuple[bool, bool]: Whether the zip file was extracted, and whether the arguments were valid.
     """
     if zip_path == "":
         return False, False
     if extract_dir == "":
         return False, False
+    archives = []
     try:
         if create_missing_directory_bool:
             existed = create_missing_directory(extract_dir)
         with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(extract_dir)
+            members = zip_ref.infolist()
+        total = sum(member.file_size for member in members)
+        local = threading.local()
+
+        def extract(member: zipfile.ZipInfo) -> int:
+            # Every thread reads through its own handle of the zip file
+            archive = getattr(local, "archive", None)
+            if archive is None:
+                archive = local.archive = zipfile.ZipFile(zip_path, "r")
+                archives.append(archive)
+            try:
+                archive.extract(member, extract_dir)
+            except FileExistsError:
+                # Another thread created the same parent directory in between, it exists now
+                archive.extract(member, extract_dir)
+            return member.file_size
+
+        extracted = 0
+        with ThreadPoolExecutor(workers) as executor:
+            # Biggest first, so a big member doesn't end up running alone at the end
+            futures = [executor.submit(extract, member) for member in sorted(members, key=lambda member: member.compress_size, reverse=True)]
+            try:
+                for future in as_completed(futures):
+                    extracted += future.result()
+                    if progress is not None and progress(extracted, total) is False:
+                        raise _ZipCancelled
+            finally:
+                for future in futures:
+                    future.cancel()
         return True, True
     except:
         if create_missing_directory_bool:
             if existed:
                 delete_directory(extract_dir)
         return False, True
+    finally:
+        for archive in archives:
+            archive.close()
 
 
 def zip_directory(
-    directory_path: str, output_path: str, create_missing_directory_bool: bool = False
+    directory_path: str,
+    output_path: str,
+    create_missing_directory_bool: bool = False,
+    compression_level: int = zlib.Z_DEFAULT_COMPRESSION,
+    store_extensions: Iterable[str] = ZIP_STORE_EXTENSIONS,
+    progress: Union[Callable[[int, int], Union[bool, None]], None] = None,
+    workers: Union[int, None] = None,
 ) -> Tuple[bool, bool]:
     """
     Zip a given directory and save the resulting zip file to the output path.
 
+    The files are deflated in blocks of ZIP_BLOCK_SIZE by parallel threads (zlib releases the GIL) and written in
+    order, so big files are compressed on every core too.
+
     Args:
         directory_path (str): path to the directory to be zipped.
         output_path (str): path to save the resulting zip file.
+        create_missing_directory_bool (bool, optional): Whether to create the directory of output_path if it doesn't exist.
+        compression_level (int, optional): The zlib compression level, 0 (none) to 9 (best). Defaults to zlib's default (6).
+        store_extensions (Iterable[str], optional): Extensions of the files to store without compressing them.
+            Defaults to ZIP_STORE_EXTENSIONS.
+        progress (Union[Callable[[int, int], Union[bool, None]], None], optional): Called with the number of bytes
+            zipped so far and the total after every block, returning False cancels zipping.
+        workers (Union[int, None], optional): Number of compression threads. Defaults to the number of CPUs.
 
     Returns:
-        None
+        Tuple[bool, bool]: Whether the zip file was written, and whether the arguments were valid.
     """
     if directory_path == "":
         return False, False
@@ -765,17 +1198,85 @@ def zip_directory(
         return False, False
     if not output_path.endswith(".zip"):
         output_path += ".zip"
+    output = None
     try:
-        if create_missing_directory_bool:
-            create_missing_directory(output_path)
-
-        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zipfile:
-            for root, dirs, files in os.walk(directory_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    zipfile.write(file_path, os.path.relpath(file_path, directory_path))
+        if create_missing_directory_bool and os.path.dirname(output_path):
+            create_missing_directory(os.path.dirname(output_path))
+
+        store_extensions = tuple(extension.lower() for extension in store_extensions)
+        output_absolute_path = os.path.abspath(output_path)
+        files = []
+        for root, dirs, file_names in os.walk(directory_path):
+            for file in file_names:
+                file_path = os.path.join(root, file)
+                if os.path.abspath(file_path) != output_absolute_path:
+                    arcname = os.path.relpath(file_path, directory_path).replace(os.sep, "/")
+                    files.append((file_path, arcname, os.stat(file_path)))
+        total = sum(stat_result.st_size for _, _, stat_result in files)
+
+        workers = workers or os.cpu_count() or 1
+        output = open(output_path, "wb")
+        writer = _ZipWriter(output)
+        # (member, future or block, block, first, last) of the blocks compressed or read but not written yet, a few
+        # per thread so the threads never wait for the writer, and memory stays bounded
+        pending = deque()
+        state = {"member": None, "crc": 0, "compress_size": 0, "file_size": 0, "written": 0}
+
+        def write_block() -> None:
+            (file_path, arcname, stat_result, method), compressed, block, first, last = pending.popleft()
+            if method == zipfile.ZIP_DEFLATED:
+                compressed = compressed.result()
+                if first and last and len(compressed) >= len(block):
+                    # Deflating made it bigger, which only happens to already compressed data
+                    compressed, method = block, zipfile.ZIP_STORED
+            if first:
+                state.update(member=writer.start_member(arcname, stat_result, method), crc=0, compress_size=0, file_size=0)
+            output.write(compressed)
+            state["crc"] = zlib.crc32(block, state["crc"])
+            state["compress_size"] += len(compressed)
+            state["file_size"] += len(block)
+            if last:
+                writer.finish_member(state["member"], state["crc"], state["compress_size"], state["file_size"])
+            state["written"] += len(block)
+            if progress is not None and progress(state["written"], total) is False:
+                raise _ZipCancelled
+
+        with ThreadPoolExecutor(workers) as executor:
+            try:
+                for file_path, arcname, stat_result in files:
+                    stored = compression_level == 0 or arcname.lower().endswith(store_extensions)
+                    job = (file_path, arcname, stat_result, zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED)
+                    with open(file_path, "rb") as f:
+                        block, previous_tail, first = f.read(ZIP_BLOCK_SIZE), b"", True
+                        while True:
+                            next_block = f.read(ZIP_BLOCK_SIZE) if block else b""
+                            last = not next_block
+                            if stored:
+                                compressed = block
+                            else:
+                                compressed = executor.submit(_deflate_block, block, previous_tail, compression_level, last)
+                            pending.append((job, compressed, block, first, last))
+                            while len(pending) > 4 * workers:
+                                write_block()
+                            if last:
+                                break
+                            previous_tail, block, first = block[-32768:], next_block, False
+                while pending:
+                    write_block()
+            finally:
+                for job, compressed, _, _, _ in pending:
+                    if job[3] == zipfile.ZIP_DEFLATED:
+                        compressed.cancel()
+        writer.close()
+        output.close()
         return True, True
     except:
+        if output is not None:
+            output.close()
+            try:
+                os.remove(output_path)
+            except OSError:
+                pass
         return False, True
 
 
@@ -840,6 +1341,10 @@ def get_latest_file_in_directory_from_all_filenames_that_are_real_numbers(
         Union[str, None]: The name of the latest file (with the highest integer value in its name)
                           or None if no such file is found.
     """
+    index = _get_directory_index(path)
+    if index is not None:
+        return index.get_latest_numbered_file(path)
+
     files = os.listdir(path)
     max_num = -1
     latest_file = None
@@ -884,6 +1389,101 @@ def get_filesize(file_path: str) -> int:
     return os.path.getsize(file_path)
 
 
+def _scan_directory_for_sizes(
+    directory: str,
+    relative_path: str,
+    blacklisted_file_extensions: Tuple[str, ...],
+    chunk_size: int,
+) -> Tuple[Tuple[str, List[int]], List[Tuple[str, str]]]:
+    """
+    Returns the relative path of one directory with the [files, apparent, rounded, allocated] sizes of its own
+    files, and the (path, relative path) of the directories to scan next.
+    """
+    sizes = [0, 0, 0, 0]
+    subdirectories = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    # Like os.walk, symlinks are neither followed nor counted
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir():
+                        name = entry.name
+                        subdirectories.append((entry.path, f"{relative_path}/{name}" if relative_path else name))
+                        continue
+                    if entry.name.endswith(blacklisted_file_extensions):
+                        continue
+                    # The scandir entry caches its stat, on Windows it even comes with the directory listing
+                    stat_result = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                file_size = stat_result.st_size
+                rounded_size = -(-file_size // chunk_size) * chunk_size
+                blocks = getattr(stat_result, "st_blocks", None)
+                sizes[0] += 1
+                sizes[1] += file_size
+                sizes[2] += rounded_size
+                # st_blocks counts 512 byte units on every platform that has it
+                sizes[3] += rounded_size if blocks is None else blocks * 512
+    except OSError:
+        pass
+    return (relative_path, sizes), subdirectories
+
+
+def get_directory_size_details(
+    directory: str,
+    blacklisted_file_extensions: Iterable[str] = (),
+    chunk_size: int = 4096,
+    breakdown: bool = False,
+    workers: Union[int, None] = None,
+) -> Dict[str, Union[int, Dict[str, Dict[str, int]]]]:
+    """
+    Measures the files in a directory in one parallel pass, stating every file once.
+
+    Args:
+        directory (str): The path to the directory.
+        blacklisted_file_extensions (Iterable[str], optional): File extensions to exclude from the sizes.
+        chunk_size (int, optional): The chunk size to round every file size up to.
+        breakdown (bool, optional): Whether to also return the sizes of every subdirectory, like du.
+        workers (Union[int, None], optional): Number of scanning threads, 1 to scan in the calling thread.
+            Defaults to the ThreadPoolExecutor default.
+
+    Returns:
+        Dict[str, Union[int, Dict[str, Dict[str, int]]]]: The number of "files", their "apparent_size" (the sum of
+        their sizes), "rounded_size" (the sum of their sizes rounded up to chunk_size) and "allocated_size" (the
+        disk space they use, rounded_size where the platform does not tell).
+        With breakdown, "directories" maps the path of every directory relative to directory ("." for directory
+        itself) to the same totals for everything below it.
+    """
+    extensions = tuple(blacklisted_file_extensions)
+
+    def scan(path: str, relative_path: str) -> Tuple[Tuple[str, List[int]], List[Tuple[str, str]]]:
+        return _scan_directory_for_sizes(path, relative_path, extensions, chunk_size)
+
+    keys = ("files", "apparent_size", "rounded_size", "allocated_size")
+    totals = [0, 0, 0, 0]
+    directories = {}
+    for relative_path, sizes in _iter_parallel_scan(scan, (directory, ""), workers):
+        for index, size in enumerate(sizes):
+            totals[index] += size
+        if breakdown:
+            directories[relative_path] = sizes
+
+    result = dict(zip(keys, totals))
+    if breakdown:
+        # Deepest directories first, so each one is complete before it is added to its parent
+        for relative_path in sorted(directories, key=lambda path: path.count("/"), reverse=True):
+            if relative_path:
+                parent = directories[relative_path.rpartition("/")[0]]
+                for index, size in enumerate(directories[relative_path]):
+                    parent[index] += size
+        result["directories"] = {
+            relative_path or ".": dict(zip(keys, sizes)) for relative_path, sizes in sorted(directories.items())
+        }
+    return result
+
+
 def get_file_size_of_directory(
     directory: str, blacklisted_file_extensions: list = [], chunk_size: int = 4096
 ) -> int:
@@ -898,31 +1498,172 @@ def get_file_size_of_directory(
     Returns:
         int: The total size of the files in the directory, rounded to the nearest chunk size.
     """
-    total_size = 0
+    index = _get_directory_index(directory)
+    if index is not None:
+        return index.get_total_size(directory, blacklisted_file_extensions, chunk_size)
+    return get_directory_size_details(directory, blacklisted_file_extensions, chunk_size)["rounded_size"]
 
-    for dirpath, dirnames, filenames in os.walk(directory):
-        for f in filenames:
-            if any(f.endswith(ext) for ext in blacklisted_file_extensions):
-                continue
 
-            fp = os.path.join(dirpath, f)
-            if not os.path.islink(fp):
-                file_size = os.path.getsize(fp)
-                rounded_size = math.ceil(file_size / chunk_size) * chunk_size
-                total_size += rounded_size
+FINGERPRINT_BUFFER_SIZE = 1024 * 1024
+FINGERPRINT_MANIFEST_VERSION = 1
+
 
-    return total_size
+def hash_file(file_path: str, buffer_size: int = FINGERPRINT_BUFFER_SIZE) -> str:
+    """Hash a file with SHA-256, reading it in big chunks into a reused buffer.
 
+    Args:
+        file_path (str): Path to the file to hash.
+        buffer_size (int, optional): Size of the read buffer in bytes. Defaults to 1 MiB.
 
-def generate_uuid_from_directory(directory, blacklisted_extensions: list = []):
+    Returns:
+        str: The hexadecimal SHA-256 digest of the file contents."""
+    digest = hashlib.sha256()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+def _scan_directory_files(directory: str, blacklisted_extensions: Iterable[str] = ()) -> Dict[str, Tuple[str, int, int, int]]:
+    """Map the relative path of every non blacklisted file below directory to (path, size, mtime_ns, inode)."""
+    blacklisted_extensions = tuple(blacklisted_extensions)
+    files = {}
+    pending = [(directory, "")]
+    while pending:
+        path, relative_path = pending.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                relative_entry_path = relative_path + entry.name
+                # Like os.walk, symlinked directories aren't followed but symlinked files are
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, relative_entry_path + "/"))
+                elif entry.is_file() and not (blacklisted_extensions and entry.name.endswith(blacklisted_extensions)):
+                    stat = entry.stat()
+                    files[relative_entry_path] = (entry.path, stat.st_size, stat.st_mtime_ns, entry.inode())
+    return files
+
+
+def _combine_file_digests(digests: Dict[str, str]) -> str:
+    """Combine per file digests into one Merkle-style digest, each directory hashing the sorted names and digests of its children."""
+    tree = {}
+    for relative_path, digest in digests.items():
+        *directories, name = relative_path.split("/")
+        node = tree
+        for directory in directories:
+            node = node.setdefault(directory, {})
+        node[name] = digest
+
+    def combine(node: dict) -> bytes:
+        digest = hashlib.sha256()
+        for name in sorted(node):
+            child = node[name]
+            encoded_name = name.encode("utf-8", "surrogateescape")
+            if isinstance(child, dict):
+                digest.update(b"d " + encoded_name + b"\0" + combine(child))
+            else:
+                digest.update(b"f " + encoded_name + b"\0" + bytes.fromhex(child))
+        return digest.digest()
+
+    return combine(tree).hex()
+
+
+def fingerprint_directory(
+    directory: str,
+    blacklisted_extensions: Iterable[str] = (),
+    manifest_path: Union[str, None] = None,
+    workers: Union[int, None] = None,
+) -> str:
+    """Fingerprint the content and layout of a directory, only rehashing the files that changed since the last call.
+
+    Every file gets a SHA-256 digest which is kept in a manifest together with its size, mtime and inode,
+    files whose (size, mtime_ns, inode) didn't change reuse the stored digest. The files that do need hashing are
+    hashed in parallel threads, biggest first. The per file digests are then combined Merkle-style per directory in
+    sorted order, so renaming or moving a file changes the fingerprint too.
+
+    Args:
+        directory (str): Path to the directory to fingerprint.
+        blacklisted_extensions (Iterable[str], optional): File extensions to leave out. Defaults to none.
+        manifest_path (Union[str, None], optional): Where to keep the manifest. Defaults to a file in the tge cache directory.
+        workers (Union[int, None], optional): Number of hashing threads. Defaults to the ThreadPoolExecutor default.
+
+    Returns:
+        str: The hexadecimal fingerprint of the directory."""
+    directory = os.path.abspath(directory)
+    if manifest_path is None:
+        from .library_utils import get_user_cache_directory
+
+        directory_id = hashlib.sha1(directory.encode("utf-8", "surrogateescape")).hexdigest()
+        manifest_path = os.path.join(get_user_cache_directory(), f"fingerprint_manifest_{directory_id}.json")
+
+    try:
+        with open(manifest_path, "r", encoding="utf8") as f:
+            manifest = json.load(f)
+        cached_files = manifest["files"] if manifest.get("version") == FINGERPRINT_MANIFEST_VERSION else {}
+    except (OSError, ValueError, KeyError, AttributeError):
+        cached_files = {}
+
+    scan_started = time.time_ns()
+    index = _get_directory_index(directory)
+    if index is not None:
+        files = index.get_files(directory, blacklisted_extensions)
+    else:
+        files = _scan_directory_files(directory, blacklisted_extensions)
+
+    digests = {}
+    changed = []
+    for relative_path, (_, size, mtime_ns, inode) in files.items():
+        cached = cached_files.get(relative_path)
+        if cached and cached[:3] == [size, mtime_ns, inode]:
+            digests[relative_path] = cached[3]
+        else:
+            changed.append(relative_path)
+
+    if changed:
+        changed.sort(key=lambda relative_path: files[relative_path][1], reverse=True)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for relative_path, digest in zip(changed, executor.map(lambda relative_path: hash_file(files[relative_path][0]), changed)):
+                digests[relative_path] = digest
+
+    # A file changed within the mtime resolution right after being hashed would look unchanged, so recent files aren't cached
+    racy_after = scan_started - 2_000_000_000
+    new_files = {
+        relative_path: [size, mtime_ns, inode, digests[relative_path]]
+        for relative_path, (_, size, mtime_ns, inode) in files.items()
+        if mtime_ns < racy_after
+    }
+    if new_files != cached_files:
+        try:
+            os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+            temporary_path = f"{manifest_path}.{os.getpid()}.tmp"
+            with open(temporary_path, "w", encoding="utf8") as f:
+                json.dump({"version": FINGERPRINT_MANIFEST_VERSION, "files": new_files}, f)
+            os.replace(temporary_path, manifest_path)
+        except OSError:
+            pass
+
+    return _combine_file_digests(digests)
+
+
+def generate_uuid_from_directory(directory, blacklisted_extensions: list = [], incremental: bool = False, manifest_path: Union[str, None] = None):
     """Generate a UUID based on the content of all files in a directory, excluding files with specified extensions.
 
     Args:
         directory (str): Path to the directory to scan.
         blacklisted_extensions (list, optional): List of file extensions to exclude from hashing. Defaults to an empty list.
+        incremental (bool, optional): Use fingerprint_directory, which only rehashes changed files and also covers the
+            relative paths, instead of one MD5 over every byte. The two modes give different UUIDs. Defaults to False.
+        manifest_path (Union[str, None], optional): Manifest location for the incremental mode, see fingerprint_directory.
 
     Returns:
-        UUID: A UUID generated from the MD5 hash of the file contents."""
+        UUID: A UUID generated from the MD5 hash of the file contents, or from the directory fingerprint in incremental mode."""
+    if incremental:
+        return uuid.UUID(fingerprint_directory(directory, blacklisted_extensions, manifest_path)[:32])
+
     hash_md5 = hashlib.md5()
 
     for root, _, files in os.walk(directory):
@@ -938,7 +1679,7 @@ def generate_uuid_from_directory(directory, blacklisted_extensions: list = []):
             file_path = os.path.join(root, file)
             if os.path.isfile(file_path): 
                 with open(file_path, "rb") as f:
-                    for chunk in iter(lambda: f.read(4096), b""):
+                    for chunk in iter(lambda: f.read(FINGERPRINT_BUFFER_SIZE), b""):
                         hash_md5.update(chunk)
 
     unique_hash = hash_md5.hexdigest()
@@ -1073,31 +1814,139 @@ def compress_directory_list(paths: Iterable) -> "dict[Union[list,str]]":
     return compressed
 
 
+def _iter_parallel_scan(scan, root: tuple, workers: Union[int, None]) -> Iterable:
+    """
+    Walks a directory tree with scan(*directory) returning (result, directories to scan next), yielding every result.
+
+    Directories are scanned by a thread pool of workers threads, or in the calling thread in os.walk order if
+    workers is 1.
+    """
+    if workers == 1:
+        pending = [root]
+        while pending:
+            result, subdirectories = scan(*pending.pop())
+            yield result
+            pending += reversed(subdirectories)
+        return
+
+    executor = ThreadPoolExecutor(workers)
+    try:
+        futures = {executor.submit(scan, *root)}
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                result, subdirectories = future.result()
+                futures.update(executor.submit(scan, *subdirectory) for subdirectory in subdirectories)
+                yield result
+    finally:
+        # Also reached when the caller stops iterating early
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _compile_exclude_patterns(exclude: Iterable[str]) -> Union[re.Pattern, None]:
+    """One regex for all the glob patterns, or None if there are none."""
+    patterns = [fnmatch.translate(pattern) for pattern in exclude]
+    return re.compile("|".join(patterns)) if patterns else None
+
+
+def _scan_directory_for_extensions(
+    directory: str,
+    relative_path: str,
+    depth: int,
+    suffixes: Tuple[str, ...],
+    case_sensitive: bool,
+    excluded: Union[re.Pattern, None],
+    max_depth: Union[int, None],
+) -> Tuple[List[str], List[Tuple[str, str, int]]]:
+    """Returns the matching files of one directory and the (path, relative path, depth) of the directories to scan next."""
+    files, subdirectories = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                entry_relative_path = f"{relative_path}/{name}" if relative_path else name
+                if excluded is not None and (excluded.match(name) or excluded.match(entry_relative_path)):
+                    continue
+                try:
+                    is_directory = entry.is_dir()
+                except OSError:
+                    is_directory = False
+                if is_directory:
+                    # Like os.walk, symlinked directories are not followed
+                    if (max_depth is None or depth < max_depth) and not entry.is_symlink():
+                        subdirectories.append((entry.path, entry_relative_path, depth + 1))
+                elif (name if case_sensitive else name.lower()).endswith(suffixes):
+                    files.append(entry.path)
+    except OSError:
+        pass
+    return files, subdirectories
+
+
+def iter_files_with_extensions(
+    root_dir: str,
+    file_extensions: Iterable[str],
+    case_sensitive: bool = True,
+    max_depth: Union[int, None] = None,
+    exclude: Iterable[str] = (),
+    workers: Union[int, None] = None,
+) -> Iterable[str]:
+    """
+    Yields the paths of the files ending with any of the extensions, walking the tree once.
+
+    Subdirectories are scanned in parallel, so the order of the paths is not the order of os.walk.
+
+    Parameters:
+    root_dir (str): The root directory to start searching from.
+    file_extensions (Iterable[str]): The file extensions (or any file name endings) to search for, like ".txt".
+    case_sensitive (bool): Whether ".TXT" is different from ".txt" (default is True).
+    max_depth (Union[int, None]): How many directory levels below root_dir to search, 0 for root_dir alone (default is no limit).
+    exclude (Iterable[str]): Glob patterns of files and directories to leave out, matched against the name and
+        the path relative to root_dir, like "__pycache__" or "build/*.tmp" (default is none).
+    workers (Union[int, None]): Number of scanning threads, 1 to scan in the calling thread (default is the ThreadPoolExecutor default).
+
+    Returns:
+    Iterable[str]: A generator of the file paths with the specified extensions.
+    """
+    suffixes = tuple(file_extensions) if case_sensitive else tuple(extension.lower() for extension in file_extensions)
+    if not suffixes:
+        return
+    excluded = _compile_exclude_patterns(exclude)
+
+    def scan(directory: str, relative_path: str, depth: int) -> Tuple[List[str], List[Tuple[str, str, int]]]:
+        return _scan_directory_for_extensions(directory, relative_path, depth, suffixes, case_sensitive, excluded, max_depth)
+
+    for files in _iter_parallel_scan(scan, (root_dir, "", 0), workers):
+        yield from files
+
+
 def find_files_with_extension(root_dir: str, file_extension: str) -> List[str]:
     """
     Returns a list of all file directories with the specified extension.
 
     :param root_dir: The root directory to start searching from.
     :param file_extension: The file extension to search for (e.g., '.txt').
-    :return: A list of file paths with the specified extension.
+    :return: A sorted list of file paths with the specified extension, in the same order with or without a DirectoryIndex.
     """
-    file_paths = []
-    for root, dirs, files in os.walk(root_dir):
-        for file in files:
-            if file.endswith(file_extension):
-                file_paths.append(os.path.join(root, file))
-    return file_paths
+    index = _get_directory_index(root_dir)
+    if index is not None:
+        return index.find_files_with_extensions(root_dir, [file_extension])
+    return sorted(iter_files_with_extensions(root_dir, [file_extension], workers=1))
 
 
-def find_files_with_extensions(root_dir: str, file_extensions: List[str]) -> List[str]:
+def find_files_with_extensions(
+    root_dir: str,
+    file_extensions: List[str],
+    case_sensitive: bool = True,
+    max_depth: Union[int, None] = None,
+    exclude: Iterable[str] = (),
+    workers: Union[int, None] = None,
+) -> List[str]:
     """
-    Returns a list of all file directories with the specified extensions.
+    Returns a list of all file directories with the specified extensions, walking the tree once.
 
     :param root_dir: The root directory to start searching from.
     :param file_extensions: The file extensions to search.
+    :param case_sensitive, max_depth, exclude, workers: See iter_files_with_extensions.
     :return: A list of file paths with the specified extension.
     """
-    files = []
-    for file_extension in file_extensions:
-        files.extend(find_files_with_extension(root_dir, file_extension))
-    return files
+    return list(iter_files_with_extensions(root_dir, file_extensions, case_sensitive, max_depth, exclude, workers))
@@ -1,10 +1,12 @@
 import importlib.util
-from typing import Union, Tuple, NoReturn, List
+from typing import Union, Tuple, NoReturn, List, Dict, Callable
 import subprocess
 from collections.abc import Iterable
 import os
-
-from .tbe import get_current_pip_path
+import sys
+import json
+import hashlib
+import re
 
 
 def is_library_installed(library_name: str) -> bool:
@@ -18,6 +20,186 @@ def is_library_installed(library_name: str) -> bool:
     return spec is not None
 
 
+def get_user_cache_directory() -> str:
+    """
+    Returns the per-user cache directory of TGE, honoring `TGE_CACHE_DIR` if it is set.
+
+    Windows: %LOCALAPPDATA%/tge/Cache, macOS: ~/Library/Caches/tge, others: $XDG_CACHE_HOME/tge (~/.cache/tge)
+    """
+    override = os.getenv("TGE_CACHE_DIR")
+    if override:
+        return override
+    if sys.platform == "win32":
+        base = os.getenv("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, "tge", "Cache")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/tge")
+    return os.path.join(os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "tge")
+
+
+def get_capability_cache_key() -> str:
+    """
+    Returns a hash describing the current environment: interpreter path, `sys.path`, `PATH`
+    and the modification times of the site-packages directories (which change whenever a library gets installed or removed).
+    """
+    site_packages = []
+    for path in sys.path:
+        if os.path.basename(path) in ("site-packages", "dist-packages"):
+            try:
+                site_packages.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                continue
+
+    environment = [sys.executable, sys.path, os.getenv("PATH", ""), site_packages]
+    return hashlib.sha1(json.dumps(environment).encode()).hexdigest()
+
+
+def get_capability_cache_path() -> str:
+    "Returns the path of the capability cache file belonging to the current environment."
+    return os.path.join(
+        get_user_cache_directory(), f"capabilities_{get_capability_cache_key()}.json"
+    )
+
+
+def load_cached_capabilities(
+    probes: Dict[str, Callable[[], bool]], refresh: bool = False
+) -> Dict[str, bool]:
+    """
+    Returns the result of every probe, reusing the results cached for the current environment.
+
+    Only probes without a cached result (or all of them if `refresh` is set) are run, after which the cache is updated.
+    The cache is best effort, so an unreadable or unwritable cache directory just means the probes run every time.
+
+    Args:
+        probes (Dict[str, Callable[[], bool]]): Capability names mapped to functions checking for them.
+        refresh (bool): Ignore the cached results and run every probe again.
+
+    Returns:
+        Dict[str, bool]: Capability names mapped to whether they are available.
+
+    Example:
+        >>> load_cached_capabilities({"numpy": lambda: is_library_installed("numpy")})
+        {'numpy': True}
+    """
+    cache_path = get_capability_cache_path()
+    cached = {}
+    if not refresh:
+        try:
+            with open(cache_path, "r", encoding="utf8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+        # Anything else than an object of booleans is ignored, and written over below
+        if not isinstance(cached, dict):
+            cached = {}
+        cached = {name: value for name, value in cached.items() if isinstance(value, bool)}
+
+    missing = [name for name in probes if name not in cached]
+    for name in missing:
+        cached[name] = bool(probes[name]())
+
+    if missing:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf8") as f:
+                json.dump(cached, f)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass
+
+    return {name: cached[name] for name in probes}
+
+
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s*(\d+) \|\s*(\d+) \| ( *)(\S+)$")
+
+
+def parse_import_times(import_time_log: str, package: str) -> List[dict]:
+    """
+    Parses the output of `python -X importtime` into one dictionary per imported module.
+
+    Args:
+        import_time_log (str): The stderr output of a process started with `-X importtime`.
+        package (str): Name of the package whose modules should be classified as "package".
+
+    Returns:
+        List[dict]: Entries in import order with the keys "module", "self" and "cumulative" (seconds),
+        "depth", "imported_by" (the module that triggered the import, None at the top level)
+        and "kind" ("package", "third_party" or "stdlib").
+    """
+    stdlib = set(getattr(sys, "stdlib_module_names", ())) | set(sys.builtin_module_names)
+    entries = []
+    pending = {}  # depth -> entries still waiting for the module that imported them
+
+    for line in import_time_log.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        depth = len(indent) // 2
+        top_level = module.split(".")[0]
+
+        if top_level == package:
+            kind = "package"
+        elif top_level in stdlib or top_level.startswith("_"):
+            kind = "stdlib"
+        else:
+            kind = "third_party"
+
+        entry = {
+            "module": module,
+            "self": int(self_us) / 1_000_000,
+            "cumulative": int(cumulative_us) / 1_000_000,
+            "depth": depth,
+            "imported_by": None,
+            "kind": kind,
+        }
+        # -X importtime reports children before the module importing them, one level deeper
+        for child in pending.pop(depth + 1, []):
+            child["imported_by"] = module
+        pending.setdefault(depth, []).append(entry)
+        entries.append(entry)
+
+    return entries
+
+
+def get_import_times(package: str, load_submodules: bool = True) -> List[dict]:
+    """
+    Imports `package` in a fresh interpreter with `-X importtime` and returns the parsed timings.
+
+    Args:
+        package (str): Name of the package to import, e.g. "tge" or "minified_tge".
+        load_submodules (bool): Also access every name in the package's `__all__`, so lazily imported submodules are measured as well.
+
+    Returns:
+        List[dict]: The entries returned by `parse_import_times`.
+
+    Raises:
+        ImportError: If the package itself can not be imported.
+    """
+    code = f"import {package}"
+    if load_submodules:
+        code += (
+            f"\nfor name in getattr({package}, '__all__', []):"
+            f"\n    try: getattr({package}, name)"
+            "\n    except Exception: pass"
+        )
+
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=environment,
+        cwd=os.getcwd(),
+    )
+    if result.returncode != 0:
+        raise ImportError(f"Importing {package} failed: {result.stderr.splitlines()[-1:]}")
+
+    return parse_import_times(result.stderr, package)
+
+
 def download_library(library_name: str) -> Tuple[bool, str]:
     """
     Downloads and installs a Python library using pip.
@@ -29,6 +211,8 @@ def download_library(library_name: str) -> Tuple[bool, str]:
         tuple: A tuple containing a boolean indicating whether the installation was successful
         and a message string providing additional information in case of an error.
     """
+    from .tbe import get_current_pip_path  # tbe is heavy, only pull it in when installing
+
     commands = get_current_pip_path()
     if not commands:
         commands = [
@@ -0,0 +1,187 @@
+"""
+Shared, cached analysis of Python source files.
+
+Each file is parsed once per content: the facts about its functions are kept in the tge cache directory under the
+hash of the source, and files missing from the cache are parsed, in a process pool when there are many of them.
+The function counters of file_operations and the undocumented function scanners of tbe all read from here, so
+running them back to back, or again after changing one file, only parses what changed.
+"""
+import os
+import sys
+import ast
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union, Iterable, List, Dict, NoReturn
+
+
+ANALYSIS_CACHE_VERSION = 1
+# Below this many files to parse, starting worker processes costs more than parsing them here
+ANALYSIS_PROCESS_POOL_MIN_FILES = 16
+
+# Analyses already loaded by this process, by cache key
+_memory_cache: Dict[str, dict] = {}
+
+
+def _is_annotated(node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> bool:
+    """Whether the return and every parameter (but a leading self or cls) have a type annotation."""
+    arguments = node.args
+    positional = arguments.posonlyargs + arguments.args
+    if positional and positional[0].arg in ("self", "cls"):
+        positional = positional[1:]
+    parameters = positional + arguments.kwonlyargs
+    parameters += [parameter for parameter in (arguments.vararg, arguments.kwarg) if parameter is not None]
+    return node.returns is not None and all(parameter.annotation is not None for parameter in parameters)
+
+
+def analyze_source(data: bytes) -> dict:
+    """
+    Extracts the facts about the functions of a Python source.
+
+    Args:
+        data (bytes): The UTF-8 source.
+
+    Returns:
+        dict: {"functions": [...]} with a dict per function or method, nested ones included, in ast.walk order:
+        its "name", "line", "end_line", whether it is "async", "documented" (has a non-empty docstring) and
+        "annotated" (see _is_annotated). {"error": "..."} if the source can't be decoded or parsed.
+    """
+    try:
+        # Like reading the file in text mode, which the helpers used to do
+        source = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError) as error:
+        return {"error": f"{type(error).__name__}: {error}"}
+    return {
+        "functions": [
+            {
+                "name": node.name,
+                "line": node.lineno,
+                "end_line": node.end_lineno,
+                "async": isinstance(node, ast.AsyncFunctionDef),
+                "documented": bool(ast.get_docstring(node)),
+                "annotated": _is_annotated(node),
+            }
+            for node in ast.walk(tree)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
+    }
+
+
+def analyze_files(
+    file_paths: Iterable[str], workers: Union[int, None] = None, use_cache: bool = True
+) -> Dict[str, Union[dict, None]]:
+    """
+    Analyzes Python files with analyze_source, parsing only the contents that aren't cached yet.
+
+    At least ANALYSIS_PROCESS_POOL_MIN_FILES files to parse are parsed in a process pool, whose workers re-import
+    the __main__ module under the spawn start method (Windows, macOS): scripts calling this have to guard their top
+    level code with if __name__ == "__main__".
+
+    Args:
+        file_paths (Iterable[str]): The files to analyze.
+        workers (Union[int, None], optional): Number of processes, 1 to parse in this process.
+            Defaults to the ProcessPoolExecutor default.
+        use_cache (bool, optional): Whether to read and fill the analysis cache. Defaults to True.
+
+    Returns:
+        Dict[str, Union[dict, None]]: The analysis of every file, None for the files that couldn't be read.
+    """
+    cache_directory = None
+    if use_cache:
+        from .library_utils import get_user_cache_directory
+
+        cache_directory = os.path.join(get_user_cache_directory(), "source_analysis")
+        os.makedirs(cache_directory, exist_ok=True)
+    key_prefix = f"{ANALYSIS_CACHE_VERSION} {sys.version_info[0]}.{sys.version_info[1]} ".encode()
+
+    analyses = {}
+    # Cache key and source of every content missing from the cache, and the files having it
+    pending: Dict[str, bytes] = {}
+    waiting: Dict[str, List[str]] = {}
+    for path in file_paths:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            analyses[path] = None
+            continue
+        key = hashlib.sha256(key_prefix + data).hexdigest()
+        analysis = _memory_cache.get(key) if use_cache else None
+        if analysis is None and cache_directory is not None:
+            try:
+                with open(os.path.join(cache_directory, key + ".json"), "r", encoding="utf8") as f:
+                    analysis = _memory_cache[key] = json.load(f)
+            except (OSError, ValueError):
+                pass
+        if analysis is None:
+            pending[key] = data
+            waiting.setdefault(key, []).append(path)
+        analyses[path] = analysis
+
+    if len(pending) < ANALYSIS_PROCESS_POOL_MIN_FILES or workers == 1:
+        results = [analyze_source(data) for data in pending.values()]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(analyze_source, pending.values(), chunksize=max(1, len(pending) // 32)))
+
+    for key, analysis in zip(pending, results):
+        for path in waiting[key]:
+            analyses[path] = analysis
+        # Parse errors aren't cached, the helpers parse such files again to raise the real exception
+        if cache_directory is None or "error" in analysis:
+            continue
+        _memory_cache[key] = analysis
+        cache_path = os.path.join(cache_directory, key + ".json")
+        # Written under a temporary name first, so other processes never see half of a cache entry
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary_path, "w", encoding="utf8") as f:
+                json.dump(analysis, f, separators=(",", ":"))
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            pass
+    return analyses
+
+
+def get_functions(file_path: str, analysis: Union[dict, None]) -> List[dict]:
+    """
+    Returns the functions of an analysis from analyze_files, raising what reading or parsing the file raises if it
+    couldn't be analyzed.
+
+    Args:
+        file_path (str): The analyzed file.
+        analysis (Union[dict, None]): Its analysis.
+
+    Returns:
+        List[dict]: The functions of the file, see analyze_source.
+    """
+    if analysis is not None and "functions" in analysis:
+        return analysis["functions"]
+    _raise_analysis_error(file_path, analysis)
+
+
+def _raise_analysis_error(file_path: str, analysis: Union[dict, None]) -> NoReturn:
+    # The file is read and parsed again for the original exception
+    with open(file_path, "r", encoding="utf-8") as file:
+        ast.parse(file.read())
+    # It changed since it was analyzed
+    raise ValueError(f"Could not analyze {file_path}: {analysis['error'] if analysis else 'unreadable'}")
+
+
+def find_python_files(directory_path: str) -> List[str]:
+    """
+    Lists the .py files below a directory, in os.walk order.
+
+    Args:
+        directory_path (str): The directory to search.
+
+    Returns:
+        List[str]: The paths of the files.
+    """
+    return [
+        os.path.join(root, file)
+        for root, dirs, files in os.walk(directory_path)
+        for file in files
+        if file.endswith(".py")
+    ]
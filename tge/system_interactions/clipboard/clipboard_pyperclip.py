@@ -1,4 +1,7 @@
-import pyperclip
+from ..shared import LazyBackend
+import importlib
+
+PYPERCLIP = LazyBackend(lambda: importlib.import_module("pyperclip"))
 
 def copy_to_clipboard(text: str, user32 = None, kernel32 = None) -> None:
     """
@@ -7,7 +10,7 @@ def copy_to_clipboard(text: str, user32 = None, kernel32 = None) -> None:
     Args:
         text (str): The text to be copied to the clipboard.
     """
-    pyperclip.copy(text)
+    PYPERCLIP.get().copy(text)
 
 
 
@@ -18,7 +21,7 @@ def get_clipboard(user32 = None, kernel32 = None) -> str:
     Returns:
         str: The text content currently stored in the clipboard.
     """
-    return pyperclip.paste()
+    return PYPERCLIP.get().paste()
 
 
 def clear_clipboard(user32 = None) -> None:
@@ -31,4 +34,4 @@ def clear_clipboard(user32 = None) -> None:
     Returns:
         None: This function does not return any value.
     """
-    pyperclip.copy('')
\ No newline at end of file
+    PYPERCLIP.get().copy('')
\ No newline at end of file
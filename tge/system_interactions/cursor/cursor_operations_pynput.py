@@ -1,17 +1,24 @@
 WHEEL_DELTA = 120
-import pynput
 from typing import Tuple
+from ..shared import LazyBackend
 
 
-MOUSE = pynput.mouse.Controller()
+def _create_mouse_controller():
+    "Imports pynput (which connects to the display server) and creates the mouse controller."
+    import pynput
 
+    return pynput.mouse.Controller()
 
-def getScreenDimensions() -> tuple[int, int]: "A line that tells my code colorizer to color this variable like a function"
 
+MOUSE = LazyBackend(_create_mouse_controller)
 
-from screeninfo import get_monitors
 
-getScreenDimensions = lambda: get_monitors()[0].width, get_monitors()[0].width
+def getScreenDimensions() -> Tuple[int, int]:
+    "Retrieve the dimensions of the primary screen as a tuple (width, height)."
+    from screeninfo import get_monitors
+
+    monitor = get_monitors()[0]
+    return monitor.width, monitor.height
 
 # def getScreenDimensions() -> tuple[int, int]:
 #     monitors = get_monitors()
@@ -25,42 +32,48 @@ getScreenDimensions = lambda: get_monitors()[0].width, get_monitors()[0].width
 #     return monitor_width, monitor_height
 
 
-SCREEN_WIDTH, SCREEN_HEIGHT = getScreenDimensions()
+def __getattr__(name: str) -> int:
+    "Resolves SCREEN_WIDTH and SCREEN_HEIGHT on first access instead of querying the monitors on import."
+    if name in ("SCREEN_WIDTH", "SCREEN_HEIGHT"):
+        global SCREEN_WIDTH, SCREEN_HEIGHT
+        SCREEN_WIDTH, SCREEN_HEIGHT = getScreenDimensions()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def set_mouse_to(coords: Tuple[int, int]) -> None:
     "Move the mouse cursor to the specified coordinates (x, y)."
-    MOUSE.position = coords
+    MOUSE.get().position = coords
 
 
 def get_mouse_position() -> Tuple[int, int]:
     "Retrieve the current mouse cursor position as a tuple (x, y)."
-    return MOUSE.position
+    return MOUSE.get().position
 
 
 def left_click() -> None:
     "Perform a left mouse button click at the current mouse position."
-    MOUSE.click(1)
+    MOUSE.get().click(1)
 
 
 def right_click() -> None:
     "Perform a left mouse button click at the current mouse position."
-    MOUSE.click(3)
+    MOUSE.get().click(3)
 
 
 def middle_click() -> None:
     "Perform a middle mouse button click at the current mouse position."
-    MOUSE.click(2)
+    MOUSE.get().click(2)
 
 
 def scroll_vertical(clicks: int, wheel_delta: int = WHEEL_DELTA) -> None:
     "Scroll the mouse wheel vertically by the specified number of `clicks`."
-    MOUSE.scroll(dy=clicks)
+    MOUSE.get().scroll(dy=clicks)
 
 
 def scroll_horizontal(clicks: int, wheel_delta: int = WHEEL_DELTA) -> None:
     "Scroll the mouse wheel horizontally by the specified number of `clicks`."
-    MOUSE.scroll(dx=clicks)
+    MOUSE.get().scroll(dx=clicks)
 
 
 def scroll(
@@ -70,37 +83,37 @@ def scroll(
     wheel_delta_y: int = WHEEL_DELTA,
 ) -> None:
     "Scroll the mouse wheel both horizontally and vertically by the specified amounts (`dx` and `dy`)."
-    MOUSE.scroll(dy=dy, dx=dx)
+    MOUSE.get().scroll(dy=dy, dx=dx)
 
 
 def left_mouse_down() -> None:
     "Press and hold the left mouse button."
-    MOUSE.press(1)
+    MOUSE.get().press(1)
 
 
 def right_mouse_down() -> None:
     "Press and hold the right mouse button."
-    MOUSE.press(3)
+    MOUSE.get().press(3)
 
 
 def middle_mouse_down() -> None:
     "Press and hold the middle mouse button."
-    MOUSE.press(2)
+    MOUSE.get().press(2)
 
 
 def left_mouse_up() -> None:
     "Release the left mouse button."
-    MOUSE.release(1)
+    MOUSE.get().release(1)
 
 
 def right_mouse_up() -> None:
     "Release the right mouse button."
-    MOUSE.release(3)
+    MOUSE.get().release(3)
 
 
 def middle_mouse_up() -> None:
     "Release the middle mouse button."
-    MOUSE.release(2)
+    MOUSE.get().release(2)
 
 
 def is_left_button_pressed():
@@ -118,11 +131,10 @@ def is_middle_button_pressed():
     return _is_button_pressed(2)
 
 
-MOUSE
-
-
 def _is_button_pressed(button):
     """Checks if the inputted button is pressed"""
+    import pynput
+
     with pynput.mouse.Events() as events:
         for event in events:
             if isinstance(event, pynput.mouse.Events.Click) and event.button == button:
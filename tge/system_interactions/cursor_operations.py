@@ -7,11 +7,19 @@ if SYSTEM_NAME == "windows":
 
 else:
     from .cursor.cursor_operations_pynput import *
+    from .cursor import cursor_operations_pynput as _cursor_backend
 
+    def __getattr__(name: str):
+        "Forwards lazily computed backend values like SCREEN_WIDTH and SCREEN_HEIGHT."
+        return getattr(_cursor_backend, name)
 
-def click_mouse_button(button_number: int) -> None:
-    "Click the mouse button specified by `button_number`."
-    ClickMouseButtonList[button_number]()
+
+def click_mouse_button(button_number: int, x: int = None, y: int = None) -> None:
+    "Click the mouse button specified by `button_number`, at the coordinates (x, y) if they are given."
+    if x is None or y is None:
+        ClickMouseButtonList[button_number]()
+    else:
+        ClickMouseButton_atList[button_number](x, y)
 
 
 def hold_mouse_button(button_number: int) -> None:
@@ -24,11 +32,6 @@ def release_mouse_button(button_number: int) -> None:
     ReleaseMouseButtonList[button_number]()
 
 
-def click_mouse_button(button_number: int, x: int, y: int) -> None:
-    "Click the mouse button specified by `button_number` at the coordinates (x, y)."
-    ClickMouseButton_atList[button_number](x, y)
-
-
 
 
 
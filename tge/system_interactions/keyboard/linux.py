@@ -1,41 +1,61 @@
-from Xlib import X, XK, display
-from . import linux_virtual_keys as keys
+import importlib
+from ..shared import LazyBackend
 
 
-d = display.Display()
-root = d.screen().root
+# Xlib and the X display connection are only loaded on first use, the connection is then reused
+XLIB_X = LazyBackend(lambda: importlib.import_module("Xlib.X"))
+XLIB_XK = LazyBackend(lambda: importlib.import_module("Xlib.XK"))
+DISPLAY = LazyBackend(lambda: importlib.import_module("Xlib.display").Display())
+
+
+def __getattr__(name: str):
+    "Imports the `keys` module of X11 keysyms, which needs Xlib, on first access."
+    if name == "keys":
+        global keys
+        from . import linux_virtual_keys as keys
+
+        return keys
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _get_root():
+    "Returns the root window of the default screen of the shared display connection."
+    return DISPLAY.get().screen().root
 
 
 def is_key_pressed(key_code):
     "Checks if the inputted key is currently pressed"
-    keys = root.query_pointer()._data["mask"]
+    keys = _get_root().query_pointer()._data["mask"]
     return keys & (1 << (key_code - 8)) != 0
 
 
 def press_key(key_code):
     "Simulate pressing a key."
+    root = _get_root()
     root.warp_pointer(0, 0)
-    root.fake_input(X.KeyPress, key_code)
-    d.sync()
+    root.fake_input(XLIB_X.get().KeyPress, key_code)
+    DISPLAY.get().sync()
 
 
 def hold_key(key_code):
     "Simulates holding the key corresponding to inputted key_code."
+    root = _get_root()
     root.warp_pointer(0, 0)
-    root.fake_input(X.KeyPress, key_code)
-    d.sync()
+    root.fake_input(XLIB_X.get().KeyPress, key_code)
+    DISPLAY.get().sync()
 
 
 def release_key(key_code):
     "Simulates releasing the key corresponding to inputted key_code."
+    root = _get_root()
     root.warp_pointer(0, 0)
-    root.fake_input(X.KeyRelease, key_code)
-    d.sync()
+    root.fake_input(XLIB_X.get().KeyRelease, key_code)
+    DISPLAY.get().sync()
 
 
 def key_to_virtual_key(key: str) -> int:
     "Converts a keyboard button to their corresponding virtual key"
-    key_symbol = XK.string_to_keysym(key)
+    key_symbol = XLIB_XK.get().string_to_keysym(key)
     if key_symbol == 0:
         raise ValueError(f"Invalid key: {key}")
-    return d.keysym_to_keycode(key_symbol)
+    return DISPLAY.get().keysym_to_keycode(key_symbol)
@@ -3,4 +3,9 @@ if SYSTEM_NAME == "windows":
     from .keyboard.windows import *
 elif SYSTEM_NAME == "linux":
     from .keyboard.linux import *
+    from .keyboard import linux as _keyboard_backend
+
+    def __getattr__(name: str):
+        "Forwards lazily imported backend values like the `keys` module."
+        return getattr(_keyboard_backend, name)
     
\ No newline at end of file
@@ -1,4 +1,43 @@
 from .. import SYSTEM_NAME
+from typing import Any, Callable
+import threading
+
+
+# What LazyBackend holds before its backend is created, as a factory may return None
+_UNSET = object()
+
+
+class LazyBackend:
+    """
+    Creates a backend object (a display connection, a controller, a module, ...) the first time it is needed
+    and reuses it afterwards, so importing a backend module never touches the system.
+    """
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        """
+        Args:
+            factory (Callable[[], Any]): Creates the backend object, called at most once until `reset` is used.
+        """
+        self.factory = factory
+        self._instance = _UNSET
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        "Returns the backend object, creating it on the first call."
+        if self._instance is _UNSET:
+            with self._lock:
+                if self._instance is _UNSET:
+                    self._instance = self.factory()
+        return self._instance
+
+    def is_initialized(self) -> bool:
+        "Checks if the backend object has been created already."
+        return self._instance is not _UNSET
+
+    def reset(self) -> None:
+        "Drops the cached backend object, the next `get` creates a new one."
+        with self._lock:
+            self._instance = _UNSET
 
 
 if SYSTEM_NAME == "windows":
@@ -8,4 +47,4 @@ if SYSTEM_NAME == "windows":
     CF_UNICODETEXT = 13
     GMEM_DDESHARE = 0x2000
     GMEM_MOVEABLE = 0x0002
-    GHND = GMEM_DDESHARE | GMEM_MOVEABLE
\ No newline at end of file
+    GHND = GMEM_DDESHARE | GMEM_MOVEABLE
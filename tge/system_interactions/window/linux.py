@@ -1,4 +1,5 @@
-import subprocess, sys
+import subprocess, sys, shutil
+from ..shared import LazyBackend
 
 
 def is_window_minimized(window_id):
@@ -63,27 +64,20 @@ def get_window_by_title(title: str) -> str:
     """Find a window by its title and return its window ID."""
     try:
         result = subprocess.run(
-            ["xdotool", "search", "--name", title],
+            [XDOTOOL.get(), "search", "--name", title],
             capture_output=True,
             text=True,
             check=True,
         )
         window_id = result.stdout.strip()
         return window_id
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, FileNotFoundError):
         return None
 
 
 def is_xdotool_installed():
     """Check if xdotool is installed"""
-    try:
-        subprocess.run(
-            ["xdotool", "version"], capture_output=True, text=True, check=True
-        )
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
-    else:
-        return True
+    return shutil.which("xdotool") is not None
 
 
 def install_xdotool():
@@ -99,5 +93,11 @@ def install_xdotool():
         return f"An error occurred while installing xdotool: {e}"
 
 
-if not is_xdotool_installed() and (error := install_xdotool()):
-    print(error)
+def _ensure_xdotool() -> str:
+    """Installs xdotool if it is missing and returns the path to it, only ever runs once"""
+    if not is_xdotool_installed() and (error := install_xdotool()):
+        print(error)
+    return shutil.which("xdotool") or "xdotool"
+
+
+XDOTOOL = LazyBackend(_ensure_xdotool)
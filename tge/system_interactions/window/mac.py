@@ -1,33 +1,39 @@
-from Quartz import CGWindowListCopyWindowInfo, kCGWindowListOptionOnScreenOnly, kCGNullWindowID  # type: ignore
-from AppKit import NSWorkspace, NSApplication, NSApp, NSWindow  # type: ignore
+from typing import Optional, TYPE_CHECKING
+from ..shared import LazyBackend
+import importlib
 
-from typing import Optional
+if TYPE_CHECKING:
+    from AppKit import NSWindow  # type: ignore
 
+# PyObjC's Quartz and AppKit are slow to import, so they are only loaded once a window is looked up
+QUARTZ = LazyBackend(lambda: importlib.import_module("Quartz"))
+APPKIT = LazyBackend(lambda: importlib.import_module("AppKit"))
 
-def is_window_minimized(window: NSWindow):
+
+def is_window_minimized(window: "NSWindow"):
     """Check if the window is minimized."""
     return window.isMiniaturized()
 
 
-def minimize_window(window: NSWindow):
+def minimize_window(window: "NSWindow"):
     """Minimize the specified window."""
     window.performMiniaturize_(None)
 
 
-def get_window_position(window: NSWindow):
+def get_window_position(window: "NSWindow"):
     """Get the position and size of the window. Return None if minimized."""
     frame = window.frame()
     x, y = frame.origin.x, frame.origin.y
     return x, y
 
 
-def maximize_window(window: NSWindow):
+def maximize_window(window: "NSWindow"):
     """Maximize the specified window."""
     screen_frame = window.mainScreen().frame()
     window.setFrame_display_(screen_frame, True)
 
 
-def set_window_position(window: NSWindow, x: int, y: int, width: int, height: int):
+def set_window_position(window: "NSWindow", x: int, y: int, width: int, height: int):
     """Set the position and size of the window."""
     frame = window.frame()
     frame.origin.x = x
@@ -37,15 +43,16 @@ def set_window_position(window: NSWindow, x: int, y: int, width: int, height: in
     window.setFrame_display_(frame, True)
 
 
-def get_window_by_title(title: str) -> Optional[NSWindow]:
+def get_window_by_title(title: str) -> "Optional[NSWindow]":
     """Find a window by its title and return its NSWindow handle."""
-    windows_info = CGWindowListCopyWindowInfo(
-        kCGWindowListOptionOnScreenOnly, kCGNullWindowID
+    quartz = QUARTZ.get()
+    windows_info = quartz.CGWindowListCopyWindowInfo(
+        quartz.kCGWindowListOptionOnScreenOnly, quartz.kCGNullWindowID
     )
     for window_info in windows_info:
         window_title = window_info.get("kCGWindowName", "")
         if title in window_title:
             window_id = window_info["kCGWindowNumber"]
-            window = NSApp.windowWithWindowNumber_(window_id)
+            window = APPKIT.get().NSApp.windowWithWindowNumber_(window_id)
             return window
     return None
@@ -86,7 +86,6 @@
 from collections.abc import Iterable
 from types import FunctionType
 from typing import List, Union, Tuple, Any, Iterator, Dict
-import ast
 import os
 import sys
 from difflib import get_close_matches
@@ -97,6 +96,15 @@ import pstats
 import io
 import subprocess, tempfile
 import concurrent
+import zipfile
+import shutil
+import marshal
+import importlib.util
+import statistics
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from .source_analysis import analyze_files, get_functions
 
 version = sys.version_info
 
@@ -479,18 +487,15 @@ Args:
 
 Returns:
     list: A list of undocumented functions, each represented as a list with the function name and its end line number."""
-    undocumented_functions = []
-
-    with open(file_path, 'r', encoding="utf8") as file:
-        tree = ast.parse(file.read())
-
-    for node in ast.walk(tree):
-        
-        if isinstance(node, ast.FunctionDef):
-            if not ast.get_docstring(node):
-                undocumented_functions.append([node.name,node.end_lineno])
-
-    return undocumented_functions
+    return _get_undocumented_functions(analyze_files([file_path]), file_path)
+
+def _get_undocumented_functions(analyses:dict, file_path:str)->list:
+    """The undocumented functions of a file, like find_undocumented_functions, from the analyses of tge.source_analysis.analyze_files."""
+    return [
+        [function["name"], function["end_line"]]
+        for function in get_functions(file_path, analyses[file_path])
+        if not function["async"] and not function["documented"]
+    ]
 
 def check_directory_for_undocumented_functions(directory_path:str)->dict:
     """Check a directory for Python files and find undocumented functions in each file.
@@ -502,12 +507,12 @@ Returns:
     dict: A dictionary where keys are filenames and values are lists of undocumented functions, each represented as a list with the function name and its end line number."""
     undocumented_functions_dict = {}
 
-    for filename in os.listdir(directory_path):
-        if filename.endswith('.py'):
-            file_path = os.path.join(directory_path, filename)
-            undocumented_functions = find_undocumented_functions(file_path)
-            if undocumented_functions:
-                undocumented_functions_dict[filename] = undocumented_functions
+    file_paths = {filename: os.path.join(directory_path, filename) for filename in os.listdir(directory_path) if filename.endswith('.py')}
+    analyses = analyze_files(file_paths.values())
+    for filename, file_path in file_paths.items():
+        undocumented_functions = _get_undocumented_functions(analyses, file_path)
+        if undocumented_functions:
+            undocumented_functions_dict[filename] = undocumented_functions
 
     return undocumented_functions_dict
 
@@ -522,13 +527,13 @@ Returns:
     undocumented_functions_dict = {}
 
     def _check_directory_and_sub_directory_for_undocumented_functions_traverse_directory(current_path:str)->None:
-        """Recursively traverse directories and files to find undocumented functions in Python files and update the dictionary with results.
+        """Recursively traverse directories and files to collect the Python files to check for undocumented functions.
 
 Args:
     current_path (str): The path of the current directory to traverse.
 
 Inner Updates:
-    Updates `undocumented_functions_dict` with undocumented functions found in Python files, using relative paths as keys."""
+    Appends the Python files found to `file_paths`, which are then analyzed all at once."""
         for item in os.listdir(current_path):
             item_path = os.path.join(current_path, item)
 
@@ -536,14 +541,20 @@ Inner Updates:
                 # Recursively traverse subdirectories
                 _check_directory_and_sub_directory_for_undocumented_functions_traverse_directory(item_path)
             elif item.endswith('.py'):
-                undocumented_functions = find_undocumented_functions(item_path)
-                if undocumented_functions:
-                    # Store undocumented functions for the current file
-                    filename = os.path.relpath(item_path, directory_path)
-                    undocumented_functions_dict[filename] = undocumented_functions
+                file_paths.append(item_path)
 
+    file_paths = []
     _check_directory_and_sub_directory_for_undocumented_functions_traverse_directory(directory_path)
 
+    # Parsed in a process pool and cached by content, see tge.source_analysis
+    analyses = analyze_files(file_paths)
+    for item_path in file_paths:
+        undocumented_functions = _get_undocumented_functions(analyses, item_path)
+        if undocumented_functions:
+            # Store undocumented functions for the current file
+            filename = os.path.relpath(item_path, directory_path)
+            undocumented_functions_dict[filename] = undocumented_functions
+
     return undocumented_functions_dict
 
 
@@ -1030,38 +1041,7 @@ def generate_every_capitalization_state(s:str)->List[str]:
 
 
 
-def remove_unused_libraries(code_str:str)->str:
-    """Remove unused variables from code using autoflake."""
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.py') as temp_file:
-        temp_file.write(code_str.encode('utf-8'))
-        temp_file_path = temp_file.name
-
-    try:
-        command = ['autoflake', '--in-place', '--remove-unused-variables', temp_file_path]
-        result = subprocess.run(command, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            raise RuntimeError(f'Error running autoflake: {result.stderr}')
-        
-        with open(temp_file_path, 'r', encoding="utf8") as temp_file:
-            cleaned_code = temp_file.read()
-
-        return cleaned_code
-
-    finally:
-        os.remove(temp_file_path)
-
-
-
-
-
-
-
-
-
-
-
-
+from .unused_imports import remove_unused_libraries
 
 
 def repeat(func: FunctionType, times: int) -> Any:
@@ -1716,6 +1696,275 @@ def compress_imports_in_code(code: Iterable) -> List[str]:
     return zipper_insert(imports, ["\n"]*len(imports)) + rest
 
 
+def compile_to_pyc(source: bytes, file_name: str, optimize: int = 2) -> bytes:
+    """
+    Compiles Python source code into the contents of a .pyc file.
+
+    The .pyc is hash based and unchecked, so the import system never looks for the source file or its mtime.
+
+    Args:
+        source (bytes): The source code to compile.
+        file_name (str): The file name shown in tracebacks.
+        optimize (int): Optimization level like `python -O` (1 strips asserts, 2 also strips docstrings).
+
+    Returns:
+        bytes: The header followed by the marshalled code object.
+    """
+    code = compile(source, file_name, "exec", dont_inherit=True, optimize=optimize)
+    flags = 0b01  # hash based, don't check the source
+    return (
+        importlib.util.MAGIC_NUMBER
+        + flags.to_bytes(4, "little")
+        + importlib.util.source_hash(source)
+        + marshal.dumps(code)
+    )
+
+
+def build_zip_bundle(
+    package_directory: str, output_path: str, optimize: int = 2, include_data_files: bool = True
+) -> List[str]:
+    """
+    Packs a package into a single zip file of precompiled .pyc files that can be imported through `zipimport`.
+
+    Adding the zip to `sys.path` (or PYTHONPATH) makes `import <package>` read every module from the one
+    file, zipimport looks modules up in the zip's central directory instead of scanning directories.
+    Members are stored uncompressed and with fixed timestamps, so identical sources give an identical bundle.
+
+    Args:
+        package_directory (str): Directory of the package, e.g. "./tge". Its name becomes the import name.
+        output_path (str): Path of the zip file to write.
+        optimize (int): Optimization level the modules are compiled with.
+        include_data_files (bool): Also pack non Python files like requirements.txt.
+
+    Returns:
+        List[str]: The names of the members written into the bundle.
+
+    Example:
+        >>> build_zip_bundle("./tge", "./tge.zip")
+        ['tge/', 'tge/__init__.pyc', 'tge/audio.pyc', ...]
+    """
+    package_directory = os.path.abspath(package_directory)
+    parent_directory = os.path.dirname(package_directory)
+    members = {}
+
+    for root, dirs, files in os.walk(package_directory):
+        dirs[:] = [directory for directory in dirs if directory != "__pycache__"]
+        relative_root = os.path.relpath(root, parent_directory).replace(os.sep, "/")
+        # Explicit directory entries, zipimport needs them to find namespace packages
+        members[relative_root + "/"] = b""
+
+        for file in files:
+            relative_path = f"{relative_root}/{file}"
+            if file.endswith(".py"):
+                with open(os.path.join(root, file), "rb") as f:
+                    members[relative_path + "c"] = compile_to_pyc(f.read(), relative_path, optimize)
+            elif include_data_files and not file.endswith((".pyc", ".pyo")):
+                with open(os.path.join(root, file), "rb") as f:
+                    members[relative_path] = f.read()
+
+    temp_path = output_path + ".tmp"
+    with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_STORED) as bundle:
+        for name in sorted(members):
+            bundle.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), members[name])
+    os.replace(temp_path, output_path)
+
+    return sorted(members)
+
+
+def measure_import_times(package: str, path: str, runs: int = 5) -> Dict[str, float]:
+    """
+    Measures how long `import <package>` takes in fresh interpreters that find the package through `path`.
+
+    The package (or the bundle) is copied into a temporary directory first, so the first run has to compile
+    source files just like a fresh install, while the following runs reuse the bytecode written by the first one.
+
+    Args:
+        package (str): Name of the package to import, e.g. "tge" or "minified_tge".
+        path (str): Directory containing the package, or a zip bundle from `build_zip_bundle`.
+        runs (int): Number of interpreters to start, at least 2.
+
+    Returns:
+        Dict[str, float]: "cold" is the first import, "warm" the median of the others, both in seconds.
+    """
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"import {package}\n"
+        "print(time.perf_counter() - start)"
+    )
+    times = []
+    with tempfile.TemporaryDirectory() as working_directory:
+        if os.path.isdir(path):
+            import_path = os.path.join(working_directory, "packages")
+            shutil.copytree(
+                os.path.join(path, package),
+                os.path.join(import_path, package),
+                ignore=shutil.ignore_patterns("__pycache__"),
+            )
+        else:
+            import_path = os.path.join(working_directory, os.path.basename(path))
+            shutil.copyfile(path, import_path)
+
+        environment = dict(os.environ)
+        environment["PYTHONPATH"] = import_path
+        for variable in ("PYTHONDONTWRITEBYTECODE", "PYTHONPYCACHEPREFIX"):
+            environment.pop(variable, None)
+
+        for _ in range(max(runs, 2)):
+            result = subprocess.run(
+                [sys.executable, "-c", code],
+                capture_output=True,
+                text=True,
+                env=environment,
+                cwd=working_directory,
+                check=True,
+            )
+            times.append(float(result.stdout.strip().splitlines()[-1]))
+
+    return {"cold": times[0], "warm": statistics.median(times[1:])}
+
+
+MINIFY_PIPELINE_VERSION = 1
+# Below this many changed files, starting worker processes costs more than minifying them here
+MINIFY_PROCESS_POOL_MIN_FILES = 8
+
+
+def minify_source(source: str) -> str:
+    """
+    Runs Python source code through the full minification pipeline used to build minified_tge:
+    `minify` without docstrings, tabs turned into spaces, `remove_unused_libraries` and `compress_imports_in_code`.
+
+    Args:
+        source (str): The Python source code.
+
+    Returns:
+        str: The minified source code.
+    """
+    minified = minify(source, rename_important_names=False, remove_docstrings=True)
+    return "".join(compress_imports_in_code(remove_unused_libraries(minified.replace("\t", " "))))
+
+
+def _minify_directory_worker(task: Tuple[str, str]) -> Tuple[str, bytes]:
+    "Minifies (Python files) or reads (everything else) one file for `minify_directory`, runs inside the process pool."
+    relative_path, source_path = task
+    with open(source_path, "rb") as f:
+        data = f.read()
+    if relative_path.endswith(".py"):
+        data = minify_source(data.decode("utf8")).encode("utf8")
+    return relative_path, data
+
+
+def minify_directory(
+    source_directory: str,
+    output_directory: str,
+    manifest_path: Union[str, None] = None,
+    workers: Union[int, None] = None,
+) -> Dict[str, List[str]]:
+    """
+    Minifies every Python file of a directory tree into `output_directory` and copies all other files, incrementally and in parallel.
+
+    A build manifest maps every file to the SHA-256 of its source and of its output. Files whose source and output
+    still match the manifest are skipped, the rest are processed in a process pool (in this process when there are fewer
+    than MINIFY_PROCESS_POOL_MIN_FILES). Outputs of source files that were removed since the last build are deleted
+    again. A different pipeline version or minifier version rebuilds everything.
+
+    Args:
+        source_directory (str): The directory to minify, e.g. "./tge".
+        output_directory (str): Where the minified tree is written, e.g. "./minified_tge".
+        manifest_path (Union[str, None]): Where the build manifest is kept. Defaults to a file in the user cache directory.
+        workers (Union[int, None]): Size of the process pool, defaults to the number of CPUs.
+
+    Returns:
+        Dict[str, List[str]]: The relative paths that were "processed", "skipped" and "removed".
+    """
+    from .library_utils import get_user_cache_directory
+
+    source_directory = os.path.abspath(source_directory)
+    output_directory = os.path.abspath(output_directory)
+    if manifest_path is None:
+        output_id = hashlib.sha1(output_directory.encode()).hexdigest()
+        manifest_path = os.path.join(get_user_cache_directory(), f"minify_manifest_{output_id}.json")
+
+    try:
+        from importlib.metadata import version as get_distribution_version
+        minifier_version = get_distribution_version("python-minifier")
+    except Exception:
+        minifier_version = None
+
+    settings = {
+        "pipeline": MINIFY_PIPELINE_VERSION,
+        "minifier": minifier_version,
+    }
+    try:
+        with open(manifest_path, "r", encoding="utf8") as f:
+            manifest = json.load(f)
+        if manifest.get("settings") != settings:
+            manifest = {}
+    except (OSError, ValueError):
+        manifest = {}
+    old_files = manifest.get("files", {})
+
+    def file_hash(path: str) -> Union[str, None]:
+        try:
+            with open(path, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    files = {}
+    tasks = []
+    skipped = []
+    for root, dirs, file_names in os.walk(source_directory):
+        dirs[:] = [directory for directory in dirs if directory != "__pycache__"]
+        for file_name in file_names:
+            if file_name.endswith(".pyc"):
+                continue
+            source_path = os.path.join(root, file_name)
+            relative_path = os.path.relpath(source_path, source_directory).replace(os.sep, "/")
+            source_hash = file_hash(source_path)
+            old_entry = old_files.get(relative_path)
+            if (
+                old_entry is not None
+                and old_entry["source"] == source_hash
+                and file_hash(os.path.join(output_directory, relative_path)) == old_entry["output"]
+            ):
+                files[relative_path] = old_entry
+                skipped.append(relative_path)
+            else:
+                files[relative_path] = {"source": source_hash, "output": None}
+                tasks.append((relative_path, source_path))
+
+    if len(tasks) >= MINIFY_PROCESS_POOL_MIN_FILES and workers != 1:
+        # Worker processes re-import the __main__ module under the spawn start method (Windows, macOS), so scripts
+        # calling this have to guard their top level code with if __name__ == "__main__"
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_minify_directory_worker, tasks))
+    else:
+        results = [_minify_directory_worker(task) for task in tasks]
+
+    for relative_path, data in results:
+        output_path = os.path.join(output_directory, relative_path)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(data)
+        files[relative_path]["output"] = hashlib.sha256(data).hexdigest()
+
+    removed = []
+    for relative_path in old_files:
+        if relative_path not in files:
+            try:
+                os.remove(os.path.join(output_directory, relative_path))
+            except OSError:
+                pass
+            removed.append(relative_path)
+
+    os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+    with open(manifest_path, "w", encoding="utf8") as f:
+        json.dump({"settings": settings, "files": files}, f, indent=1, sort_keys=True)
+
+    return {"processed": [task[0] for task in tasks], "skipped": skipped, "removed": removed}
+
+
 
 
 
@@ -0,0 +1,835 @@
+"""
+Removes unused imports and unused local variables from Python code, in process.
+
+A port of what 'autoflake --remove-unused-variables' does: _UnusedNameFinder walks the module like pyflakes and
+finds the unused names, then the lines declaring them are rewritten one at a time. tbe.remove_unused_libraries,
+used when minifying, comes from here.
+"""
+import ast
+import builtins
+import collections
+import contextlib
+import io
+import os
+import re
+import string
+import sys
+import sysconfig
+import tokenize
+from types import FunctionType
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+
+_SAFE_TO_REMOVE_IMPORTS = None
+
+
+def get_safe_to_remove_imports() -> frozenset:
+    """
+    Returns the names of the modules whose unused imports can be removed without changing what the code does.
+
+    Those are the standard library modules shipped as python files plus the ones compiled into the interpreter,
+    the same list autoflake uses. Extension modules like 'binascii' or 'zlib' aren't part of it.
+
+    Returns:
+    frozenset: The top level module names.
+    """
+    global _SAFE_TO_REMOVE_IMPORTS
+    if _SAFE_TO_REMOVE_IMPORTS is None:
+        names = {"datetime", "grp", "io", "json", "math", "multiprocessing", "parser", "pwd", "string", "operator", "os", "sys", "time"}
+        names.update(sys.builtin_module_names)
+        paths = sysconfig.get_paths()
+        for path in {paths[key] for key in ("stdlib", "platstdlib") if key in paths}:
+            for directory in (path, os.path.join(path, "lib-dynload")):
+                if not os.path.isdir(directory):
+                    continue
+                for name in os.listdir(directory):
+                    if name.startswith("_") or "-" in name or ("." in name and not name.endswith(("so", "py", "pyc"))):
+                        continue
+                    names.add(name.split(".")[0])
+        _SAFE_TO_REMOVE_IMPORTS = frozenset(names - {"antigravity", "rlcompleter", "this"})
+    return _SAFE_TO_REMOVE_IMPORTS
+
+
+_BUILTIN_NAMES = frozenset(dir(builtins)) | {"__file__", "__builtins__", "__annotations__", "WindowsError"}
+_TYPING_MODULES = ("typing", "typing_extensions")
+_IMPORT_KINDS = ("import", "submodule", "from", "star", "future")
+_ALWAYS_USED_NAMES = ("__tracebackhide__", "__traceback_info__", "__traceback_supplement__")
+
+_ANNOTATION_NONE, _ANNOTATION_STRING, _ANNOTATION_BARE, _ANNOTATION_STR_AS_TYPE = range(4)
+
+_FIELD_ORDER_CACHE = {}
+
+
+class _Binding:
+    __slots__ = ("name", "kind", "node", "used", "full_name", "module", "real_name", "names")
+
+    def __init__(self, name: str, kind: str, node: Any = None, full_name: str = None, module: str = None, real_name: str = None) -> None:
+        self.name = name
+        self.kind = kind
+        self.node = node
+        self.used = False
+        self.full_name = full_name or name
+        self.module = module
+        self.real_name = real_name or name
+        self.names = []
+
+    def has_alias(self) -> bool:
+        return self.full_name.split(".")[-1] != self.name
+
+    def imported_name(self) -> str:
+        if self.kind == "star":
+            return f"from {self.full_name} import *" if self.full_name.endswith(".") else self.name
+        if self.kind == "submodule":
+            return self.full_name
+        return self.full_name + (f" as {self.name}" if self.has_alias() else "")
+
+
+class _Scope(dict):
+    def __init__(self, kind: str) -> None:
+        super().__init__()
+        self.kind = kind
+        self.uses_locals = False
+        self.import_starred = False
+        self.annotations_future = False
+
+
+class _UnusedNameFinder:
+    """
+    Walks a module the same way pyflakes does and records every unused import and unused local variable.
+
+    Module level code is handled in order, function bodies are deferred until the module is done, and a
+    name counts as used as soon as any load resolves to its binding.
+    """
+
+    def __init__(self, tree: ast.AST) -> None:
+        self.deferred = collections.deque()
+        self.dead_scopes = []
+        self.in_annotation = _ANNOTATION_NONE
+        self.unused_imports = collections.defaultdict(list)
+        self.unused_variables = set()
+
+        module_scope = _Scope("module")
+        self.scope_stack = [module_scope]
+        for name in _BUILTIN_NAMES:
+            self.add_binding(_Binding(name, "builtin"))
+
+        tree._tge_parent = None
+        self.handle_children(tree)
+        while self.deferred:
+            handler, self.scope_stack = self.deferred.popleft()
+            handler()
+        self.scope_stack = []
+        self.dead_scopes.append(module_scope)
+        self.check_dead_scopes()
+
+    @property
+    def scope(self) -> _Scope:
+        return self.scope_stack[-1]
+
+    def defer(self, handler: FunctionType) -> None:
+        self.deferred.append((handler, self.scope_stack[:]))
+
+    @contextlib.contextmanager
+    def in_scope(self, kind: str) -> Iterator[None]:
+        self.scope_stack.append(_Scope(kind))
+        try:
+            yield
+        finally:
+            self.dead_scopes.append(self.scope_stack.pop())
+
+    @contextlib.contextmanager
+    def annotation_state(self, state: int = _ANNOTATION_BARE) -> Iterator[None]:
+        previous, self.in_annotation = self.in_annotation, state
+        try:
+            yield
+        finally:
+            self.in_annotation = previous
+
+    def annotations_postponed(self) -> bool:
+        return self.in_annotation == _ANNOTATION_STRING or (
+            self.in_annotation == _ANNOTATION_BARE and (self.scope_stack[0].annotations_future or sys.version_info >= (3, 14))
+        )
+
+    def check_dead_scopes(self) -> None:
+        for scope in self.dead_scopes:
+            # Imports inside classes are public members
+            if scope.kind == "class":
+                continue
+
+            if scope.kind == "function" and not scope.uses_locals:
+                for name, binding in scope.items():
+                    if not binding.used and binding.kind in ("assignment", "namedexpr") and name != "_" and name not in _ALWAYS_USED_NAMES:
+                        self.unused_variables.add(binding.node.lineno)
+
+            all_binding = scope.get("__all__")
+            all_names = set(all_binding.names) if all_binding is not None and all_binding.kind == "export" else set()
+            if scope.import_starred and any(name not in scope for name in all_names):
+                for binding in scope.values():
+                    if binding.kind == "star":
+                        binding.used = True
+
+            for binding in scope.values():
+                if binding.kind in _IMPORT_KINDS and not binding.used and binding.name not in all_names:
+                    self.unused_imports[binding.node.lineno].append(binding.imported_name())
+
+    def add_binding(self, value: _Binding) -> None:
+        if value.name in self.scope:
+            # The rebound name is assumed to be used as a global or within a loop
+            value.used = self.scope[value.name].used
+
+        if value.name not in self.scope or value.kind != "annotation":
+            if value.kind == "namedexpr":
+                scope = next(scope for scope in reversed(self.scope_stack) if scope.kind not in ("comprehension", "generator"))
+                if value.name in scope and scope[value.name].kind == "annotation":
+                    scope[value.name] = value
+                else:
+                    scope.setdefault(value.name, value)
+            else:
+                self.scope[value.name] = value
+
+    def handle(self, node: ast.AST, parent: ast.AST) -> None:
+        if node is None:
+            return
+        node._tge_parent = parent
+        getattr(self, "visit_" + node.__class__.__name__, self.handle_children)(node)
+
+    def handle_children(self, node: ast.AST, omit: Tuple[str, ...] = ()) -> None:
+        fields = _FIELD_ORDER_CACHE.get(node.__class__)
+        if fields is None:
+            field_names = node.__class__._fields
+            # Handle iter before target, generators before element, and value before everything else
+            first = "iter" if "iter" in field_names else "generators" if "generators" in field_names else "value"
+            fields = _FIELD_ORDER_CACHE[node.__class__] = tuple(sorted(field_names, key=first.find, reverse=True))
+
+        for field in fields:
+            if field in omit:
+                continue
+            value = getattr(node, field, None)
+            if isinstance(value, ast.AST):
+                self.handle(value, node)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.handle(item, node)
+
+    def handle_annotation(self, annotation: ast.AST, node: ast.AST) -> None:
+        if annotation is None:
+            return
+        if self.scope_stack[0].annotations_future or sys.version_info >= (3, 14):
+            def handle_later() -> None:
+                with self.annotation_state():
+                    self.handle(annotation, node)
+            self.defer(handle_later)
+        else:
+            with self.annotation_state():
+                self.handle(annotation, node)
+
+    def handle_string_annotation(self, text: str, node: ast.AST) -> None:
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            return
+        if len(tree.body) != 1 or not isinstance(tree.body[0], ast.Expr):
+            return
+        with self.annotation_state(_ANNOTATION_STRING):
+            self.handle(tree.body[0].value, node)
+
+    @staticmethod
+    def get_parent(node: ast.AST) -> ast.AST:
+        while True:
+            node = node._tge_parent
+            if not hasattr(node, "elts") and not hasattr(node, "ctx"):
+                return node
+
+    @staticmethod
+    def node_name(node: ast.AST) -> Union[str, None]:
+        if hasattr(node, "id"):
+            return node.id
+        if hasattr(node, "name"):
+            return node.name
+        if hasattr(node, "rest"):
+            return node.rest
+        return None
+
+    def is_typing(self, node: ast.AST, attribute: Union[str, None] = None) -> bool:
+        """Whether node refers to a member of the typing module, optionally a specific one."""
+        def lookup(name: str) -> Union[_Binding, None]:
+            for scope in reversed(self.scope_stack):
+                if name in scope:
+                    return scope[name]
+            return None
+
+        if isinstance(node, ast.Name):
+            binding = lookup(node.id)
+            return binding is not None and binding.kind == "from" and binding.module in _TYPING_MODULES and attribute in (None, binding.real_name)
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+            binding = lookup(node.value.id)
+            return binding is not None and binding.kind in _IMPORT_KINDS and binding.full_name in _TYPING_MODULES and attribute in (None, node.attr)
+        return False
+
+    def handle_node_load(self, node: ast.AST) -> None:
+        name = self.node_name(node)
+        if not name:
+            return
+
+        can_access_class_variables = None
+        import_starred = False
+        for scope in reversed(self.scope_stack):
+            if scope.kind == "class":
+                if name == "__class__":
+                    return
+                if can_access_class_variables is False:
+                    continue
+
+            binding = scope.get(name)
+            if binding is not None and binding.kind == "annotation" and not self.annotations_postponed():
+                binding.used = True
+                continue
+
+            if binding is not None:
+                binding.used = True
+                # An aliased import also marks a same named submodule import as used
+                if binding.kind in _IMPORT_KINDS and binding.has_alias() and binding.full_name in scope:
+                    scope[binding.full_name].used = True
+                return
+
+            import_starred = import_starred or scope.import_starred
+            if can_access_class_variables is not False:
+                can_access_class_variables = scope.kind in ("comprehension", "generator")
+
+        if import_starred:
+            for scope in self.scope_stack:
+                for binding in scope.values():
+                    if binding.kind == "star":
+                        binding.used = True
+
+    def handle_node_store(self, node: ast.AST) -> None:
+        name = self.node_name(node)
+        if not name:
+            return
+
+        parent_statement = self.get_parent(node)
+        if isinstance(parent_statement, ast.AnnAssign) and parent_statement.value is None:
+            binding = _Binding(name, "annotation", node)
+        elif isinstance(parent_statement, (ast.For, ast.AsyncFor, ast.comprehension)) or (
+            parent_statement is not node._tge_parent and not (
+                isinstance(parent_statement, ast.Assign)
+                and all(hasattr(child, "elts") for child in parent_statement.targets + [parent_statement.value])
+            )
+        ):
+            binding = _Binding(name, "binding", node)
+        elif name == "__all__" and self.scope.kind == "module" and isinstance(node._tge_parent, (ast.Assign, ast.AugAssign, ast.AnnAssign)):
+            binding = _Binding(name, "export", node)
+            binding.names = self.export_names(node._tge_parent)
+        elif isinstance(parent_statement, ast.NamedExpr):
+            binding = _Binding(name, "namedexpr", node)
+        else:
+            binding = _Binding(name, "assignment", node)
+        self.add_binding(binding)
+
+    def export_names(self, source: ast.AST) -> List[str]:
+        """Statically known names of an __all__ assignment, including list and tuple concatenation."""
+        previous = self.scope.get("__all__")
+        names = list(previous.names) if isinstance(source, ast.AugAssign) and previous is not None else []
+
+        def add_names(container: ast.AST) -> None:
+            names.extend(item.value for item in container.elts if isinstance(item, ast.Constant) and isinstance(item.value, str))
+
+        if isinstance(source.value, (ast.List, ast.Tuple)):
+            add_names(source.value)
+        elif isinstance(source.value, ast.BinOp):
+            current = source.value
+            while isinstance(current.right, (ast.List, ast.Tuple)):
+                add_names(current.right)
+                if isinstance(current.left, ast.BinOp):
+                    current = current.left
+                elif isinstance(current.left, (ast.List, ast.Tuple)):
+                    add_names(current.left)
+                    break
+                else:
+                    break
+        return names
+
+    def handle_node_delete(self, node: ast.Name) -> None:
+        current = getattr(node, "_tge_parent", None)
+        while current is not None:
+            # A conditional branch might never run, so the binding has to stay
+            if isinstance(current, (ast.If, ast.While, ast.IfExp)):
+                return
+            current = getattr(current, "_tge_parent", None)
+        self.scope.pop(node.id, None)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Load):
+            self.handle_node_load(node)
+            if node.id == "locals" and self.scope.kind == "function" and isinstance(node._tge_parent, ast.Call):
+                self.scope.uses_locals = True
+        elif isinstance(node.ctx, ast.Store):
+            self.handle_node_store(node)
+        else:
+            self.handle_node_delete(node)
+
+    def visit_For(self, node: ast.AST) -> None:
+        self.handle(node.iter, node)
+        self.handle_children(node, omit=("iter",))
+
+    visit_AsyncFor = visit_comprehension = visit_For
+
+    def visit_GeneratorExp(self, node: ast.AST) -> None:
+        # The first iterable is evaluated eagerly in the enclosing scope
+        self.handle(node.generators[0].iter, node.generators[0])
+        with self.in_scope("generator" if isinstance(node, ast.GeneratorExp) else "comprehension"):
+            self.handle_children(node.generators[0], omit=("iter",))
+            for generator in node.generators[1:]:
+                self.handle(generator, node)
+            self.handle_children(node, omit=("generators",))
+
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp
+
+    def visit_Global(self, node: ast.AST) -> None:
+        global_scope = self.scope_stack[0]
+        if self.scope is global_scope:
+            return
+        for name in node.names:
+            binding = _Binding(name, "assignment", node)
+            global_scope.setdefault(name, binding)
+            # Bind the name everywhere below the module, already marked as used
+            binding.used = True
+            for scope in self.scope_stack[1:]:
+                scope[name] = binding
+
+    visit_Nonlocal = visit_Global
+
+    def visit_FunctionDef(self, node: ast.AST) -> None:
+        for decorator in node.decorator_list:
+            self.handle(decorator, node)
+        self.visit_Lambda(node)
+        self.add_binding(_Binding(node.name, "definition", node))
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node: ast.AST) -> None:
+        arguments = node.args
+        annotations = [argument.annotation for argument in arguments.posonlyargs + arguments.args + arguments.kwonlyargs]
+        annotations += [wildcard.annotation for wildcard in (arguments.vararg, arguments.kwarg) if wildcard]
+        if not isinstance(node, ast.Lambda):
+            annotations.append(node.returns)
+
+        for annotation in annotations:
+            self.handle_annotation(annotation, node)
+        for default in arguments.defaults + arguments.kw_defaults:
+            self.handle(default, node)
+
+        def run_function() -> None:
+            with self.in_scope("function"):
+                self.handle_children(node, omit=("decorator_list", "returns", "type_params"))
+
+        self.defer(run_function)
+
+    def visit_arguments(self, node: ast.arguments) -> None:
+        self.handle_children(node, omit=("defaults", "kw_defaults"))
+
+    def visit_arg(self, node: ast.arg) -> None:
+        self.add_binding(_Binding(node.arg, "argument", node))
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        for decorator in node.decorator_list:
+            self.handle(decorator, node)
+        for base in node.bases:
+            self.handle(base, node)
+        for keyword in node.keywords:
+            self.handle(keyword, node)
+        with self.in_scope("class"):
+            for statement in node.body:
+                self.handle(statement, node)
+        self.add_binding(_Binding(node.name, "definition", node))
+
+    def visit_Assign(self, node: ast.AST) -> None:
+        self.handle(node.value, node)
+        self.handle_children(node, omit=("value",))
+
+    visit_NamedExpr = visit_Assign
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> None:
+        self.handle_node_load(node.target)
+        self.handle(node.value, node)
+        self.handle(node.target, node)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        self.handle_annotation(node.annotation, node)
+        if node.value:
+            if self.is_typing(node.annotation, "TypeAlias"):
+                with self.annotation_state(_ANNOTATION_STR_AS_TYPE):
+                    self.handle(node.value, node)
+            else:
+                self.handle(node.value, node)
+        self.handle(node.target, node)
+
+    def visit_Constant(self, node: ast.Constant) -> None:
+        if isinstance(node.value, str) and self.in_annotation:
+            self.defer(lambda: self.handle_string_annotation(node.value, node))
+
+    def visit_Subscript(self, node: ast.Subscript) -> None:
+        value = node.value
+        if (isinstance(value, ast.Name) and value.id == "Literal") or (isinstance(value, ast.Attribute) and value.attr == "Literal"):
+            self.handle(value, node)
+            with self.annotation_state(_ANNOTATION_NONE):
+                self.handle(node.slice, node)
+        elif (isinstance(value, ast.Name) and value.id == "Annotated") or (isinstance(value, ast.Attribute) and value.attr == "Annotated"):
+            self.handle(value, node)
+            if isinstance(node.slice, ast.Tuple) and len(node.slice.elts) >= 2:
+                self.handle(node.slice.elts[0], node)
+                with self.annotation_state(_ANNOTATION_NONE):
+                    for argument in node.slice.elts[1:]:
+                        self.handle(argument, node)
+            else:
+                self.handle(node.slice, node)
+        elif self.is_typing(value):
+            with self.annotation_state():
+                self.handle_children(node)
+        else:
+            self.handle_children(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        # Arguments (index, keyword) of typing helpers that are type expressions, so strings in them are forward references
+        if self.is_typing(node.func, "cast"):
+            types, keywords = range(0, 1), ("typ",)
+        elif self.is_typing(node.func, "TypeVar"):
+            types, keywords = range(1, len(node.args)), ("bound", "default")
+        elif self.is_typing(node.func, "NewType"):
+            types, keywords = range(1, len(node.args)), ("tp",)
+        else:
+            self.handle_children(node)
+            return
+
+        with self.annotation_state(_ANNOTATION_NONE):
+            self.handle(node.func, node)
+        for index, argument in enumerate(node.args):
+            with self.annotation_state(_ANNOTATION_STR_AS_TYPE if index in types else _ANNOTATION_NONE):
+                self.handle(argument, node)
+        for keyword in node.keywords:
+            with self.annotation_state(_ANNOTATION_STR_AS_TYPE if keyword.arg in keywords else _ANNOTATION_NONE):
+                self.handle(keyword, node)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            if "." in alias.name and not alias.asname:
+                binding = _Binding(alias.name.split(".")[0], "submodule", node, full_name=alias.name)
+            else:
+                binding = _Binding(alias.asname or alias.name, "import", node, full_name=alias.name)
+            self.add_binding(binding)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module = "." * node.level + (node.module or "")
+        for alias in node.names:
+            name = alias.asname or alias.name
+            full_name = module + alias.name if module.endswith(".") else module + "." + alias.name
+            if node.module == "__future__":
+                binding = _Binding(name, "future", node, full_name=full_name, module=module, real_name=alias.name)
+                binding.used = True
+                if alias.name == "annotations":
+                    self.scope_stack[0].annotations_future = True
+            elif alias.name == "*":
+                if self.scope.kind != "module":
+                    continue
+                self.scope.import_starred = True
+                binding = _Binding(module + ".*", "star", node, full_name=module)
+            else:
+                binding = _Binding(name, "from", node, full_name=full_name, module=module, real_name=alias.name)
+            self.add_binding(binding)
+
+    def visit_Try(self, node: ast.AST) -> None:
+        for child in node.body:
+            self.handle(child, node)
+        self.handle_children(node, omit=("body",))
+
+    visit_TryStar = visit_Try
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        if node.name is None:
+            self.handle_children(node)
+            return
+
+        if node.name in self.scope:
+            self.handle_node_store(node)
+
+        # The exception name only lives inside the except block
+        previous = self.scope.pop(node.name, None)
+        self.handle_node_store(node)
+        self.handle_children(node)
+        binding = self.scope.pop(node.name, None)
+        if binding is not None and not binding.used:
+            self.unused_variables.add(node.lineno)
+        if previous is not None:
+            self.scope[node.name] = previous
+
+    def visit_MatchAs(self, node: ast.AST) -> None:
+        self.handle_node_store(node)
+        self.handle_children(node)
+
+    visit_MatchMapping = visit_MatchStar = visit_MatchAs
+
+
+def find_unused_names(code_str: str) -> Tuple[Dict[int, List[str]], List[int]]:
+    """
+    Finds the imports and local variables in some code that are never used.
+
+    Parameters:
+    code_str (str): The source code to analyze.
+
+    Returns:
+    Tuple[Dict[int, List[str]], List[int]]: A mapping of line number to the unused imported names on that line
+    (as 'module.name' or 'module.name as alias'), and the sorted line numbers of unused local variables.
+
+    Raises:
+    SyntaxError: If the code can't be parsed.
+    """
+    finder = _UnusedNameFinder(ast.parse(code_str))
+    return dict(finder.unused_imports), sorted(finder.unused_variables)
+
+
+_IMPORT_KEYWORD = re.compile(r"\bimport\b\s*")
+_FROM_BASE = re.compile(r"\bfrom\s+([^ ]+)")
+_IMPORT_SEGMENT = re.compile(r"([^,\s]+(?:[\s\\]+as[\s\\]+[^,\s]+)?[,\s\\)]*)", re.M)
+_EXCEPT_AS = re.compile(r"^\s*except [\s,()\w]+ as \w+:$")
+_SKIP_FILE_COMMENT = re.compile(r"\s*#\s{1,}autoflake:\s{1,}\bskip_file\b", re.MULTILINE)
+
+
+def _top_module(module_name: str) -> str:
+    return "%LOCAL_MODULE%" if module_name[0] == "." else module_name.split(".")[0]
+
+
+def _line_indentation(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())] if line.strip() else ""
+
+
+def _line_ending(line: str) -> str:
+    stripped_length = len(line.rstrip())
+    return line[stripped_length:] if stripped_length != len(line) else ""
+
+
+def _is_multiline_statement(line: str, previous_line: str = "") -> bool:
+    if any(symbol in line for symbol in "\\:;"):
+        return True
+    try:
+        list(tokenize.generate_tokens(io.StringIO(line).readline))
+        return previous_line.rstrip().endswith("\\")
+    except (SyntaxError, tokenize.TokenError):
+        return True
+
+
+def _keep_imports(imports: List[str], parent: Union[str, None], unused: List[str]) -> List[str]:
+    separator = "" if parent and parent[-1] == "." else "."
+    return [name for name in imports if (name if parent is None else parent + separator + name) not in unused]
+
+
+class _MultilineImportFilter:
+    """Collects the lines of an import that uses parentheses, backslashes, ':' or ';' and rewrites it once complete."""
+
+    def __init__(self, line: str, unused: List[str], remove_all_unused_imports: bool, previous_line: str) -> None:
+        self.remove = unused
+        self.parenthesized = "(" in line
+        self.start, imports = _IMPORT_KEYWORD.split(line, maxsplit=1)
+        match = _FROM_BASE.search(self.start)
+        self.base = match.group(1) if match else None
+        self.give_up = "\\" in previous_line
+
+        if not remove_all_unused_imports:
+            if self.base and _top_module(self.base) not in get_safe_to_remove_imports():
+                self.give_up = True
+            else:
+                self.remove = [name for name in self.remove if _top_module(name) in get_safe_to_remove_imports()]
+
+        self.analyze(line)
+        self.lines = [imports]
+
+    def analyze(self, line: str) -> None:
+        if any(character in line for character in ";:#"):
+            self.give_up = True
+
+    def is_over(self, line: str) -> bool:
+        character = ")" if self.parenthesized else "\\"
+        comment_index, character_index = line.find("#"), line.find(character)
+        found = character_index >= 0 and (comment_index > character_index or comment_index < 0)
+        return found if self.parenthesized else not found
+
+    def __call__(self, line: Union[str, None] = None) -> Union["_MultilineImportFilter", str]:
+        if line:
+            self.lines.append(line)
+            self.analyze(line)
+        if not self.is_over(line or self.lines[-1]):
+            return self
+        if self.give_up:
+            return self.start + "import " + "".join(self.lines)
+        return self.fix()
+
+    def fix(self) -> str:
+        old_imports = "".join(self.lines)
+        ending = _line_ending(old_imports)
+        segments = [segment for segment in _IMPORT_SEGMENT.findall(old_imports) if segment]
+        modules = [segment.strip(string.whitespace + ",\\()") or segment for segment in segments]
+        keep = _keep_imports(modules, self.base, self.remove)
+        if len(keep) == len(segments):
+            return self.start + "import " + old_imports
+
+        fixed = ""
+        if keep:
+            # Reuse the existing layout, only swapping the names in the first N-1 segments and the last one
+            templates = list(zip(modules, segments))
+            templates = templates[:len(keep) - 1] + templates[-1:]
+            fixed = "".join(template.replace(module, keep[index]) for index, (module, template) in enumerate(templates))
+            if self.parenthesized and any(character not in fixed for character in "()"):
+                fixed = fixed.strip(string.whitespace + "()") + ending
+
+        if len(fixed.strip(string.whitespace + "\\(),")) < 1:
+            return re.match(r"^\s*", self.start).group(0) + "pass" + ending
+        return self.start + "import " + fixed
+
+
+def _filter_unused_import(line: str, unused: List[str], remove_all_unused_imports: bool, previous_line: str) -> Union[_MultilineImportFilter, str]:
+    # Doctests
+    if line.lstrip().startswith(">"):
+        return line
+
+    if any(symbol in line for symbol in "()") or _is_multiline_statement(line, previous_line):
+        if not _IMPORT_KEYWORD.search(line):
+            return line
+        return _MultilineImportFilter(line, unused, remove_all_unused_imports, previous_line)()
+
+    is_from_import = line.lstrip().startswith("from")
+    if "," in line and not is_from_import:
+        # Split "import a, b" into one import per line, the next pass removes the unused ones
+        ending = _line_ending(line)
+        if not ending:
+            return line
+        start, imports = re.split(r"\bimport\b", line, maxsplit=1)
+        return "".join(start + "import " + name.strip() + ending for name in imports.split(","))
+
+    parts = line.split()
+    package = parts[1].split(".")[0] if line.lstrip().startswith(("import", "from")) and len(parts) >= 2 else None
+    if not remove_all_unused_imports and package is not None and package not in get_safe_to_remove_imports():
+        return line
+
+    if "," in line:
+        start, imports = re.split(r"\bimport\b", line, maxsplit=1)
+        base = re.search(r"\bfrom\s+([^ ]+)", start).group(1)
+        keep = _keep_imports(re.split(r"\s*,\s*", imports.strip()), base, unused)
+        if keep:
+            return start + "import " + ", ".join(keep) + _line_ending(line)
+
+    # A pass keeps blocks like "if x:\n    import os" valid
+    return _line_indentation(line) + "pass" + _line_ending(line)
+
+
+def _filter_unused_variable(line: str) -> str:
+    if _EXCEPT_AS.match(line):
+        return re.sub(r" as \w+:$", ":", line, count=1)
+    if _is_multiline_statement(line) or line.count("=") != 1:
+        return line
+
+    target, value = line.split("=")
+    value = value.lstrip()
+    if "," in target:
+        return line
+
+    try:
+        ast.literal_eval(value)
+        is_literal_or_name = True
+    except (SyntaxError, TypeError, ValueError):
+        is_literal_or_name = value.strip() in ("dict()", "list()", "set()") or re.match(r"^\w+\s*$", value) is not None
+    if is_literal_or_name:
+        value = "pass" + _line_ending(line)
+    return _line_indentation(line) + value
+
+
+def _filter_unused_code(code_str: str, remove_all_unused_imports: bool, remove_unused_variables: bool) -> str:
+    try:
+        unused_imports, unused_variables = find_unused_names(code_str)
+    except (SyntaxError, ValueError, RecursionError):
+        return code_str
+    if not remove_unused_variables:
+        unused_variables = []
+
+    result = []
+    pending = None
+    previous_line = ""
+    for line_number, line in enumerate(re.findall(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+", code_str), start=1):
+        if pending is not None:
+            fixed = pending(line)
+        elif "#" in line:
+            fixed = line
+        elif line_number in unused_imports:
+            fixed = _filter_unused_import(line, unused_imports[line_number], remove_all_unused_imports, previous_line)
+        elif line_number in unused_variables:
+            fixed = _filter_unused_variable(line)
+        else:
+            fixed = line
+
+        pending = fixed if isinstance(fixed, _MultilineImportFilter) else None
+        if pending is None:
+            result.append(fixed)
+        previous_line = line
+    return "".join(result)
+
+
+def _remove_useless_pass(code_str: str) -> str:
+    """Drops 'pass' statements that share their block with another statement."""
+    useless = set()
+    previous_token_type = None
+    last_pass_row = None
+    last_pass_indentation = None
+    previous_line = ""
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code_str).readline):
+            token_type, row, line = token[0], token[2][0], token[4]
+            is_pass = token_type == tokenize.NAME and line.strip() == "pass"
+
+            # A pass followed by another statement in the same block
+            if (row - 1 == last_pass_row and _line_indentation(line) == last_pass_indentation
+                    and token_type in (tokenize.NAME, tokenize.NUMBER, tokenize.STRING) and not is_pass):
+                useless.add(row - 1)
+
+            if is_pass:
+                last_pass_row = row
+                last_pass_indentation = _line_indentation(line)
+                # A pass after another statement in the same block
+                if previous_token_type != tokenize.INDENT and not previous_line.rstrip().endswith("\\"):
+                    useless.add(row)
+
+            previous_token_type = token_type
+            previous_line = line
+    except (SyntaxError, tokenize.TokenError):
+        return code_str
+
+    return "".join(line for line_number, line in enumerate(io.StringIO(code_str).readlines(), start=1) if line_number not in useless)
+
+
+def remove_unused_libraries(code_str: str, remove_all_unused_imports: bool = False, remove_unused_variables: bool = True) -> str:
+    """
+    Removes unused imports and unused local variables from some code, in process and without touching the disk.
+
+    It gives the same result as running 'autoflake --in-place --remove-unused-variables' on the code: only
+    standard library imports are removed unless remove_all_unused_imports is set, names listed in __all__ or
+    loaded anywhere (like the 'html, json' line in codec.py) count as used, lines with comments are left alone,
+    and blocks that would be left empty get a 'pass'.
+
+    Parameters:
+    code_str (str): The source code to clean up.
+    remove_all_unused_imports (bool, optional): Also remove unused third-party and local imports. Defaults to False.
+    remove_unused_variables (bool, optional): Remove local variables that are assigned but never used. Defaults to True.
+
+    Returns:
+    str: The cleaned up code. Code that can't be parsed is returned unchanged.
+    """
+    if not code_str or _SKIP_FILE_COMMENT.search(code_str):
+        return code_str
+
+    # Scoping of nonlocal names isn't tracked, so leave those variables alone
+    if "nonlocal" in code_str:
+        remove_unused_variables = False
+
+    while True:
+        cleaned_code = _remove_useless_pass(_filter_unused_code(code_str, remove_all_unused_imports, remove_unused_variables))
+        if cleaned_code == code_str:
+            return cleaned_code
+        code_str = cleaned_code